@@ -0,0 +1,137 @@
+"""Synthetic projects for the benchmarks.
+
+Every generated C/C++ file starts with a ``// deps:`` line listing the
+headers it includes, directly or not, relative to the project root.  The
+stub compiler in ``stubs/`` reads it instead of parsing includes, so a
+build costs Mint's own work plus one cheap process per command.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+# ---------------------------------------------------------------------------
+# C/C++ projects
+# ---------------------------------------------------------------------------
+
+MINT_YAML = """\
+name: bench
+cxxflags: [-Iinclude]
+cache: mint
+# No linker probes: the stub compiler cannot drive mold or lld.
+profiles:
+  debug: {linker: default}
+  release: {linker: default}
+"""
+
+
+LAYERS = 3
+
+
+def _nested(index: int, depth: int, width: int = 4) -> Path:
+    """Directory of the *index*-th file in a tree *depth* levels deep and *width* wide."""
+
+    return Path(*(f"d{index // width ** level % width}" for level in range(depth)))
+
+
+def generate_cpp(
+    root: Path, *, sources: int = 200, headers: int = 50, fanout: int = 8, depth: int = 2, seed: int = 1,
+) -> Dict[str, object]:
+    """Write a C++ project with *sources* TUs and *headers* headers under *root*.
+
+    Every source includes *fanout* headers.  Headers form three layers
+    (think utilities, components, APIs); each includes ``fanout // 4``
+    headers of the layer below.  Files are spread over a directory tree
+    *depth* levels deep.  Returns a summary including ``touch_header``, the
+    header with the median number of dependent TUs (a typical edit).
+    """
+
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "mint.yaml").write_text(MINT_YAML)
+    names = [Path("include") / _nested(i, depth) / f"h{i}.h" for i in range(headers)]
+    layer = [i * LAYERS // max(headers, 1) for i in range(headers)]
+    closure: List[List[int]] = []
+    for i, name in enumerate(names):
+        below = [j for j in range(i) if layer[j] == layer[i] - 1]
+        direct = rng.sample(below, min(len(below), fanout // 4))
+        deps = set(direct)
+        for d in direct:
+            deps.update(closure[d])
+        closure.append(sorted(deps))
+        _write(root / name, [names[d] for d in sorted(deps)], [names[d] for d in direct], f"int h{i}(int x);")
+    users = [0] * headers
+    for i in range(sources):
+        direct = rng.sample(range(headers), min(headers, fanout))
+        deps = set(direct)
+        for d in direct:
+            deps.update(closure[d])
+        for d in deps:
+            users[d] += 1
+        body = f"int f{i}(int x) {{ return x + {i}; }}" + ("\nint main() { return 0; }" if i == 0 else "")
+        _write(root / "src" / _nested(i, depth) / f"s{i}.cpp", [names[d] for d in sorted(deps)], [names[d] for d in direct], body)
+    by_users = sorted(range(headers), key=lambda h: users[h])
+    touch = by_users[len(by_users) // 2] if headers else None
+    return {
+        "sources": sources, "headers": headers, "fanout": fanout, "depth": depth, "seed": seed,
+        "touch_header": str(names[touch]) if touch is not None else None,
+        "touch_header_users": users[touch] if touch is not None else 0,
+        "max_header_users": max(users, default=0),
+    }
+
+
+def _write(path: Path, deps: List[Path], includes: List[Path], body: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f"// deps: {' '.join(map(str, deps))}"]
+    if path.suffix == ".h":
+        lines.append("#pragma once")
+    lines += [f'#include "{inc.relative_to("include")}"' for inc in includes]
+    lines.append(body)
+    path.write_text("\n".join(lines) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Projects for the fingerprinting toolchains
+# ---------------------------------------------------------------------------
+
+FILE_TEMPLATES = {
+    ".yaml": "name: file{i}\nvalues: [{i}, {j}, {k}]\nnested: {{key: value{i}}}\n",
+    ".rb": "def method{i}(x)\n  x + {i}\nend\n",
+}
+
+
+def generate_files(root: Path, suffix: str, *, count: int = 200, depth: int = 2) -> Dict[str, object]:
+    """Write *count* small ``*suffix`` files under *root*; returns a summary naming one to edit."""
+
+    template = FILE_TEMPLATES[suffix]
+    root.mkdir(parents=True, exist_ok=True)
+    first = None
+    for i in range(count):
+        path = root / _nested(i, depth) / f"file{i}{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(template.format(i=i, j=i * 2, k=i * 3))
+        first = first or path.relative_to(root)
+    return {"files": count, "depth": depth, "touch_file": str(first) if first else None}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic C++ project for benchmarking Mint")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--sources", type=int, default=200)
+    parser.add_argument("--headers", type=int, default=50)
+    parser.add_argument("--fanout", type=int, default=8, help="Headers included by every source")
+    parser.add_argument("--depth", type=int, default=2, help="Directory depth")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    summary = generate_cpp(
+        args.root, sources=args.sources, headers=args.headers, fanout=args.fanout, depth=args.depth, seed=args.seed,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
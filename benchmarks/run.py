@@ -0,0 +1,253 @@
+"""Measure Mint's own overhead on synthetic projects.
+
+Every build runs in a fresh interpreter (like a real ``mint`` invocation)
+against stub tools from ``stubs/`` that only write their outputs, so the
+numbers are Mint's planning, hashing, scheduling and bookkeeping plus
+one cheap process per command.  Scenarios, per tool:
+
+* ``full``  – empty build directory and object cache
+* ``noop``  – nothing changed since the last build
+* ``touch`` – one edit to a header included by a median number of
+  translation units (for the YAML/Ruby toolchains: to one source file)
+
+    python -m benchmarks.run --sources 500 --output results.json
+
+POSIX only (the stubs are shell scripts).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .generate import generate_cpp, generate_files
+
+REPO = Path(__file__).resolve().parent.parent
+STUBS = Path(__file__).resolve().parent / "stubs"
+
+TOOLS = ("builder", "cpp_toolchain", "configure", "yaml", "ruby_native")
+SCENARIOS = ("full", "noop", "touch")
+
+# Project kind per tool: the C++ project, or files with this suffix.
+_PROJECTS = {"builder": "cpp", "cpp_toolchain": "cpp", "configure": "cpp", "yaml": ".yaml", "ruby_native": ".rb"}
+
+# ---------------------------------------------------------------------------
+# One measured run (in the child process)
+# ---------------------------------------------------------------------------
+
+
+def drive(tool: str, root: Path, jobs: int | None) -> Dict[str, float]:
+    """Build *root* with *tool* once; returns the time spent in Mint and the number of commands run."""
+
+    from mint.utils import get_timings, set_jobs
+
+    os.chdir(root)
+    set_jobs(jobs)
+    build_dir = root / "build"
+    start = time.perf_counter()
+    if tool == "builder":
+        from mint.builder import Builder
+
+        # Like `mint build`: built-in object cache on.
+        Builder(root, build_dir=build_dir, use_cache=True).build()
+    elif tool == "configure":
+        from mint.cli import configure
+
+        configure(generator="ninja", ide=None)
+    else:
+        from mint.builder import BuildConfig
+        from mint.toolchains import get
+
+        config = BuildConfig.load(root / "mint.yaml").__dict__
+        tc = get("cpp" if tool == "cpp_toolchain" else tool)(root, build_dir, config=config)
+        tc.build()
+        tc._flush_cache()
+    return {"mint": time.perf_counter() - start, "commands": len(get_timings())}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def _env(cache_dir: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PATH"] = f"{STUBS}{os.pathsep}{env.get('PATH', '')}"
+    env["CXX"] = str(STUBS / "c++")
+    env["AR"] = str(STUBS / "ar")
+    env["MINT_CACHE_DIR"] = str(cache_dir)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO), env.get("PYTHONPATH")]))
+    return env
+
+
+def _measure(tool: str, root: Path, cache_dir: Path, jobs: int | None) -> Dict[str, float]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result = Path(f.name)
+    cmd = [sys.executable, "-m", "benchmarks.run", "--drive", tool, "--project", str(root), "--result", str(result)]
+    if jobs:
+        cmd += ["--jobs", str(jobs)]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=REPO, env=_env(cache_dir), capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    try:
+        if proc.returncode != 0:
+            raise RuntimeError(f"{tool} failed in {root}:\n{proc.stdout}{proc.stderr}")
+        return {"wall": round(wall, 4), **{k: round(v, 4) for k, v in json.loads(result.read_text()).items()}}
+    finally:
+        result.unlink(missing_ok=True)
+
+
+def measure_startup(repeat: int = 5) -> Dict[str, float]:
+    """Median wall time of a bare interpreter, ``mint version`` and ``mint --help``, and Mint's import time.
+
+    ``mint_imports`` sums the self time of Mint's own modules when
+    importing the CLI; ``cli_imports`` includes typer, rich and the rest.
+    """
+
+    env = _env(Path(tempfile.gettempdir()) / "mint-bench-cache")
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "version": [sys.executable, "-m", "mint", "version"],
+        "help": [sys.executable, "-m", "mint", "--help"],
+    }
+    result: Dict[str, float] = {}
+    for name, cmd in commands.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(cmd, cwd=REPO, env=env, capture_output=True, check=True)
+            samples.append(time.perf_counter() - start)
+        result[name] = round(statistics.median(samples), 4)
+    trace = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mint.cli"], cwd=REPO, env=env, capture_output=True, text=True,
+    ).stderr
+    own = cli = 0
+    for line in trace.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[0].startswith("import time:") or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name == "mint" or name.startswith("mint."):
+            own += int(parts[0].split(":")[1])
+        if name == "mint.cli":
+            cli = int(parts[1])
+    result["mint_imports"] = round(own / 1e6, 4)
+    result["cli_imports"] = round(cli / 1e6, 4)
+    return result
+
+
+def _edit(path: Path, n: int) -> None:
+    comment = "#" if path.suffix in (".yaml", ".rb") else "//"
+    with path.open("a") as f:
+        f.write(f"{comment} edit {n}\n")
+
+
+def run_benchmarks(
+    workdir: Path, *, tools=TOOLS, repeat: int = 3, jobs: int | None = None, sources: int = 200,
+    headers: int = 50, fanout: int = 8, depth: int = 2, startup: bool = True,
+) -> dict:
+    """Generate the projects under *workdir* and time every scenario *repeat* times per tool.
+
+    With *startup*, CLI start-up is measured too (see :func:`measure_startup`).
+    """
+
+    cpp = generate_cpp(workdir / "template-cpp", sources=sources, headers=headers, fanout=fanout, depth=depth)
+    files = {
+        suffix: generate_files(workdir / f"template{suffix}", suffix, count=sources, depth=depth)
+        for suffix in (".yaml", ".rb")
+    }
+    results = []
+    for tool in tools:
+        kind = _PROJECTS[tool]
+        root = workdir / tool
+        shutil.copytree(workdir / f"template-{kind}" if kind == "cpp" else workdir / f"template{kind}", root)
+        touch = root / (cpp["touch_header"] if kind == "cpp" else files[kind]["touch_file"])
+        cache_dir = workdir / f"cache-{tool}"
+        runs: Dict[str, List[Dict[str, float]]] = {s: [] for s in SCENARIOS}
+        for n in range(repeat):
+            shutil.rmtree(root / "build", ignore_errors=True)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            runs["full"].append(_measure(tool, root, cache_dir, jobs))
+            runs["noop"].append(_measure(tool, root, cache_dir, jobs))
+            _edit(touch, n)
+            runs["touch"].append(_measure(tool, root, cache_dir, jobs))
+        for scenario, samples in runs.items():
+            results.append({
+                "tool": tool, "scenario": scenario, "runs": samples,
+                "median_wall": round(statistics.median(s["wall"] for s in samples), 4),
+                "median_mint": round(statistics.median(s["mint"] for s in samples), 4),
+                "commands": samples[-1]["commands"],
+            })
+    from mint import __version__
+
+    return {
+        "mint_version": __version__, "python": platform.python_version(), "platform": platform.platform(),
+        "cpus": os.cpu_count(), "jobs": jobs, "repeat": repeat, "project": cpp, "results": results,
+        "startup": measure_startup() if startup else None,
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Mint's overhead with stub compilers")
+    parser.add_argument("--sources", type=int, default=200, help="Translation units (files for YAML/Ruby)")
+    parser.add_argument("--headers", type=int, default=50)
+    parser.add_argument("--fanout", type=int, default=8, help="Headers included by every source")
+    parser.add_argument("--depth", type=int, default=2, help="Directory depth")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", "-j", type=int, default=None)
+    parser.add_argument("--tools", default=",".join(TOOLS), help=f"Comma-separated subset of {', '.join(TOOLS)}")
+    parser.add_argument("--output", "-o", type=Path, default=None, help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--no-startup", action="store_true", help="Skip the CLI start-up measurement")
+    parser.add_argument("--keep", type=Path, default=None, help="Generate the projects here and keep them")
+    parser.add_argument("--drive", choices=TOOLS, help=argparse.SUPPRESS)
+    parser.add_argument("--project", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.drive:
+        args.result.write_text(json.dumps(drive(args.drive, args.project, args.jobs)))
+        return
+    tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    unknown = set(tools) - set(TOOLS)
+    if unknown:
+        parser.error(f"unknown tool(s): {', '.join(sorted(unknown))}")
+    with tempfile.TemporaryDirectory(prefix="mint-bench-") as tmp:
+        workdir = args.keep or Path(tmp)
+        if args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+        report = run_benchmarks(
+            workdir, tools=tools, repeat=args.repeat, jobs=args.jobs, sources=args.sources,
+            headers=args.headers, fanout=args.fanout, depth=args.depth, startup=not args.no_startup,
+        )
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(text)
+    else:
+        sys.stdout.write(text)
+    if report["startup"]:
+        st = report["startup"]
+        print(
+            f"{'startup':>14} python {st['python']:.3f}s, mint version {st['version']:.3f}s, "
+            f"mint --help {st['help']:.3f}s; imports: mint {st['mint_imports']:.3f}s, CLI {st['cli_imports']:.3f}s",
+            file=sys.stderr,
+        )
+    for r in report["results"]:
+        print(
+            f"{r['tool']:>14} {r['scenario']:<5} {r['median_wall']:8.3f}s wall {r['median_mint']:8.3f}s in mint "
+            f"{r['commands']:6d} command(s)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,36 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import os
 import shutil
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+import time
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Sequence, Set, Tuple
 
 import yaml
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from .utils import MintError, detect_compiler, default_build_dir, run
+from .cache import ObjectCache, preprocess_command
+from .compdb import CompileDatabase
+from .depgraph import DepGraph
+from .fileindex import file_index
+from .history import BuildHistory
+from .includes import IncludeScanner, include_dirs, include_report
+from .jobstats import JobStats
+from .linker import compile_flags, link_flags, load_profile
+from .pch import C_EXTS, PchManager, is_clang, shares_prefix
+from .remote_cache import remote_cache_from_config
+from .scheduler import Job, Scheduler
+from .trace import span
+from .targets import SOURCE_EXTS, Target, link_closure, load_targets
+from .unity import DEFAULT_BATCH_SIZE, UnityPlanner
+from .worker import WorkerPool, remote_args
+from .utils import CommandResult, MintError, available_memory, check_keys, detect_compiler, default_build_dir, get_jobs, run_async
 
 console = Console()
 
@@ -26,6 +43,13 @@ class BuildConfig:
         self.cxxflags: List[str] = []
         self.ldflags: List[str] = []
         self.targets: List[Dict] = []
+        self.pch: str | List[str] | None = None
+        self.unity: bool | Dict | None = None
+        self.cache: str | None = None
+        self.cache_dir: str | None = None
+        self.cache_max_size: str | int | None = None
+        self.profiles: Dict[str, Dict] = {}
+        self.remote_cache: str | Dict | None = None
         if data:
             self.__dict__.update(data)
 
@@ -34,19 +58,8 @@ class BuildConfig:
         if path.exists():
             data = yaml.safe_load(path.read_text()) or {}
             # Validate top-level keys and suggest corrections for typos.
-            allowed = {"name", "cxxflags", "ldflags", "targets", "profiles"}
-            unknown = [k for k in data.keys() if k not in allowed]
-            if unknown:
-                from difflib import get_close_matches
-
-                lines = []
-                for key in unknown:
-                    suggestion = get_close_matches(key, allowed, n=1)
-                    if suggestion:
-                        lines.append(f"Unknown key '{key}'. Did you mean '{suggestion[0]}'?")
-                    else:
-                        lines.append(f"Unknown key '{key}'.")
-                raise MintError("\n".join(lines))
+            allowed = {"name", "cxxflags", "ldflags", "targets", "profiles", "pch", "unity", "cache", "cache_dir", "cache_max_size", "remote_cache"}
+            check_keys(data, allowed)
 
             return BuildConfig(data)
         return BuildConfig()
@@ -61,6 +74,12 @@ class Builder:
         release: bool = False,
         config: BuildConfig | None = None,
         use_sccache: bool = False,
+        use_cache: bool = False,
+        unity: bool = False,
+        memory_budget: int | None = None,
+        time_trace: bool = False,
+        workers: Sequence[str] = (),
+        keep_going: int | None = None,
     ):
         self.project_root = project_root
         self.build_dir = build_dir or default_build_dir(project_root)
@@ -69,26 +88,91 @@ class Builder:
         self.release = release
         self.config = config or BuildConfig()
         self.compiler = detect_compiler()
+        self.profile = load_profile(self.config.profiles, release)
         self.cxxflags = ["-std=c++20"] + (self.config.cxxflags or [])
         if release:
             self.cxxflags += ["-O3"]
         else:
             self.cxxflags += ["-O0", "-g"]
-        self.ldflags = self.config.ldflags or []
-        self.compile_commands: List[Dict] = []
+        self.cxxflags += compile_flags(self.profile) + (self.profile.get("cxxflags") or [])
+        if time_trace:
+            # Part of the command, so toggling it recompiles and the traces exist for every TU.
+            # Only clang writes a JSON trace next to the object.
+            if is_clang(self.compiler):
+                self.cxxflags.append("-ftime-trace")
+            else:
+                console.print(
+                    f"[yellow]--time-trace needs clang; {self.compiler} has no per-header/template "
+                    "timing (GCC's -ftime-report is phase totals only). Set CXX=clang++ to use it.[/]"
+                )
+        self.ldflags = (self.config.ldflags or []) + (self.profile.get("ldflags") or [])
+        self.compdb = CompileDatabase(self.build_dir)
         self.use_sccache = use_sccache
+        self.depgraph = DepGraph(self.build_dir)
+        self.cache: ObjectCache | None = None
+        if use_cache and not use_sccache:
+            self.cache = ObjectCache(
+                self.config.cache_dir, self.config.cache_max_size, remote=remote_cache_from_config(self.config.remote_cache),
+            )
+        self.pch = PchManager(self.compiler, project_root, self.build_dir, self.depgraph)
+        self._pch: Dict[str, Tuple[List[str], Path | None]] = {}
+        self._pch_users: Set[Path] = set()
+        unity_cfg = self.config.unity
+        self._unity_opts: Dict | None = None
+        if unity or unity_cfg:
+            self._unity_opts = unity_cfg if isinstance(unity_cfg, dict) else {}
+        self._planners: Dict[str, UnityPlanner] = {}
+        self._batches: Dict[str, Dict[str, List[Path]]] = {}
+        self._unit_members: Dict[Path, List[Path]] = {}
+        self._targets: Dict[str, Target] = {}
+        self.jobstats = JobStats(self.build_dir)
+        self.history = BuildHistory(self.build_dir)
+        # str(obj) -> (reason, changed input) of the units planned for compiling.
+        self._reasons: Dict[str, Tuple[str, str | None]] = {}
+        # path -> time of its last edit; TUs touching recent edits compile first (set by mint daemon).
+        self.recent: Dict[str, float] = {}
+        self.memory_budget = memory_budget
+        # host:port of `mint worker`s to offload compiles to.
+        self.workers = [w.strip() for w in workers if w.strip()]
+        self._pool: WorkerPool | None = None
+        # None: stop at the first failure; N: after N failures (0: never), reporting all of them.
+        self.keep_going = keep_going
 
     # ---------------------------------------------------------------------
     # Public API
     # ---------------------------------------------------------------------
-    def build(self) -> None:
+    def build(self) -> List[Path]:
         console.rule("[bold cyan]Mint Build Start")
         self._prepare_dirs()
-        sources = self._discover_sources()
-        objects = self._compile_sources(sources)
-        exe = self._link(objects)
-        self._write_compile_commands()
-        console.print(f"\n[bold green]✓ Build succeeded[/] -> {exe.relative_to(self.project_root)}")
+        with span("discover sources"):
+            targets = self._load_targets()
+        with span("precompiled headers"):
+            self._prepare_pch(targets)
+        outputs = self._build_targets(targets)
+        if self.cache:
+            if self.cache.hits or self.cache.misses:
+                remote = f" ({self.cache.remote_hits} remote)" if self.cache.remote else ""
+                console.print(f"[blue]Cache:[/] {self.cache.hits} hit(s){remote}, {self.cache.misses} miss(es)")
+            self.cache.flush()
+        built = ", ".join(str(out.relative_to(self.project_root)) for out in outputs)
+        console.print(f"\n[bold green]✓ Build succeeded[/] -> {built}")
+        return outputs
+
+    def analyze_includes(self, top: int = 20) -> dict:
+        """Include-graph impact report over every source of the build (see :func:`include_report`).
+
+        Compile costs come from the job history of earlier builds.
+        """
+
+        targets = self._load_targets()
+        dirs: List[Path] = [self.project_root]
+        for t in targets:
+            dirs += [d for d in include_dirs(self._flags(t), self.project_root) if d not in dirs]
+        sources = [src for t in targets for src in t.sources]
+        return include_report(
+            sources, IncludeScanner(dirs), lambda src: self.jobstats.duration(self._job_key(src)),
+            root=self.project_root, top=top,
+        )
 
     def clean(self) -> None:
         if self.build_dir.exists():
@@ -105,80 +189,370 @@ class Builder:
         self.bin_dir.mkdir(parents=True, exist_ok=True)
 
     def _discover_sources(self) -> List[Path]:
-        exts = {".cpp", ".c", ".cc", ".cxx"}
-        sources: List[Path] = [p for p in self.project_root.rglob("*") if p.suffix in exts and "build" not in p.parts]
+        sources = file_index(self.project_root, self.build_dir).with_suffix(*SOURCE_EXTS)
         if not sources:
             raise MintError("No source files found")
-        return sorted(sources)
+        return sources
+
+    def _load_targets(self) -> List[Target]:
+        if self.config.targets:
+            targets = load_targets(self.config.targets, self.project_root, self.build_dir)
+        else:
+            # Zero-config: every source goes into one executable.
+            targets = [Target(self.config.name or self.project_root.name, "executable", self._discover_sources())]
+        self._targets = {t.name: t for t in targets}
+        return targets
+
+    def _target_obj_dir(self, target: Target) -> Path:
+        # Targets may compile the same source with different flags.
+        return self.obj_dir / target.name if self.config.targets else self.obj_dir
+
+    def _prepare_pch(self, targets: List[Target]) -> None:
+        sources = list(dict.fromkeys(src for t in targets for src in t.sources))
+        headers = self.pch.resolve_headers(self.config.pch, sources)
+        self._pch.clear()
+        tus = [src for src in sources if src.suffix not in C_EXTS]
+        self._pch_users = {src for src in tus if headers and shares_prefix(src, headers, self.project_root)}
+        if not self._pch_users:
+            return
+        for t in targets:
+            if self._pch_users.intersection(t.sources):
+                self._pch[t.name] = self.pch.ensure(headers, self._flags(t))
+        console.print(f"[blue]Precompiled header:[/] {len(headers)} header(s), used by {len(self._pch_users)} of {len(tus)} C++ TU(s)")
+
+    def _pch_for(self, target: Target, src: Path) -> Tuple[List[str], Path | None]:
+        """PCH flags and file for TU *src*: only TUs that include every PCH header get them.
+
+        A unity batch uses the PCH when one of its members does; the other
+        members share that TU anyway.
+        """
+
+        members = self._unit_members.get(src, [src])
+        if target.name not in self._pch or self._pch_users.isdisjoint(members):
+            return [], None
+        return self._pch[target.name]
+
+    def _flags(self, target: Target | None = None) -> List[str]:
+        flags = list(self.cxxflags)
+        if self.cache:
+            # Location-independent objects, so other worktrees can share them.
+            flags.insert(0, f"-ffile-prefix-map={self.project_root}=.")
+        if target is not None:
+            if target.pic:
+                flags.append("-fPIC")
+            flags += target.cxxflags
+        return flags
 
-    def _object_path(self, src: Path) -> Path:
+    def _planner(self, target: Target) -> UnityPlanner:
+        if target.name not in self._planners:
+            opts = self._unity_opts or {}
+            self._planners[target.name] = UnityPlanner(
+                self.project_root, self.build_dir, self.depgraph,
+                batch_size=int(opts.get("batch_size", DEFAULT_BATCH_SIZE)),
+                max_bytes=int(opts["max_bytes"]) if opts.get("max_bytes") else None,
+                subdir=target.name if self.config.targets else None,
+            )
+        return self._planners[target.name]
+
+    def _plan_units(self, target: Target) -> List[Tuple[Path, Path]]:
+        """Map sources to ``(translation unit, object)`` pairs, batching them in unity mode."""
+
+        obj_dir = self._target_obj_dir(target)
+        if self._unity_opts is None:
+            return [(src, self._object_path(src, obj_dir)) for src in target.sources]
+        planner = self._planner(target)
+        batches, singles = planner.plan(target.sources)
+        self._batches[target.name] = batches
+        units = [(src, self._object_path(src, obj_dir)) for src in singles]
+        for name, members in sorted(batches.items()):
+            unit = planner.write_source(name, members)
+            self._unit_members[unit] = members
+            units.append((unit, obj_dir / ".unity" / f"{name}.o"))
+        if batches:
+            console.print(
+                f"[blue]Unity ({target.name}):[/] {sum(map(len, batches.values()))} file(s) in "
+                f"{len(batches)} batch(es), {len(singles)} compiled separately"
+            )
+        return units
+
+    def _object_path(self, src: Path, obj_dir: Path | None = None) -> Path:
         rel = src.relative_to(self.project_root)
         obj_name = rel.with_suffix(".o")
-        return self.obj_dir / obj_name
-
-    def _needs_rebuild(self, src: Path, obj: Path) -> bool:
-        if not obj.exists():
-            return True
-        return src.stat().st_mtime > obj.stat().st_mtime
-
-    def _compile_sources(self, sources: List[Path]) -> List[Path]:
-        objects: List[Path] = []
-        compile_tasks = {}
-        with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True) as progress:
-            task_id = progress.add_task("Compiling", total=len(sources))
-            with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
-                for src in sources:
-                    obj = self._object_path(src)
-                    obj.parent.mkdir(parents=True, exist_ok=True)
-                    if not self._needs_rebuild(src, obj):
-                        progress.advance(task_id)
-                        objects.append(obj)
-                        continue
-                    fut = pool.submit(self._compile_single, src, obj)
-                    compile_tasks[fut] = (src, obj)
-                for fut in as_completed(compile_tasks):
-                    src, obj = compile_tasks[fut]
-                    try:
-                        fut.result()
-                        objects.append(obj)
-                    except Exception as e:
-                        console.print(f"[red]Error compiling {src}: {e}")
-                        raise
-                    finally:
+        return (obj_dir or self.obj_dir) / obj_name
+
+    def _depfile_path(self, obj: Path) -> Path:
+        return obj.with_suffix(".d")
+
+    def _rebuild_reason(self, src: Path, obj: Path, cmd: List[str]) -> Tuple[str, str | None] | None:
+        # Compares the content of the source, every header it included last
+        # time and the exact compile command against the stored signature.
+        return self.depgraph.rebuild_reason(obj, src, cmd)
+
+    def _job_key(self, src: Path) -> str:
+        try:
+            return str(src.relative_to(self.project_root))
+        except ValueError:
+            return str(src)
+
+    def _urgency(self, src: Path, obj: Path) -> float:
+        if not self.recent:
+            return 0.0
+        return max((self.recent.get(str(p), 0.0) for p in [src, *self.depgraph.deps(obj)]), default=0.0)
+
+    def _build_targets(self, targets: List[Target]) -> List[Path]:
+        """Compile and link all targets as one job graph.
+
+        Compiles of every target share the scheduler; a target's link
+        starts as soon as its own objects and the libraries it links
+        against are done.  Returns the outputs, dependencies first.
+        """
+
+        budget = self.memory_budget if self.memory_budget is not None else available_memory()
+        slots = get_jobs()
+        if self.workers:
+            self._pool = WorkerPool(self.workers, self.compiler)
+            self._pool.start()
+            # Remote slots bring their own memory; preprocessing stays local and is light.
+            slots += self._pool.slots
+            if budget is not None:
+                budget += self._pool.slots * self.jobstats.rss("")
+        scheduler = Scheduler(slots, budget)
+        failures: List[str] = []
+        try:
+            with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True) as progress:
+                task_id = progress.add_task("Building", total=None)
+                with span("check dirty units"):
+                    planned, what, total = self._plan_jobs(targets)
+                progress.update(task_id, total=total, completed=total - len(planned))
+                finished = 0
+                # Leaving the loop early cancels the running jobs and kills their compilers.
+                with closing(scheduler.run(planned)) as results:
+                    for job, fut in results:
+                        finished += 1
                         progress.advance(task_id)
-        return objects
+                        try:
+                            fut.result()
+                        except Exception as e:
+                            console.print(f"[red]Error {what[job]}: {e}")
+                            if self.keep_going is None:
+                                raise
+                            failures.append(what[job])
+                            if len(failures) == self.keep_going:
+                                break
+            if failures:
+                self._report_failures(failures, len(planned) - finished)
+            for name, batches in self._batches.items():
+                for members in batches.values():
+                    self._planners[name].mark_built(members)
+        finally:
+            with span("save state"):
+                for planner in self._planners.values():
+                    planner.save()
+                # Persist deps of whatever did compile, even if another TU failed.
+                self.depgraph.save()
+                self.jobstats.save()
+                self._write_compile_commands()
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+        return [t.output(self.build_dir) for t in targets]
 
-    def _compile_single(self, src: Path, obj: Path):
-        cmd = [self.compiler, "-c", *self.cxxflags, "-I", str(self.project_root), "-o", str(obj), str(src)]
-        if self.use_sccache:
-            cmd.insert(0, "sccache")
-        run(cmd)
-        self.compile_commands.append({
-            "directory": str(self.project_root),
-            "file": str(src),
-            "command": " ".join(cmd),
-        })
-
-    def _link(self, objects: List[Path]) -> Path:
-        output = self.bin_dir / (self.config.name or self.project_root.name)
-        cmd = [self.compiler, "-o", str(output), *map(str, objects), *self.ldflags]
+    def _report_failures(self, failures: List[str], not_run: int) -> None:
+        console.rule(f"[red]{len(failures)} job(s) failed")
+        for failure in failures:
+            console.print(f"[red]✗[/] {failure}")
+        if not_run:
+            console.print(f"[yellow]{not_run} job(s) not run (they depend on failed ones or the limit was reached)[/]")
+        raise MintError(f"{len(failures)} job(s) failed")
+
+    def _plan_jobs(self, targets: List[Target]) -> Tuple[List[Job], Dict[Job, str], int]:
+        """Compile jobs for the out-of-date units plus one link job per target.
+
+        Returns ``(jobs, descriptions, number of units and links)``.
+        """
+
+        jobs: List[Job] = []
+        what: Dict[Job, str] = {}
+        links: Dict[str, Job] = {}
+        units: List[Path] = []
+        total = 0
+        self._reasons.clear()
+        for target in targets:
+            objects: List[Path] = []
+            compiles: List[Job] = []
+            for src, obj in self._plan_units(target):
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                objects.append(obj)
+                cmd = self._compile_command(target, src, obj)
+                self.compdb.update(self.project_root, src, obj, cmd)
+                reason = self._rebuild_reason(src, obj, cmd)
+                if reason is None:
+                    continue
+                self._reasons[str(obj)] = reason
+                key = self._job_key(src)
+                job = Job(
+                    key, self._compile_single, target, src, obj, cmd,
+                    rss=self.jobstats.rss(key), cost=self.jobstats.duration(key), urgency=self._urgency(src, obj),
+                )
+                what[job] = f"compiling {src}"
+                compiles.append(job)
+            units += objects + self._record_unity_members(target)
+            key = f"link:{target.name}"
+            deps = compiles + [links[lib.name] for lib in link_closure(target, self._targets)]
+            link = Job(
+                key, self._link, target, objects,
+                rss=self.jobstats.rss(key), cost=self.jobstats.duration(key), deps=deps,
+            )
+            what[link] = f"linking {target.name}"
+            links[target.name] = link
+            jobs += compiles + [link]
+            total += len(objects) + 1
+        self.compdb.retain(units)
+        return jobs, what, total
+
+    def _compile_command(self, target: Target, src: Path, obj: Path) -> List[str]:
+        pch_flags = self._pch_for(target, src)[0]
+        cmd = [
+            self.compiler, "-c", *self._flags(target), *pch_flags, "-I", str(self.project_root),
+            "-MMD", "-MF", str(self._depfile_path(obj)), "-o", str(obj), str(src),
+        ]
         if self.use_sccache:
             cmd.insert(0, "sccache")
-        run(cmd)
+        return cmd
+
+    async def _compile_single(self, target: Target, src: Path, obj: Path, cmd: List[str]):
+        key = self._job_key(src)
+        reason, cause = self._reasons.pop(str(obj), (None, None))
+        start = time.perf_counter()
+        result, cache = None, None
+        try:
+            with span(f"compile {key}", "compile", file=str(src), target=target.name, toolchain="cpp") as info:
+                remote = self._remote(src, obj, cmd)
+                if self.cache:
+                    hit, result = await self.cache.compile_async(cmd, obj, self.project_root, remote)
+                    cache = info["cache"] = "hit" if hit else "miss"
+                else:
+                    if remote is not None and self._pool.idle():
+                        # The -E run also writes the depfile.
+                        pp = await run_async(preprocess_command(cmd, obj), capture=True)
+                        result = await asyncio.to_thread(remote, pp.stdout) if pp is not None else None
+                    if result is None:
+                        result = await run_async(cmd)
+        except Exception:
+            self._record_history("compile", key, start, None, reason, cause, ok=False)
+            raise
+        self._record_history("compile", key, start, result, reason, cause, cache=cache)
+        if result is not None:
+            self.jobstats.record(key, rss=result.max_rss, sec=result.duration)
+        if result is None and cache != "hit":
+            return  # dry run: nothing was built, the old depfile must not vouch for it
+        pch_file = self._pch_for(target, src)[1]
+        extra = [pch_file] if pch_file else []
+        # Parses the depfile and re-hashes changed headers: not on the loop.
+        await asyncio.to_thread(self.depgraph.record, obj, src, self._depfile_path(obj), cmd, Path.cwd(), extra)
+
+    def _record_history(
+        self, kind: str, key: str, start: float, result: CommandResult | None, reason: str | None,
+        cause: str | None, *, cache: str | None = None, ok: bool = True,
+    ) -> None:
+        if cause is not None:
+            cause = self._job_key(Path(cause))
+        self.history.record(
+            kind, key, sec=time.perf_counter() - start, cpu=result.cpu_time if result else 0.0,
+            rss=result.max_rss if result else 0, cache=cache, reason=reason, cause=cause, ok=ok,
+        )
+
+    def _remote(self, src: Path, obj: Path, cmd: List[str]) -> Callable[[bytes], CommandResult | None] | None:
+        """Compiles preprocessed *src* on a worker, or None without usable workers."""
+
+        pool = self._pool
+        if pool is None or not pool.slots or remote_args(cmd) is None:
+            return None
+        lang = "c" if src.suffix in C_EXTS else "c++"
+        return lambda pp: pool.compile(cmd, obj, pp, lang, f"compile {self._job_key(src)}")
+
+    def _record_unity_members(self, target: Target) -> List[Path]:
+        # Editors need the real sources, not just the generated unity TUs.
+        obj_dir = self._target_obj_dir(target)
+        objects = []
+        for members in self._batches.get(target.name, {}).values():
+            for src in members:
+                obj = self._object_path(src, obj_dir)
+                self.compdb.update(self.project_root, src, obj, self._compile_command(target, src, obj))
+                objects.append(obj)
+        return objects
+
+    async def _link(self, target: Target, objects: List[Path]) -> Path:
+        with span(f"link {target.name}", "link", target=target.name, toolchain="cpp") as info:
+            output = await self._link_target(target, objects)
+            info["output"] = str(output)
+        return output
+
+    async def _link_target(self, target: Target, objects: List[Path]) -> Path:
+        output = target.output(self.build_dir)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        inputs = list(objects)
+        if target.type == "static":
+            cmd = [os.getenv("AR", "ar"), "rcs", str(output), *map(str, objects)]
+            label = f"archive {output.name}"
+        else:
+            closure = link_closure(target, self._targets)
+            libs = [lib.output(self.build_dir) for lib in closure]
+            inputs += libs
+            extra, linker = link_flags(self.compiler, self.profile)
+            cmd = [self.compiler, *extra, *(["-shared"] if target.type == "shared" else []), "-o", str(output)]
+            cmd += [*map(str, objects), *map(str, libs)]
+            if any(lib.type == "shared" for lib in closure) and sys.platform != "win32":
+                origin = "@loader_path" if sys.platform == "darwin" else "$ORIGIN"
+                rel = os.path.relpath(self.build_dir / "lib", output.parent)
+                cmd.append(f"-Wl,-rpath,{origin}/{rel}")
+            # Link flags of static libraries (e.g. -lpthread) carry over to their users.
+            cmd += [*self.ldflags, *target.ldflags, *(f for lib in closure if lib.type == "static" for f in lib.ldflags)]
+            if self.use_sccache:
+                cmd.insert(0, "sccache")
+            label = f"link {output.name} ({linker})"
+        # Same inputs by content and same command: the output would not change.
+        # (Hashing large objects would stall every other job on the loop.)
+        why = await asyncio.to_thread(self.depgraph.outdated_reason, output, inputs, cmd)
+        if why is None:
+            return output
+        if target.type == "static":
+            # ar would keep members of objects that no longer exist.
+            output.unlink(missing_ok=True)
+        start = time.perf_counter()
+        try:
+            result = await run_async(cmd, label=label)
+        except Exception:
+            self._record_history("link", target.name, start, None, *why, ok=False)
+            raise
+        self._record_history("link", target.name, start, result, *why)
+        if result is not None:
+            self.jobstats.record(f"link:{target.name}", rss=result.max_rss, sec=result.duration)
+            await asyncio.to_thread(self.depgraph.record_output, output, inputs, cmd)
         return output
 
     def _write_compile_commands(self):
-        cc_json_build = self.build_dir / "compile_commands.json"
-        data = json.dumps(self.compile_commands, indent=2)
-        cc_json_build.write_text(data)
+        changed = self.compdb.save()
+        cc_json_build = self.compdb.path
+        if not cc_json_build.exists():
+            return
 
-        # Also write (or symlink) to project root for IDEs like clangd.
+        # Also expose it in the project root for IDEs like clangd.
         cc_json_root = self.project_root / "compile_commands.json"
         try:
-            if cc_json_root.exists():
-                cc_json_root.unlink()
+            target = cc_json_build.relative_to(self.project_root)
+        except ValueError:
+            target = cc_json_build
+        if cc_json_root.is_symlink() and Path(os.readlink(cc_json_root)) == target:
+            return
+        try:
             # Prefer symlink to avoid duplication and keep paths identical.
-            cc_json_root.symlink_to(cc_json_build.relative_to(self.project_root))
+            cc_json_root.unlink(missing_ok=True)
+            cc_json_root.symlink_to(target)
         except (OSError, NotImplementedError):
-            # Fallback: copy
-            cc_json_root.write_text(data) 
\ No newline at end of file
+            # Fallback: copy, again only when it changed.
+            if not changed and cc_json_root.exists():
+                return
+            tmp = cc_json_root.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(cc_json_build.read_text())
+            os.replace(tmp, cc_json_root) 
\ No newline at end of file
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .remote_cache import RemoteCache
+from .timetrace import trace_path
+from .utils import CommandResult, executor, fingerprint, parse_size, run_async
+from .worker import compiler_banner
+
+# ---------------------------------------------------------------------------
+# Local content-addressed object cache
+# ---------------------------------------------------------------------------
+
+DEFAULT_MAX_SIZE = 5 * 1024 ** 3
+
+# Linux ioctl for copy-on-write clones (btrfs, xfs, bcachefs …).
+_FICLONE = 0x40049409
+
+
+def default_cache_dir() -> Path:
+    if os.getenv("MINT_CACHE_DIR"):
+        return Path(os.environ["MINT_CACHE_DIR"]).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or (Path.home() / ".cache")
+    return Path(base) / "mint"
+
+
+def materialize(src: Path, dst: Path) -> None:
+    """Create *dst* with the content of *src*: reflink, else hardlink, else copy."""
+
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    shutil.copyfile(src, dst)
+
+
+class ObjectCache:
+    """Compiler output cache keyed by preprocessed source, compiler identity and flags.
+
+    Entries live under ``<root>/objects/<xx>/<key>.o`` (plus ``<key>.dwo``
+    for split DWARF and ``<key>.json`` for clang time traces).  An entry's mtime is
+    bumped on every hit, so pruning the oldest entries gives LRU eviction.
+    Hits are materialised by reflink or hardlink, which is why compiles
+    always unlink the previous object first instead of overwriting it.
+
+    With a *remote* cache, local misses are looked up there (and kept
+    locally once found) and new entries are uploaded.  Keys then identify
+    the compiler by its ``--version`` banner rather than its path and
+    mtime, so they match across machines.
+    """
+
+    def __init__(
+        self, root: Path | None = None, max_size: int | str | None = None, remote: RemoteCache | None = None,
+    ):
+        self.root = Path(root).expanduser() if root else default_cache_dir()
+        if max_size is None:
+            max_size = os.getenv("MINT_CACHE_SIZE", DEFAULT_MAX_SIZE)
+        self.max_size = parse_size(max_size)
+        self.hits = 0
+        self.misses = 0
+        self._added = 0
+        self._lock = threading.Lock()
+        self._identities: Dict[str, str] = {}
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self.remote = remote
+        self.remote_hits = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def _compiler_identity(self, compiler: str) -> str:
+        """Resolved path, size, mtime and ``--version`` banner of *compiler*."""
+
+        with self._lock:
+            if compiler in self._identities:
+                return self._identities[compiler]
+        if self.remote is not None:
+            identity = hashlib.sha256(compiler_banner(compiler).encode()).hexdigest()
+            with self._lock:
+                self._identities[compiler] = identity
+            return identity
+        exe = shutil.which(compiler) or compiler
+        try:
+            st = os.stat(exe)
+            stamp = f"{os.path.realpath(exe)}:{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            stamp = exe
+        identity = hashlib.sha256(f"{stamp}\0{compiler_banner(compiler)}".encode()).hexdigest()
+        with self._lock:
+            self._identities[compiler] = identity
+        return identity
+
+    def _file_hash(self, path: str) -> str:
+        st = os.stat(path)
+        memo = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if memo in self._file_hashes:
+                return self._file_hashes[memo]
+        digest = fingerprint(Path(path))
+        with self._lock:
+            self._file_hashes[memo] = digest
+        return digest
+
+    def key(self, cmd: List[str], preprocessed: bytes, root: Path) -> str:
+        """Cache key for compile *cmd* given its preprocessor output.
+
+        Output paths are left out and the project root is normalised so the
+        same sources in another worktree share entries.  A binary PCH does
+        not show up in the preprocessor output, so its content is hashed.
+        """
+
+        h = hashlib.sha256()
+        h.update(self._compiler_identity(cmd[0]).encode())
+        root_s = str(root)
+        prev = None
+        for arg in cmd[1:-1]:
+            if prev in ("-o", "-MF", "-MT"):
+                prev = None
+                continue
+            if prev == "-include-pch":
+                h.update(b"\0" + self._file_hash(arg).encode())
+            elif arg not in ("-o", "-MF", "-MT"):
+                h.update(b"\0" + arg.replace(root_s, ".").encode())
+            prev = arg
+        h.update(b"\0" + Path(cmd[-1]).suffix.encode() + b"\0")
+        h.update(preprocessed.replace(root_s.encode(), b"."))
+        return h.hexdigest()
+
+    def _entry(self, key: str, suffix: str = ".o") -> Path:
+        return self.root / "objects" / key[:2] / f"{key}{suffix}"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+    def fetch(self, key: str, obj: Path, side_outputs: Sequence[Path] = ()) -> bool:
+        outputs = (obj, *side_outputs)
+        try:
+            for out in outputs:
+                entry = self._entry(key, out.suffix)
+                materialize(entry, out)
+                os.utime(entry)
+        except OSError:
+            if self.remote is None or not self.remote.fetch(key, {out.suffix[1:]: out for out in outputs}):
+                with self._lock:
+                    self.misses += 1
+                return False
+            self._store_local(key, obj, side_outputs)
+            with self._lock:
+                self.remote_hits += 1
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, obj: Path, side_outputs: Sequence[Path] = ()) -> None:
+        self._store_local(key, obj, side_outputs)
+        if self.remote is not None and obj.exists():
+            outputs = [out for out in (obj, *side_outputs) if out.exists()]
+            self.remote.store(key, {out.suffix[1:]: out for out in outputs})
+
+    def _store_local(self, key: str, obj: Path, side_outputs: Sequence[Path] = ()) -> None:
+        for out in (*side_outputs, obj):  # object last: fetch treats it as the entry
+            entry = self._entry(key, out.suffix)
+            if entry.exists() or not out.exists():
+                continue
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                materialize(out, tmp)
+                os.replace(tmp, entry)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+                return
+            with self._lock:
+                self._added += entry.stat().st_size
+
+    def compile(
+        self, cmd: List[str], obj: Path, root: Path,
+        remote: Callable[[bytes], CommandResult | None] | None = None,
+    ) -> Tuple[bool, CommandResult | None]:
+        """Blocking form of :meth:`compile_async`."""
+
+        return executor().call(self.compile_async(cmd, obj, root, remote))
+
+    async def compile_async(
+        self, cmd: List[str], obj: Path, root: Path,
+        remote: Callable[[bytes], CommandResult | None] | None = None,
+    ) -> Tuple[bool, CommandResult | None]:
+        """Produce *obj* for compile *cmd*, from the cache when possible.
+
+        The preprocessor run also writes the depfile requested in *cmd*, so
+        dependency tracking works on hits too.  With ``-gsplit-dwarf`` the
+        ``.dwo`` next to the object is cached along with it, as is the
+        clang time trace with ``-ftime-trace``.  On a miss *remote*, if
+        given, may compile the preprocessed source elsewhere (on a helper
+        thread); it returns None to have it compiled locally after all.  Returns
+        ``(hit, result)`` where *result* is that of the compiler run (None
+        on a hit).
+        """
+
+        pp = await run_async(preprocess_command(cmd, obj), capture=True)
+        if pp is None:  # dry-run
+            return False, await run_async(cmd)
+        # Hashing, copying and remote requests block: on the loop they would
+        # stall every other job (pipes undrained, exits unreaped).
+        key = await asyncio.to_thread(self.key, cmd, pp.stdout, root)
+        side_outputs = [obj.with_suffix(".dwo")] if "-gsplit-dwarf" in cmd else []
+        if "-ftime-trace" in cmd:
+            side_outputs.append(trace_path(obj))
+        if await asyncio.to_thread(self.fetch, key, obj, side_outputs):
+            return True, None
+        for out in (obj, *side_outputs):
+            out.unlink(missing_ok=True)
+        result = await asyncio.to_thread(remote, pp.stdout) if remote is not None else None
+        if result is None:
+            result = await run_async(cmd)
+        await asyncio.to_thread(self.store, key, obj, side_outputs)
+        return False, result
+
+    # ------------------------------------------------------------------
+    # Stats & eviction
+    # ------------------------------------------------------------------
+    def _stats_path(self) -> Path:
+        return self.root / "stats.json"
+
+    def _read_stats(self) -> dict:
+        try:
+            return json.loads(self._stats_path().read_text())
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def flush(self) -> None:
+        """Persist hit/miss counters and prune if the cache grew past its limit.
+
+        Also waits for uploads to the remote cache.
+        """
+
+        if self.remote is not None:
+            self.remote.flush()
+        if not (self.hits or self.misses or self._added):
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        stats = self._read_stats()
+        stats["hits"] = stats.get("hits", 0) + self.hits
+        stats["misses"] = stats.get("misses", 0) + self.misses
+        size = stats.get("size")
+        stats["size"] = None if size is None else size + self._added
+        self.hits = self.misses = self._added = self.remote_hits = 0
+        self._write_stats(stats)
+        if stats["size"] is None or stats["size"] > self.max_size:
+            self.prune()
+
+    def _write_stats(self, stats: dict) -> None:
+        tmp = self._stats_path().with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(stats))
+        os.replace(tmp, self._stats_path())
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        objects = self.root / "objects"
+        out: List[Tuple[float, int, Path]] = []
+        if not objects.exists():
+            return out
+        for sub in os.scandir(objects):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith((".o", ".dwo", ".json")):
+                    st = e.stat()
+                    out.append((st.st_mtime, st.st_size, Path(e.path)))
+        return out
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        stats = self._read_stats()
+        stats.update(
+            {
+                "dir": str(self.root),
+                "entries": sum(1 for _, _, path in entries if path.suffix == ".o"),
+                "size": sum(size for _, size, _ in entries),
+                "max_size": self.max_size,
+            }
+        )
+        return stats
+
+    def prune(self, max_size: int | None = None) -> Tuple[int, int]:
+        """Evict least-recently-used entries until the cache fits *max_size*.
+
+        Returns ``(removed_entries, freed_bytes)``.
+        """
+
+        limit = self.max_size if max_size is None else max_size
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Shrink a little below the limit so we do not prune on every build.
+        target = limit if max_size is not None else int(limit * 0.9)
+        removed = freed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        stats = self._read_stats()
+        stats["size"] = total
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._write_stats(stats)
+        return removed, freed
+
+
+def preprocess_command(cmd: List[str], obj: Path) -> List[str]:
+    """Turn a ``-c … -o obj`` compile command into its ``-E`` counterpart.
+
+    Any depfile flags are kept (with ``-MT`` pinned to *obj*) so the
+    preprocessor run doubles as dependency scan.
+    """
+
+    out: List[str] = []
+    skip = False
+    for arg in cmd:
+        if skip:
+            skip = False
+            continue
+        if arg == "-o":
+            skip = True
+            continue
+        out.append("-E" if arg == "-c" else arg)
+    if "-MF" in out:
+        out[-1:-1] = ["-MT", str(obj)]
+    return out
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import http.server
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Tuple
+
+from rich.console import Console
+
+console = Console()
+
+_HEX = re.compile(r"[0-9a-f]{64}\Z")
+
+# ---------------------------------------------------------------------------
+# Reference server for remote caches (`mint cache serve`, see remote_cache.py)
+# ---------------------------------------------------------------------------
+
+
+class CacheServer(http.server.ThreadingHTTPServer):
+    """Minimal cache server storing ``cas/`` and ``ac/`` entries as files under *root*."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], root: Path, read_only: bool = False):
+        self.root = root
+        self.read_only = read_only
+        for sub in ("cas", "ac"):
+            (root / sub).mkdir(parents=True, exist_ok=True)
+        super().__init__(address, _CacheHandler)
+
+
+class _CacheHandler(http.server.BaseHTTPRequestHandler):
+    server: CacheServer
+
+    def _path(self) -> Path | None:
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in ("cas", "ac") or not _HEX.match(parts[1]):
+            return None
+        return self.server.root / parts[0] / parts[1]
+
+    def _reply(self, code: int, body: bytes = b"") -> None:
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = self._path()
+        if path is None:
+            return self._reply(400)
+        try:
+            body = path.read_bytes()
+        except OSError:
+            return self._reply(404)
+        self._reply(200, body)
+
+    do_HEAD = do_GET
+
+    def do_PUT(self) -> None:
+        path = self._path()
+        if path is None:
+            return self._reply(400)
+        if self.server.read_only:
+            return self._reply(403)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if path.parent.name == "cas" and hashlib.sha256(body).hexdigest() != path.name:
+            return self._reply(400, b"digest mismatch")
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        self._reply(201)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+
+def serve_cache(root: Path, host: str, port: int, read_only: bool = False) -> None:
+    with CacheServer((host, port), root, read_only) as server:
+        bound = server.server_address
+        console.print(f"[green]mint cache server[/] on http://{bound[0]}:{bound[1]} storing in {root}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
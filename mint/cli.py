@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Optional
-import yaml
 import os
 import sys
 import shutil
@@ -11,9 +10,13 @@ import subprocess
 import typer
 from rich.console import Console
 
-from .builder import BuildConfig, Builder
-from .utils import MintError, set_verbose, get_timings, run, set_dry_run, set_keep_logs
-from .toolchains import get as get_toolchain, available as available_toolchains
+from .utils import (
+    MintError, set_verbose, get_timings, run, set_dry_run, set_keep_logs, set_jobs, get_jobs, set_load_average,
+    parse_size,
+)
+
+# Commands import what they need (the builder, toolchains, …) themselves:
+# `mint version`, `--help` and shell completion must start fast.
 
 app = typer.Typer(add_completion=False, help="mint – minimal yet ultra-stable C/C++ build tool")
 console = Console()
@@ -29,19 +32,57 @@ def build(
     dry_run: bool = typer.Option(False, "--dry-run", help="Print commands without executing"),
     keep_logs: bool = typer.Option(False, "--keep-logs", help="Save raw logs on failures"),
     explain: bool = typer.Option(False, "--explain", help="Print full compile/link lines and include/lib paths on failure"),
-    cache: str = typer.Option("none", "--cache", help="Build cache backend: none | sccache | auto"),
+    cache: Optional[str] = typer.Option(None, "--cache", help="Build cache backend: none | mint | sccache | auto (default: `cache:` in mint.yaml, else none)"),
     log: Path | None = typer.Option(None, "--log", help="Write timing JSON log to this file"),
+    trace: Path | None = typer.Option(None, "--trace", help="Write a Chrome/Perfetto trace of the build to this file"),
+    time_trace: bool = typer.Option(False, "--time-trace", help="Record clang -ftime-trace per TU (see `mint analyze compile-time`)"),
+    workers: Optional[str] = typer.Option(None, "--workers", help="Offload compiles to `mint worker`s: host:port,host:port,…"),
     build_dir: Path | None = typer.Option(None, "--build-dir", help="Custom build directory (default: ./build)"),
+    unity: bool = typer.Option(False, "--unity", help="Compile sources in unity (jumbo) batches"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Parallel jobs (default: CPUs allowed by affinity/cgroup quota)"),
+    keep_going: Optional[int] = typer.Option(None, "--keep-going", "-k", min=0, help="Keep building independent units until N failures (0: all), then report every failure"),
+    load_average: Optional[float] = typer.Option(None, "--load-average", "-l", help="Do not start new jobs while the load average exceeds this"),
+    memory_budget: Optional[str] = typer.Option(None, "--memory-budget", help="Memory for concurrent compiles, e.g. 16G (default: available memory / cgroup limit)"),
+    daemon: bool = typer.Option(False, "--daemon", help="Build through the background mint daemon (started on demand)"),
+    watch: bool = typer.Option(False, "--watch", help="Keep rebuilding on every save (implies --daemon)"),
 ):
     """Compile & link the current project."""
 
+    set_jobs(jobs)
+    set_load_average(load_average)
+
     # Auto-delegate to Ninja if a build.ninja exists
     target_build_dir: Path = build_dir or (Path.cwd() / "build")
     ninja_file = target_build_dir / "build.ninja"
     if ninja_file.exists():
         console.print("[blue]build.ninja detected, invoking Ninja…[/]")
-        run(["ninja", "-C", str(target_build_dir)])
+        cmd = ["ninja", "-C", str(target_build_dir), "-j", str(get_jobs())]
+        if load_average:
+            cmd += ["-l", str(load_average)]
+        run(cmd)
+        return
+    if daemon or watch:
+        from .daemon import build_via_daemon
+
+        opts = {
+            "config": str(config.resolve()) if config else None, "release": release, "clean": clean_first,
+            "verbose": verbose, "dry_run": dry_run, "keep_logs": keep_logs, "explain": explain, "cache": cache,
+            "log": str(log.resolve()) if log else None, "trace": str(trace.resolve()) if trace else None, "time_trace": time_trace, "workers": workers, "unity": unity, "jobs": jobs, "keep_going": keep_going, "load_average": load_average,
+            "memory_budget": parse_size(memory_budget) if memory_budget else None,
+        }
+        try:
+            rc = build_via_daemon(Path.cwd(), target_build_dir, opts, watch=watch)
+        except MintError as e:
+            console.print(f"[red bold]⨯ {e}")
+            raise typer.Exit(code=1)
+        if rc:
+            raise typer.Exit(code=rc)
         return
+    from .builder import BuildConfig, Builder
+    from .history import recorded_build
+    from .toolchains import available as available_toolchains, get as get_toolchain
+    from .trace import span, start_trace, stop_trace
+
     try:
         # Setup flags
         set_verbose(verbose)
@@ -49,36 +90,40 @@ def build(
         set_keep_logs(keep_logs)
         if explain:
             os.environ['MINT_EXPLAIN'] = '1'
-
-        use_sccache = False
-        if cache.lower() in {"sccache", "auto"}:
-            if shutil.which("sccache"):
-                use_sccache = True
-            elif cache.lower() == "sccache":
-                console.print("[yellow]sccache requested but not found in PATH – continuing without cache.[/]")
+        if trace:
+            start_trace()
 
         cfg = BuildConfig.load(config)
+        cfg.cache = cache or cfg.cache  # the toolchains read it from the config
+        use_sccache, use_cache = _cache_backends(cfg.cache)
 
         root = Path.cwd()
 
         detected_lang = lang if lang != "auto" else _detect_lang(root)
 
         if detected_lang == "cpp":
-            builder = Builder(root, build_dir=target_build_dir, release=release, config=cfg, use_sccache=use_sccache)
+            builder = Builder(
+                root, build_dir=target_build_dir, release=release, config=cfg,
+                use_sccache=use_sccache, use_cache=use_cache, unity=unity,
+                memory_budget=parse_size(memory_budget) if memory_budget else None, time_trace=time_trace,
+                workers=(workers or "").split(","), keep_going=keep_going,
+            )
             if clean_first:
                 builder.clean()
-            builder.build()
+            with recorded_build(builder.build_dir, "cpp", builder.history), span("build", toolchain="cpp"):
+                builder.build()
         else:
             try:
                 TC = get_toolchain(detected_lang)
             except KeyError:
-                console.print(f"[red]Unsupported toolchain '{detected_lang}'. Available: {', '.join(available_toolchains().keys())}")
+                console.print(f"[red]Unsupported toolchain '{detected_lang}'. Available: {', '.join(available_toolchains())}")
                 raise typer.Exit(code=1)
 
             tc = TC(root, target_build_dir, config=cfg.__dict__)  # pass raw dict
             if clean_first:
                 tc.clean()
-            tc.build()
+            with recorded_build(target_build_dir, detected_lang), span("build", toolchain=detected_lang):
+                tc.build()
             try:
                 # flush cache for toolchain
                 tc._flush_cache()
@@ -86,18 +131,42 @@ def build(
                 pass
 
         # after build success show timings
-        times = get_timings()
-        if times:
-            console.rule("Timing Summary")
-            for cmd, sec in times:
-                console.print(f"[blue]{cmd}[/] -> {sec:.2f}s")
-            if log:
-                import json
-                log.parent.mkdir(parents=True, exist_ok=True)
-                log.write_text(json.dumps([{"cmd": c, "sec": s} for c, s in times], indent=2))
+        _report_timings(log)
     except MintError as e:
         console.print(f"[red bold]⨯ {e}")
         raise typer.Exit(code=1)
+    finally:
+        # Failed builds are traced too: that is often when the trace is wanted.
+        if trace:
+            stop_trace(trace)
+            console.print(f"[blue]Trace written to {trace}[/] (open in ui.perfetto.dev or chrome://tracing)")
+
+
+def _cache_backends(cache: str | None) -> tuple[bool, bool]:
+    """Map ``--cache`` (or ``cache:`` in mint.yaml) to ``(use_sccache, use_cache)``; off unless asked for."""
+
+    cache = cache or "none"
+    use_sccache = False
+    if cache.lower() in {"sccache", "auto"}:
+        if shutil.which("sccache"):
+            use_sccache = True
+        elif cache.lower() == "sccache":
+            console.print("[yellow]sccache requested but not found in PATH – continuing without cache.[/]")
+    # Built-in object cache unless disabled or sccache took over.
+    use_cache = cache.lower() in {"mint", "auto"} and not use_sccache
+    return use_sccache, use_cache
+
+
+def _report_timings(log: Path | None) -> None:
+    times = get_timings()
+    if times:
+        console.rule("Timing Summary")
+        for cmd, sec in times:
+            console.print(f"[blue]{cmd}[/] -> {sec:.2f}s")
+        if log:
+            import json
+            log.parent.mkdir(parents=True, exist_ok=True)
+            log.write_text(json.dumps([{"cmd": c, "sec": s} for c, s in times], indent=2))
 
 
 @app.command()
@@ -109,6 +178,8 @@ def clean(
     Adds a safety prompt unless the --yes/-y flag is provided or running in non-interactive mode (stdin not a TTY).
     """
 
+    from .builder import Builder
+
     build_dir = Builder(Path.cwd()).build_dir
 
     if not yes and typer.get_app().info.param_defaults:  # heuristic for interactive TTY
@@ -149,17 +220,16 @@ def configure(
     root = Path.cwd()
     # collect toolchains that support ninja
     mode = 'ninja'
-    from .toolchains import available
-    from .utils import detect_compiler
+    from .toolchains import available, get as get_toolchain
     from .ninja_writer import NinjaWriter
-    from .builder import Builder
+    from .builder import BuildConfig, Builder
 
     # load config for toolchain-specific options
     cfg = BuildConfig.load(Path("mint.yaml"))
 
     # instantiate builders for each available toolchain
     tcs = []
-    for lang in available().keys():
+    for lang in available():
         try:
             TC = get_toolchain(lang)
             tc = TC(root, root / 'build', config=cfg.__dict__)
@@ -196,6 +266,328 @@ def configure(
     console.print("Run: ninja -C build")
 
 
+@app.command("daemon")
+def daemon_cmd(
+    build_dir: Path | None = typer.Option(None, "--build-dir", help="Build directory to serve (default: ./build)"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+    status: bool = typer.Option(False, "--status", help="Show whether a daemon is running"),
+    idle_timeout: float = typer.Option(3 * 3600.0, "--idle-timeout", help="Exit after this many seconds without requests"),
+):
+    """Run the background build server used by `mint build --daemon/--watch`.
+
+    It keeps the file index, dependency graph and job history in memory and
+    learns about edits from inotify (or polling), so no-op builds return at
+    once.  Normally started on demand; runs in the foreground when invoked
+    directly.
+    """
+
+    from .daemon import MintDaemon, daemon_status, stop_daemon
+
+    target_build_dir: Path = (build_dir or (Path.cwd() / "build")).resolve()
+    if stop:
+        console.print("[green]mint daemon stopped[/]" if stop_daemon(target_build_dir) else "No mint daemon running")
+        return
+    if status:
+        info = daemon_status(target_build_dir)
+        if info is None:
+            console.print("No mint daemon running")
+            raise typer.Exit(code=1)
+        console.print(
+            f"[blue]mint daemon[/] pid {info['pid']} for {info['root']} – {info['watcher']}, "
+            f"{info['builds']} build(s), up {info['uptime']:.0f}s"
+        )
+        return
+    try:
+        MintDaemon(Path.cwd(), target_build_dir, idle_timeout=idle_timeout).serve()
+    except MintError as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+
+
+@app.command("worker")
+def worker_cmd(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on (0.0.0.0 for all; trusted networks only)"),
+    port: int = typer.Option(3643, "--port", "-p", help="TCP port"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Concurrent compiles (default: usable CPUs)"),
+):
+    """Compile preprocessed sources for `mint build --workers` on other machines.
+
+    The worker needs the same compiler version as the clients; others are
+    refused when they connect.  Sources arrive preprocessed, so no
+    checkout or headers are needed here.
+    """
+
+    from .utils import detect_compiler
+    from .worker import serve_worker
+
+    try:
+        serve_worker(host, port, detect_compiler(), jobs)
+    except (MintError, OSError) as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+
+
+cache_app = typer.Typer(help="Inspect and maintain the local object cache")
+app.add_typer(cache_app, name="cache")
+
+
+def _object_cache(config: Path):
+    from .builder import BuildConfig
+    from .cache import ObjectCache
+
+    cfg = BuildConfig.load(config)
+    return ObjectCache(cfg.cache_dir, cfg.cache_max_size)
+
+
+@cache_app.command("stats")
+def cache_stats(
+    config: Path = typer.Option("mint.yaml", "--config", "-c", help="Path to config YAML"),
+):
+    """Show location, size and hit rate of the object cache."""
+
+    try:
+        stats = _object_cache(config).stats()
+    except MintError as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+    lookups = stats["hits"] + stats["misses"]
+    rate = f"{100 * stats['hits'] / lookups:.1f}%" if lookups else "n/a"
+    console.print(f"[blue]Directory:[/] {stats['dir']}")
+    console.print(f"[blue]Entries:[/] {stats['entries']}")
+    console.print(f"[blue]Size:[/] {stats['size'] / 1024 ** 2:.1f} MiB / {stats['max_size'] / 1024 ** 2:.0f} MiB")
+    console.print(f"[blue]Hits / misses:[/] {stats['hits']} / {stats['misses']} ({rate})")
+
+
+@cache_app.command("prune")
+def cache_prune(
+    max_size: Optional[str] = typer.Option(None, "--max-size", help="Shrink to this size (e.g. 1G, 0 to empty)"),
+    config: Path = typer.Option("mint.yaml", "--config", "-c", help="Path to config YAML"),
+):
+    """Evict least-recently-used cache entries."""
+
+    try:
+        oc = _object_cache(config)
+        removed, freed = oc.prune(parse_size(max_size) if max_size is not None else None)
+    except MintError as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+    console.print(f"[green]Removed {removed} entr{'y' if removed == 1 else 'ies'}, freed {freed / 1024 ** 2:.1f} MiB[/]")
+
+
+@cache_app.command("serve")
+def cache_serve(
+    directory: Path = typer.Option(Path("mint-cache"), "--dir", "-d", help="Where to store cache entries"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on (0.0.0.0 for all; trusted networks only)"),
+    port: int = typer.Option(8090, "--port", "-p", help="TCP port"),
+    read_only: bool = typer.Option(False, "--read-only", help="Refuse uploads"),
+):
+    """Serve a remote cache over HTTP for `remote_cache:` in mint.yaml.
+
+    A reference server for small teams: it never evicts, so prune the
+    directory from cron or point clients at bazel-remote instead.
+    """
+
+    from .cache_server import serve_cache
+
+    try:
+        serve_cache(directory, host, port, read_only)
+    except OSError as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+
+
+analyze_app = typer.Typer(help="Find out what makes the build slow")
+app.add_typer(analyze_app, name="analyze")
+
+
+@analyze_app.command("compile-time")
+def analyze_compile_time(
+    build_dir: Path | None = typer.Option(None, "--build-dir", help="Build directory (default: ./build)"),
+    top: int = typer.Option(20, "--top", "-n", help="Rows per section"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON (stable order, for diffing in CI)"),
+):
+    """Aggregate the -ftime-trace files of the last `mint build --time-trace`.
+
+    Reports the most expensive headers, template instantiations and
+    functions summed over all translation units, like ClangBuildAnalyzer.
+    """
+
+    import json
+    from rich.table import Table
+    from .timetrace import compile_time_report, load_traces
+
+    target_build_dir: Path = build_dir or (Path.cwd() / "build")
+    traces = load_traces(target_build_dir)
+    if not traces:
+        console.print(f"[red bold]⨯ No time traces in {target_build_dir}; run `mint build --time-trace` with clang first")
+        raise typer.Exit(code=1)
+    report = compile_time_report(traces, top)
+    if as_json:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+        return
+    totals = report["total_ms"]
+    console.print(
+        f"[blue]{report['units']} TU(s):[/] {totals['total'] / 1000:.1f}s total, "
+        f"{totals['frontend'] / 1000:.1f}s frontend, {totals['backend'] / 1000:.1f}s backend"
+    )
+    sections = [
+        ("Slowest translation units", "slowest_units", "file"),
+        ("Most expensive headers", "headers", "path"),
+        ("Template instantiations", "templates", "name"),
+        ("Template sets", "template_sets", "name"),
+        ("Functions (code generation)", "functions", "name"),
+    ]
+    for title, section, key in sections:
+        rows = report[section]
+        if not rows:
+            continue
+        table = Table(title=title, title_justify="left")
+        table.add_column("ms", justify="right")
+        if "count" in rows[0]:
+            table.add_column("count", justify="right")
+            table.add_column("avg ms", justify="right")
+        table.add_column(key)
+        for row in rows:
+            cells = [f"{row['ms']:.0f}"]
+            if "count" in row:
+                cells += [str(row["count"]), f"{row['avg_ms']:.0f}"]
+            table.add_row(*cells, row[key])
+        console.print(table)
+
+
+@analyze_app.command("includes")
+def analyze_includes(
+    config: Path = typer.Option("mint.yaml", "--config", "-c", help="Path to config YAML"),
+    build_dir: Path | None = typer.Option(None, "--build-dir", help="Build directory with the job history (default: ./build)"),
+    top: int = typer.Option(20, "--top", "-n", help="Rows per section (0 for all)"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Show which headers make rebuilds expensive.
+
+    For every project header: how many translation units include it
+    (directly or not), what recompiling them costs according to earlier
+    builds and how many bytes it adds to the build.  Also lists the
+    includes whose removal (forward declaration, splitting the header)
+    would save the most.
+    """
+
+    import json
+    from rich.table import Table
+    from .builder import BuildConfig, Builder
+
+    try:
+        builder = Builder(Path.cwd(), build_dir=build_dir or (Path.cwd() / "build"), config=BuildConfig.load(config))
+        report = builder.analyze_includes(top)
+    except MintError as e:
+        console.print(f"[red bold]⨯ {e}")
+        raise typer.Exit(code=1)
+    if as_json:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+        return
+    console.print(f"[blue]{report['units']} translation unit(s)[/]")
+    table = Table(title="Headers by rebuild cost", title_justify="left")
+    for col in ("TUs", "rebuild s", "size", "with includes", "parsed total"):
+        table.add_column(col, justify="right")
+    table.add_column("header")
+    for r in report["headers"]:
+        table.add_row(
+            str(r["tus"]), f"{r['cost_s']:.1f}", _kib(r["bytes"]), _kib(r["closure_bytes"]),
+            _kib(r["parsed_bytes"]), r["header"],
+        )
+    console.print(table)
+    if report["candidates"]:
+        table = Table(title="Includes worth forward-declaring or splitting", title_justify="left")
+        table.add_column("saves", justify="right")
+        table.add_column("TUs", justify="right")
+        table.add_column("include")
+        for c in report["candidates"]:
+            table.add_row(_kib(c["saved_bytes"]), str(c["tus"]), f"{c['includer']} -> {c['header']}")
+        console.print(table)
+
+
+def _kib(n: int) -> str:
+    return f"{n / 1024:.1f} KiB" if n < 1024 ** 2 else f"{n / 1024 ** 2:.1f} MiB"
+
+
+@app.command("stats")
+def stats(
+    build_dir: Path | None = typer.Option(None, "--build-dir", help="Build directory (default: ./build)"),
+    last: int = typer.Option(20, "--last", min=1, help="Number of recent builds to look at"),
+    top: int = typer.Option(10, "--top", "-n", min=1, help="Rows per section"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Show the build history: build times, cache hit rates, slowest and most rebuilt TUs.
+
+    Every `mint build` records its compile and link jobs (wall and CPU
+    time, peak memory, cache hit or miss, why the job ran) in
+    build/history.db.
+    """
+
+    import json
+    import statistics
+    import time
+    from rich.table import Table
+    from .history import BuildHistory
+
+    target_build_dir: Path = build_dir or (Path.cwd() / "build")
+    report = BuildHistory(target_build_dir).report(last, top)
+    if as_json:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+        return
+    builds = report["builds"]
+    if not builds:
+        console.print(f"[red bold]⨯ No build history in {target_build_dir}; run `mint build` first")
+        raise typer.Exit(code=1)
+
+    table = Table(title="Recent builds", title_justify="left")
+    for col in ("#", "started", "time", "jobs", "cache hits", "CPU s", ""):
+        table.add_column(col, justify="right")
+    for b in builds:
+        lookups = b["hits"] + b["misses"]
+        rate = f"{b['hits']}/{lookups} ({100 * b['hits'] / lookups:.0f}%)" if lookups else "-"
+        table.add_row(
+            str(b["id"]), time.strftime("%Y-%m-%d %H:%M", time.localtime(b["started"])), f"{b['duration']:.1f}s",
+            str(b["jobs"]), rate, f"{b['cpu']:.1f}", "[green]ok[/]" if b["ok"] else "[red]failed[/]",
+        )
+    console.print(table)
+    full = [b["duration"] for b in builds if b["ok"] and b["jobs"]]
+    if len(full) > 1:
+        console.print(
+            f"[blue]Builds that ran jobs:[/] median {statistics.median(full):.1f}s, "
+            f"latest {full[-1]:.1f}s, best {min(full):.1f}s, worst {max(full):.1f}s"
+        )
+
+    if report["slowest_units"]:
+        table = Table(title="Slowest translation units (compiled, not from cache)", title_justify="left")
+        for col in ("avg s", "max s", "CPU s", "peak RSS", "runs"):
+            table.add_column(col, justify="right")
+        table.add_column("unit")
+        for r in report["slowest_units"]:
+            table.add_row(
+                f"{r['avg_sec']:.2f}", f"{r['max_sec']:.2f}", f"{r['avg_cpu']:.2f}", _kib(r["max_rss"]),
+                str(r["runs"]), r["key"],
+            )
+        console.print(table)
+    if report["most_rebuilt"]:
+        table = Table(title="Most rebuilt translation units", title_justify="left")
+        for col in ("runs", "total s", "input changed", "flags changed", "new"):
+            table.add_column(col, justify="right")
+        table.add_column("unit")
+        for r in report["most_rebuilt"]:
+            table.add_row(
+                str(r["runs"]), f"{r['total_sec']:.1f}", str(r["input"]), str(r["command"]), str(r["new"]), r["key"]
+            )
+        console.print(table)
+    if report["causes"]:
+        table = Table(title="Changed files that caused the most rebuilds", title_justify="left")
+        for col in ("rebuilds", "builds", "total s"):
+            table.add_column(col, justify="right")
+        table.add_column("file")
+        for r in report["causes"]:
+            table.add_row(str(r["rebuilds"]), str(r["builds"]), f"{r['total_sec']:.1f}", r["cause"])
+        console.print(table)
+
+
 @app.command("version")
 def version():
     """Show mint build tool version."""
@@ -217,6 +609,10 @@ def init(
     4. Emit a minimal yet valid *mint.yaml* that the user can build straight away.
     """
 
+    import yaml
+    from .fileindex import file_index
+    from .targets import SOURCE_EXTS
+
     root = Path.cwd()
 
     # ------------------------------------------------------------------
@@ -252,8 +648,7 @@ def init(
     # ------------------------------------------------------------------
     # Source discovery – limit to C/C++ files for now
     # ------------------------------------------------------------------
-    c_exts = {".c", ".cc", ".cpp", ".cxx"}
-    discovered_sources = [str(p.relative_to(root)) for p in root.rglob("*") if p.suffix in c_exts and "build" not in p.parts]
+    discovered_sources = [str(p.relative_to(root)) for p in file_index(root).with_suffix(*SOURCE_EXTS)]
 
     if not discovered_sources:
         # Fallback to typical layout placeholder
@@ -307,6 +702,10 @@ def doctor():
     except MintError as e:
         console.print(f"[red]C++ compiler:[/] {e}")
 
+    from .utils import default_jobs
+
+    console.print(f"[blue]Parallel jobs:[/] {default_jobs()} (CPU affinity / cgroup quota, os.cpu_count()={os.cpu_count()})")
+
     # Path order summary (first 5 entries)
     path_entries = os.getenv("PATH", "").split(":")[:5]
     console.print("[blue]PATH (first 5):[/] " + ", ".join(path_entries))
@@ -364,6 +763,9 @@ if __name__ == "__main__":
 def _detect_lang(root: Path) -> str:
     """Heuristic language detection based on well-known config files."""
 
+    from .fileindex import file_index
+    from .targets import SOURCE_EXTS
+
     # Rust
     if (root / "Cargo.toml").exists():
         return "rust"
@@ -379,14 +781,20 @@ def _detect_lang(root: Path) -> str:
     # PHP
     if (root / "composer.json").exists() or (root / "index.php").exists():
         return "php_native"
+    # The remaining checks look at the whole tree; they share one walk
+    # with source discovery.
+    index = file_index(root)
     # Ruby
-    if any(root.rglob("*.rb")):
+    if index.has(".rb"):
         return "ruby_native"
     # Lua
-    if any(root.rglob("*.lua")):
+    if index.has(".lua"):
         return "lua_native"
+    # C/C++ sources win over YAML so mint.yaml itself is not mistaken for a YAML project
+    if index.has(*SOURCE_EXTS):
+        return "cpp"
     # YAML projects (pure configs)
-    if any(root.rglob("*.yaml")) or any(root.rglob("*.yml")):
+    if index.has(".yaml", ".yml"):
         return "yaml"
     # default
     return "cpp"
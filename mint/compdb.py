@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Compiler wrappers that tools reading the database do not understand.
+WRAPPERS = {"sccache", "ccache"}
+
+
+class CompileDatabase:
+    """The persistent ``compile_commands.json`` of a build directory.
+
+    Entries are keyed by object file (the same source may be compiled by
+    several targets) and updated one translation unit at a time, so an
+    incremental build keeps the commands of everything it did not touch.
+    The file is only rewritten, atomically, when its content changed:
+    clangd and friends re-index the project on every modification.
+    """
+
+    def __init__(self, build_dir: Path):
+        self.path = build_dir / "compile_commands.json"
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        try:
+            for entry in json.loads(self.path.read_text()):
+                if "arguments" in entry and "output" in entry:
+                    self._entries[entry["output"]] = entry
+        except (OSError, ValueError, TypeError):
+            self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[dict]:
+        with self._lock:
+            return [self._entries[k] for k in sorted(self._entries)]
+
+    def update(self, directory: Path, src: Path, obj: Path, cmd: List[str]) -> None:
+        args = list(cmd)
+        while args and Path(args[0]).name in WRAPPERS:
+            args.pop(0)
+        entry = {"directory": str(directory), "file": str(src), "output": str(obj), "arguments": args}
+        with self._lock:
+            self._entries[str(obj)] = entry
+
+    def retain(self, outputs: Iterable[Path]) -> None:
+        """Drop the entries of objects that are no longer part of the build."""
+
+        keep = {str(o) for o in outputs}
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if k in keep}
+
+    def save(self) -> bool:
+        """Write the database if it changed; returns whether it was written."""
+
+        text = json.dumps(self.entries(), indent=2)
+        try:
+            if self.path.read_text() == text:
+                return False
+        except OSError:
+            pass
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, self.path)
+        return True
@@ -0,0 +1,635 @@
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from rich.console import Console
+
+from . import fileindex
+from .fileindex import PRUNE_DIRS, FileIndex, file_index
+from .history import recorded_build
+from .trace import span, start_trace, stop_trace
+from .utils import (
+    MintError, reset_timings, set_dry_run, set_jobs, set_keep_logs, set_load_average, set_verbose,
+)
+
+console = Console()
+
+# ---------------------------------------------------------------------------
+# mint daemon: keeps the file index, dependency graph and job history of a
+# project in memory and serves builds over a Unix socket.
+# ---------------------------------------------------------------------------
+
+# Exit after this long without requests (and no --watch client attached).
+IDLE_TIMEOUT = 3 * 3600.0
+
+# Quiet period after the last change before a --watch rebuild starts.
+DEBOUNCE = 0.15
+
+# Files outside the project (system headers, the compiler) are not watched;
+# their stats are refreshed at most this often.
+EXTERNAL_RECHECK = 60.0
+
+START_TIMEOUT = 10.0
+
+# Editor scratch files and what the build itself writes into the tree.
+_NOISE_SUFFIXES = ("~", ".swp", ".swx", ".swo", ".tmp")
+_NOISE_NAMES = {"4913", "compile_commands.json", ".DS_Store"}
+
+OnChange = Callable[[Set[str], bool, bool], None]
+
+
+def socket_path(build_dir: Path) -> Path:
+    path = Path(build_dir).resolve() / "mint.sock"
+    # sun_path is limited to ~100 bytes.
+    if len(os.fsencode(path)) > 100:
+        tag = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+        path = Path(tempfile.gettempdir()) / f"mint-{tag}.sock"
+    return path
+
+
+def code_stamp() -> str:
+    """Identifies the installed mint code, so a client never talks to a stale daemon."""
+
+    h = hashlib.sha256()
+    pkg = Path(__file__).parent
+    for p in sorted(pkg.rglob("*.py")):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        h.update(f"{p}\0{st.st_mtime_ns}\0{st.st_size}\0".encode())
+    return h.hexdigest()
+
+
+def _interesting(name: str) -> bool:
+    return not (name in _NOISE_NAMES or name.startswith(".#") or name.endswith(_NOISE_SUFFIXES))
+
+
+# ---------------------------------------------------------------------------
+# File watchers
+# ---------------------------------------------------------------------------
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+_IN_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes, one watch per indexed directory."""
+
+    kind = "inotify"
+
+    def __init__(self, index: FileIndex, build_dir: Path, on_change: OnChange):
+        self.build_dir = str(build_dir.resolve())
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._wds: Dict[int, str] = {}
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            for d in index.dirs:
+                self._add(str(d))
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch({path}) failed")
+        self._wds[wd] = path
+
+    def _add_tree(self, top: str) -> None:
+        for path, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in PRUNE_DIRS and os.path.join(path, d) != self.build_dir]
+            self._add(path)
+
+    def start(self) -> None:
+        threading.Thread(target=self._run, name="mint-inotify", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            select.select([self.fd], [], [], 1.0)
+            self.sync()
+
+    def sync(self) -> None:
+        """Process every event queued so far."""
+
+        with self._lock:
+            changed: Set[str] = set()
+            structural = full = False
+            while True:
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    break
+                if not data:
+                    break
+                offset = 0
+                while offset + _EVENT.size <= len(data):
+                    wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                    name = os.fsdecode(data[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0"))
+                    offset += _EVENT.size + length
+                    if mask & IN_Q_OVERFLOW:
+                        structural = full = True
+                        continue
+                    base = self._wds.get(wd)
+                    if base is None:
+                        continue
+                    if mask & IN_IGNORED:
+                        del self._wds[wd]
+                        continue
+                    path = os.path.join(base, name) if name else base
+                    if mask & IN_ISDIR or mask & IN_DELETE_SELF:
+                        structural = True
+                        if mask & (IN_CREATE | IN_MOVED_TO) and name not in PRUNE_DIRS and path != self.build_dir:
+                            try:
+                                self._add_tree(path)
+                            except OSError:
+                                full = True  # out of watches: changes may go unseen
+                        continue
+                    if _interesting(name):
+                        changed.add(path)
+            if changed or structural:
+                self.on_change(changed, structural, full)
+
+
+class PollWatcher:
+    """Portable fallback: re-walks the tree and compares stamps."""
+
+    kind = "polling"
+
+    def __init__(self, root: Path, build_dir: Path, on_change: OnChange, interval: float = 1.0):
+        self.root = root
+        self.build_dir = build_dir
+        self.on_change = on_change
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        out: Dict[str, Tuple[int, int]] = {}
+        for p in FileIndex(self.root, self.build_dir).files:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            out[str(p)] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def start(self) -> None:
+        threading.Thread(target=self._run, name="mint-poll", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            snapshot = self._scan()
+            old = self._snapshot
+            self._snapshot = snapshot
+        changed = {p for p in snapshot.keys() | old.keys() if snapshot.get(p) != old.get(p)}
+        if changed:
+            self.on_change(changed, snapshot.keys() != old.keys(), False)
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class _StreamWriter:
+    """File-like object that forwards console output to the client, line by line."""
+
+    encoding = "utf-8"
+
+    def __init__(self, send: Callable[..., None]):
+        self.send = send
+        self._buf = ""
+
+    def write(self, text: str) -> int:
+        self._buf += text
+        if "\n" in self._buf:
+            head, self._buf = self._buf.rsplit("\n", 1)
+            self._emit(head + "\n")
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._emit(self._buf)
+            self._buf = ""
+
+    def _emit(self, text: str) -> None:
+        try:
+            self.send(out=text)
+        except OSError:
+            pass  # client went away; keep building
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    mint: "MintDaemon"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+
+        def send(**msg) -> None:
+            self.wfile.write((json.dumps(msg) + "\n").encode())
+
+        self.server.mint.handle(req, send, self.connection, self.server)
+
+
+class MintDaemon:
+    """Serves builds of one project from in-memory state.
+
+    Builders (with their dependency graph, job history, object-cache and
+    compiler probes) are kept per option set.  A watcher records which
+    files changed; before each build only those files are stat'ed again,
+    and a build without any change since the last successful one is
+    answered without running the builder at all.
+    """
+
+    def __init__(self, root: Path, build_dir: Path, idle_timeout: float = IDLE_TIMEOUT):
+        self.root = root
+        self.build_dir = build_dir
+        self.idle_timeout = idle_timeout
+        self.sock_path = socket_path(build_dir)
+        self.stamp = code_stamp()
+        self.watcher: InotifyWatcher | PollWatcher | None = None
+        self.generation = 0
+        self.builds = 0
+        self.edits: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._build_lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._structural = False
+        self._full = False
+        self._builders: Dict[tuple, object] = {}
+        self._config_stamps: Dict[tuple, tuple | None] = {}
+        self._clean: Dict[tuple, Tuple[int, List[Path]]] = {}
+        self._last_recheck = time.monotonic()
+        self._last_activity = time.monotonic()
+        self._watching = 0
+        self._started = time.time()
+
+    # ------------------------------------------------------------------
+    # Change tracking
+    # ------------------------------------------------------------------
+    def _on_change(self, paths: Set[str], structural: bool, full: bool) -> None:
+        with self._cond:
+            now = time.time()
+            for p in paths:
+                self.edits[p] = now
+            self._pending |= paths
+            self._structural |= structural
+            self._full |= full
+            self.generation += 1
+            self._cond.notify_all()
+
+    def _start_watcher(self) -> None:
+        index = file_index(self.root, self.build_dir)
+        try:
+            self.watcher = InotifyWatcher(index, self.build_dir, self._on_change)
+        except (OSError, AttributeError):
+            # Not Linux, or out of inotify watches.
+            self.watcher = PollWatcher(self.root, self.build_dir, self._on_change)
+        self.watcher.start()
+
+    def _apply_changes(self) -> bool:
+        """Invalidate what changed since the last build; True if anything did."""
+
+        if self.watcher:
+            self.watcher.sync()
+        with self._cond:
+            pending, structural, full = self._pending, self._structural, self._full
+            self._pending, self._structural, self._full = set(), False, False
+        if time.monotonic() - self._last_recheck > EXTERNAL_RECHECK:
+            full = True
+        if full:
+            self._last_recheck = time.monotonic()
+        index = file_index(self.root, self.build_dir)
+        if full or structural or any(os.path.exists(p) != (Path(p) in index) for p in pending):
+            fileindex.invalidate(self.root)
+        for builder in self._builders.values():
+            if full:
+                builder.depgraph.invalidate()
+            else:
+                # Outputs are not watched; someone may have deleted them.
+                builder.depgraph.invalidate(pending, under=self.build_dir)
+        return bool(pending or structural or full)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def handle(self, req: dict, send: Callable[..., None], conn: socket.socket, server: _Server) -> None:
+        self._last_activity = time.monotonic()
+        cmd = req.get("cmd")
+        if cmd == "status":
+            send(
+                pid=os.getpid(), root=str(self.root), watcher=self.watcher.kind if self.watcher else None,
+                builds=self.builds, uptime=round(time.time() - self._started, 1),
+            )
+        elif cmd == "stop":
+            send(ok=True)
+            threading.Thread(target=server.shutdown, daemon=True).start()
+        elif cmd == "build":
+            if req.get("stamp") != self.stamp or req.get("root") != str(self.root):
+                # Different mint version (or project): make way for a fresh daemon.
+                send(restart=True)
+                threading.Thread(target=server.shutdown, daemon=True).start()
+                return
+            opts = req.get("opts") or {}
+            rc = self.build(opts, send)
+            if req.get("watch"):
+                self._watch(opts, send, conn)
+            else:
+                send(rc=rc)
+        self._last_activity = time.monotonic()
+
+    def build(self, opts: dict, send: Callable[..., None]) -> int:
+        writer = _StreamWriter(send)
+        with self._build_lock, contextlib.redirect_stdout(writer):
+            try:
+                return self._build(opts)
+            finally:
+                writer.flush()
+
+    def _builder_key(self, opts: dict) -> tuple:
+        return (opts.get("config"), opts.get("release"), opts.get("unity"), opts.get("cache"), opts.get("memory_budget"), opts.get("time_trace"), opts.get("workers"))
+
+    def _builder(self, opts: dict):
+        from .builder import BuildConfig, Builder
+        from .cli import _cache_backends
+
+        key = self._builder_key(opts)
+        config = Path(opts.get("config") or self.root / "mint.yaml")
+        try:
+            st = config.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if key not in self._builders or self._config_stamps.get(key) != stamp:
+            cfg = BuildConfig.load(config)
+            use_sccache, use_cache = _cache_backends(opts.get("cache") or cfg.cache)
+            self._builders[key] = Builder(
+                self.root, build_dir=self.build_dir, release=bool(opts.get("release")),
+                config=cfg, use_sccache=use_sccache, use_cache=use_cache,
+                unity=bool(opts.get("unity")), memory_budget=opts.get("memory_budget"),
+                time_trace=bool(opts.get("time_trace")), workers=(opts.get("workers") or "").split(","),
+            )
+            self._config_stamps[key] = stamp
+            self._clean.pop(key, None)
+        return self._builders[key]
+
+    def _build(self, opts: dict) -> int:
+        from .cli import _detect_lang, _report_timings
+
+        set_verbose(bool(opts.get("verbose")))
+        set_dry_run(bool(opts.get("dry_run")))
+        set_keep_logs(bool(opts.get("keep_logs")))
+        os.environ.pop("MINT_EXPLAIN", None)
+        if opts.get("explain"):
+            os.environ["MINT_EXPLAIN"] = "1"
+        set_jobs(opts.get("jobs"))
+        set_load_average(opts.get("load_average"))
+        reset_timings()
+        key = self._builder_key(opts)
+        try:
+            recheck_due = time.monotonic() - self._last_recheck > EXTERNAL_RECHECK
+            changed = self._apply_changes()
+            lang = _detect_lang(self.root)
+            if lang != "cpp":
+                raise MintError(f"mint daemon builds C/C++ projects only (detected: {lang}); run without --daemon")
+            builder = self._builder(opts)
+            if opts.get("clean"):
+                builder.clean()
+                self._builders.pop(key)
+                self._clean.pop(key, None)
+                builder = self._builder(opts)
+            elif not (changed or recheck_due or opts.get("dry_run")) and key in self._clean:
+                gen, outputs = self._clean[key]
+                if gen == self.generation and all(p.exists() for p in outputs):
+                    console.print("[bold green]✓ Up to date[/] (mint daemon: no changes)")
+                    return 0
+            gen = self.generation
+            started = time.time()
+            builder.recent = dict(self.edits)
+            builder.keep_going = opts.get("keep_going")
+            if opts.get("trace"):
+                start_trace()
+            try:
+                with recorded_build(builder.build_dir, "cpp", builder.history), span("build", toolchain="cpp"):
+                    outputs = builder.build()
+            finally:
+                if opts.get("trace"):
+                    stop_trace(Path(opts["trace"]))
+            _report_timings(Path(opts["log"]) if opts.get("log") else None)
+            if not opts.get("dry_run"):
+                self._clean[key] = (gen, outputs)
+            with self._cond:
+                self.edits = {p: t for p, t in self.edits.items() if t > started}
+            self.builds += 1
+            return 0
+        except MintError as e:
+            console.print(f"[red bold]⨯ {e}")
+        except Exception as e:  # keep serving; the traceback goes to the daemon log
+            traceback.print_exc()
+            console.print(f"[red bold]⨯ internal error in mint daemon: {e}")
+        self._clean.pop(key, None)
+        return 1
+
+    def _watch(self, opts: dict, send: Callable[..., None], conn: socket.socket) -> None:
+        self._watching += 1
+        try:
+            seen = self.generation
+            while not _closed(conn):
+                with self._cond:
+                    self._cond.wait_for(lambda: self.generation != seen, timeout=0.5)
+                if self.generation == seen:
+                    continue
+                while True:  # let a burst of saves settle
+                    g = self.generation
+                    time.sleep(DEBOUNCE)
+                    if self.generation == g:
+                        break
+                seen = self.generation
+                with self._cond:
+                    latest = max(self.edits, key=self.edits.get, default=None)
+                what = os.path.relpath(latest, self.root) if latest else "tree"
+                try:
+                    send(out=f"\n[watch] {what} changed, rebuilding…\n")
+                except OSError:
+                    return
+                self.build(opts, send)
+                self._last_activity = time.monotonic()
+        finally:
+            self._watching -= 1
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def serve(self) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise MintError("mint daemon needs Unix domain sockets")
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        if _connect(self.sock_path) is not None:
+            raise MintError(f"A mint daemon is already serving {self.build_dir}")
+        self.sock_path.unlink(missing_ok=True)
+        self._start_watcher()
+        old_umask = os.umask(0o077)
+        try:
+            server = _Server(str(self.sock_path), _Handler)
+        finally:
+            os.umask(old_umask)
+        server.mint = self
+        threading.Thread(target=self._reaper, args=(server,), name="mint-idle", daemon=True).start()
+        print(f"mint daemon {os.getpid()} serving {self.root} on {self.sock_path} ({self.watcher.kind})", flush=True)
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            server.server_close()
+            self.sock_path.unlink(missing_ok=True)
+
+    def _reaper(self, server: _Server) -> None:
+        while True:
+            time.sleep(min(5.0, self.idle_timeout))
+            idle = time.monotonic() - self._last_activity
+            if idle > self.idle_timeout and not self._watching and not self._build_lock.locked():
+                server.shutdown()
+                return
+
+
+def _closed(conn: socket.socket) -> bool:
+    try:
+        readable, _, _ = select.select([conn], [], [], 0)
+        return bool(readable) and conn.recv(1, socket.MSG_PEEK) == b""
+    except OSError:
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def _connect(path: Path) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(build_dir: Path, msg: dict) -> Iterator[dict]:
+    """Send *msg* to the daemon of *build_dir* and yield its replies."""
+
+    sock = _connect(socket_path(build_dir))
+    if sock is None:
+        raise MintError("mint daemon is not running")
+    with sock, sock.makefile("rb") as replies:
+        sock.sendall((json.dumps(msg) + "\n").encode())
+        for line in replies:
+            yield json.loads(line)
+
+
+def start_daemon(root: Path, build_dir: Path) -> None:
+    build_dir.mkdir(parents=True, exist_ok=True)
+    with open(build_dir / "daemon.log", "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "mint", "daemon", "--build-dir", str(build_dir)],
+            cwd=root, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        sock = _connect(socket_path(build_dir))
+        if sock is not None:
+            sock.close()
+            return
+        time.sleep(0.05)
+    raise MintError(f"mint daemon did not come up; see {build_dir / 'daemon.log'}")
+
+
+def build_via_daemon(root: Path, build_dir: Path, opts: dict, watch: bool = False) -> int:
+    """Run a build in the project's daemon (starting it if needed); returns the exit code."""
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise MintError("--daemon needs Unix domain sockets")
+    msg = {"cmd": "build", "root": str(root), "stamp": code_stamp(), "opts": opts, "watch": watch}
+    for _ in range(2):
+        sock_path = socket_path(build_dir)
+        if _connect(sock_path) is None:
+            start_daemon(root, build_dir)
+        restart = False
+        try:
+            for reply in request(build_dir, msg):
+                if "out" in reply:
+                    sys.stdout.write(reply["out"])
+                    sys.stdout.flush()
+                elif reply.get("restart"):
+                    restart = True
+                elif "rc" in reply:
+                    return int(reply["rc"])
+        except KeyboardInterrupt:
+            return 130
+        if not restart:
+            raise MintError("mint daemon closed the connection unexpectedly")
+        # Wait for the outdated daemon to let go of the socket.
+        deadline = time.monotonic() + START_TIMEOUT
+        while _connect(sock_path) is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+    raise MintError("mint daemon keeps restarting; see build/daemon.log")
+
+
+def stop_daemon(build_dir: Path) -> bool:
+    try:
+        return any(r.get("ok") for r in request(build_dir, {"cmd": "stop"}))
+    except MintError:
+        return False
+
+
+def daemon_status(build_dir: Path) -> dict | None:
+    try:
+        return next(iter(request(build_dir, {"cmd": "status"})), None)
+    except MintError:
+        return None
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .utils import fingerprint
+
+# Why an output is out of date (first element of ``rebuild_reason``).
+MISSING = "missing"  # the output does not exist
+NEW = "new"  # no record of how it was built
+COMMAND = "command"  # the command (flags, inputs of a link) changed
+INPUT = "input"  # the content of an input changed; the second element names it if known
+
+# ---------------------------------------------------------------------------
+# Depfile parsing
+# ---------------------------------------------------------------------------
+
+
+def parse_depfile(path: Path) -> List[Path]:
+    """Return the prerequisites listed in a Makefile-style depfile.
+
+    Handles line continuations and escaped spaces as emitted by GCC/Clang's
+    ``-MMD``.  Only the first rule is read, so phony targets added by ``-MP``
+    are ignored.
+    """
+
+    text = path.read_text(errors="replace").replace("\\\r\n", " ").replace("\\\n", " ")
+    rule = text.split("\n", 1)[0]
+
+    # The target ends at the first colon followed by whitespace (skips "C:\").
+    idx = 0
+    while True:
+        idx = rule.find(":", idx)
+        if idx == -1:
+            return []
+        if idx + 1 == len(rule) or rule[idx + 1] in " \t":
+            break
+        idx += 1
+
+    deps: List[Path] = []
+    token = []
+    chars = rule[idx + 1 :]
+    i = 0
+    while i < len(chars):
+        c = chars[i]
+        if c == "\\" and i + 1 < len(chars) and chars[i + 1] in " #":
+            token.append(chars[i + 1])
+            i += 2
+            continue
+        if c == "$" and i + 1 < len(chars) and chars[i + 1] == "$":
+            token.append("$")
+            i += 2
+            continue
+        if c in " \t":
+            if token:
+                deps.append(Path("".join(token)))
+                token = []
+        else:
+            token.append(c)
+        i += 1
+    if token:
+        deps.append(Path("".join(token)))
+    return deps
+
+
+# ---------------------------------------------------------------------------
+# Persistent dependency graph
+# ---------------------------------------------------------------------------
+
+
+class DepGraph:
+    """Per-object record of the inputs and command a translation unit was built from.
+
+    The graph lives in ``<build_dir>/deps.json``.  A shared file table maps
+    every input seen so far to its ``(mtime_ns, size, sha256)``; for every
+    object it stores the prerequisites from the compiler's depfile, a hash
+    of the compile command and a signature over the content of all inputs.
+    The stamps are only a prefilter: when they differ the file is
+    re-hashed, so touched-but-unchanged files (``git checkout``, cache
+    restores) do not trigger a rebuild while a flag change always does.
+    """
+
+    def __init__(self, build_dir: Path):
+        self.path = build_dir / "deps.json"
+        self._files: Dict[str, list] = {}
+        self._objects: Dict[str, dict] = {}
+        self._stats: Dict[str, Tuple[int, int] | None] = {}
+        # Inputs whose content was seen to change (or vanish) since the last save.
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                self._files = data["files"]
+                self._objects = data["objects"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self._files, self._objects = {}, {}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def deps(self, obj: Path) -> List[Path]:
+        entry = self._objects.get(str(obj))
+        return [Path(p) for p in entry["deps"]] if entry else []
+
+    def objects(self) -> List[Path]:
+        return [Path(p) for p in self._objects]
+
+    def needs_rebuild(self, obj: Path, src: Path, cmd: List[str]) -> bool:
+        """True if *obj* is missing or its inputs or command changed since it was built."""
+
+        return self.rebuild_reason(obj, src, cmd) is not None
+
+    def rebuild_reason(self, obj: Path, src: Path, cmd: List[str]) -> Tuple[str, str | None] | None:
+        """Why *obj* must be recompiled as ``(reason, changed input)``, or None if it is up to date."""
+
+        entry = self._objects.get(str(obj))
+        if self._stat(obj) is None or entry is None:
+            self._snapshot(_inputs(src, entry["deps"] if entry else []))
+            return (MISSING if self._stat(obj) is None else NEW), None
+        if entry.get("cmd") != command_hash(cmd):
+            return COMMAND, None
+        return self._input_change(_inputs(src, entry["deps"]), entry)
+
+    def outdated(self, output: Path, inputs: Sequence[Path], cmd: List[str]) -> bool:
+        """True unless *output* exists and was made by *cmd* from inputs with the same content.
+
+        Used for links: an object recompiled to identical bytes does not
+        count as a change (like Ninja's ``restat``).
+        """
+
+        return self.outdated_reason(output, inputs, cmd) is not None
+
+    def outdated_reason(self, output: Path, inputs: Sequence[Path], cmd: List[str]) -> Tuple[str, str | None] | None:
+        """Like :meth:`rebuild_reason`, for :meth:`outdated`."""
+
+        entry = self._objects.get(str(output))
+        if self._stat(output) is None or entry is None:
+            self._snapshot([str(p) for p in inputs])
+            return (MISSING if self._stat(output) is None else NEW), None
+        if entry.get("cmd") != command_hash(cmd) or entry.get("deps") != [str(p) for p in inputs]:
+            return COMMAND, None
+        return self._input_change(entry["deps"], entry)
+
+    def _snapshot(self, inputs: List[str]) -> None:
+        # Stamp and hash the inputs now, before the tool runs: record() reuses
+        # these, so an edit made meanwhile counts as a change next time.
+        for p in inputs:
+            self.digest(p)
+
+    def _input_change(self, inputs: List[str], entry: dict) -> Tuple[str, str | None] | None:
+        sig = self._signature(inputs, entry["cmd"])
+        if sig is not None and sig == entry.get("sig"):
+            return None
+        # Only known if this instance saw the file change; otherwise an earlier
+        # (interrupted) build already took note of it.
+        return INPUT, next((p for p in inputs if p in self._changed), None)
+
+    def digest(self, path: Path | str) -> str | None:
+        """Content hash of *path*, re-hashed only when its stamp changed."""
+
+        key = str(path)
+        st = self._stat(key)
+        rec = self._files.get(key)
+        if st is None:
+            if rec:
+                self._changed.add(key)
+            return None
+        if rec and rec[0] == st[0] and rec[1] == st[1]:
+            return rec[2]
+        try:
+            digest = fingerprint(Path(key))
+        except OSError:
+            return None
+        with self._lock:
+            if rec and rec[2] != digest:
+                self._changed.add(key)
+            self._files[key] = [st[0], st[1], digest]
+            self._dirty = True
+        return digest
+
+    def _stat(self, path: str | Path) -> Tuple[int, int] | None:
+        key = str(path)
+        if key not in self._stats:
+            try:
+                st = os.stat(key)
+                self._stats[key] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                self._stats[key] = None
+        return self._stats[key]
+
+    def _signature(self, inputs: List[str], cmd_hash: str) -> str | None:
+        h = hashlib.sha256(cmd_hash.encode())
+        for p in inputs:
+            digest = self.digest(p)
+            if digest is None:
+                return None
+            h.update(f"\0{p}\0{digest}".encode())
+        return h.hexdigest()
+
+    def invalidate(self, paths: Iterable[str] | None = None, under: Path | None = None) -> None:
+        """Forget remembered stats so the files are stat'ed again.
+
+        Stats are taken once per instance; a long-lived graph (``mint
+        daemon``) calls this for files that changed since.  Without
+        arguments every stat is dropped.
+        """
+
+        with self._lock:
+            if paths is None and under is None:
+                self._stats.clear()
+                return
+            for p in paths or ():
+                self._stats.pop(str(p), None)
+            if under is not None:
+                prefix = str(under) + os.sep
+                for key in [k for k in self._stats if k.startswith(prefix)]:
+                    del self._stats[key]
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def record(
+        self, obj: Path, src: Path, depfile: Path, cmd: List[str], cwd: Path, extra: Sequence[Path] = ()
+    ) -> None:
+        """Store the inputs listed in *depfile* and the signature of *obj*.
+
+        Relative paths in the depfile are resolved against *cwd*, the
+        directory the compiler was run from.  *extra* lists inputs the
+        depfile does not mention, such as a precompiled header.
+
+        Inputs checked before the compile (the source, and the known
+        prerequisites of an object built before) keep that stamp and hash,
+        so a file edited while the compiler ran is seen as changed on the
+        next build.  Headers first named by this depfile are hashed now; an
+        edit to one of them during the very first compile goes unnoticed.
+        """
+
+        if not depfile.exists():
+            return
+        deps = [str(p if p.is_absolute() else (cwd / p)) for p in parse_depfile(depfile)]
+        deps += [str(p) for p in extra if str(p) not in deps]
+        with self._lock:
+            self._stats.pop(str(obj), None)
+        cmd_hash = command_hash(cmd)
+        entry = {"deps": deps, "cmd": cmd_hash, "sig": self._signature(_inputs(src, deps), cmd_hash)}
+        with self._lock:
+            self._objects[str(obj)] = entry
+            self._dirty = True
+
+    def record_output(self, output: Path, inputs: Sequence[Path], cmd: List[str]) -> None:
+        """Remember the inputs and command *output* was just produced from (see :meth:`outdated`)."""
+
+        deps = [str(p) for p in inputs]
+        with self._lock:
+            self._stats.pop(str(output), None)
+        cmd_hash = command_hash(cmd)
+        entry = {"deps": deps, "cmd": cmd_hash, "sig": self._signature(deps, cmd_hash)}
+        with self._lock:
+            self._objects[str(output)] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            self._changed.clear()
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"files": self._files, "objects": self._objects}))
+            self._dirty = False
+
+
+def _inputs(src: Path, deps: List[str]) -> List[str]:
+    return [str(src), *[d for d in deps if d != str(src)]]
+
+
+def command_hash(cmd: List[str]) -> str:
+    return hashlib.sha256("\0".join(cmd).encode()).hexdigest()
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+from typing import Awaitable, Callable, List, Tuple, TypeVar
+
+from . import trace
+
+T = TypeVar("T")
+
+# ---------------------------------------------------------------------------
+# Subprocess execution on one asyncio event loop
+# ---------------------------------------------------------------------------
+
+# (exit code, stdout, stderr, resource usage or None)
+ProcessOutcome = Tuple[int, bytes, bytes, "os.struct_rusage | None"]
+
+_CHUNK = 1 << 16
+
+# Blocking helpers (remote compiles, hashing link inputs); threads start on demand.
+HELPER_THREADS = 64
+
+
+class ProcessExecutor:
+    """Runs subprocesses from an event loop on a single background thread.
+
+    Running commands cost a pipe reader each instead of a blocked thread,
+    and no more than *jobs* of them run at once (fewer while the load
+    average is above *load_limit*, like ``make -l``).  Coroutines are
+    handed in with :meth:`submit` (from any thread, returning a
+    ``concurrent.futures.Future``) or :meth:`call` (blocking).
+
+    Children are reaped with ``wait4`` so their peak RSS and CPU time are
+    known; on Linux the loop waits on a pidfd for the exit, elsewhere a
+    helper thread does.  Without ``os.wait4`` (Windows) every command
+    runs on a helper thread.
+    """
+
+    def __init__(self, jobs: int, load_limit: float | None = None):
+        self.jobs = max(1, jobs)
+        self.load_limit = load_limit
+        self._running = 0
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(max_workers=HELPER_THREADS, thread_name_prefix="mint-helper")
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mint-exec", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Handing in work
+    # ------------------------------------------------------------------
+    def in_loop(self) -> bool:
+        return threading.get_ident() == self._thread.ident
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Schedule *coro* on the loop; trace events it records stay on the caller's lane.
+
+        Cancelling the returned future cancels the coroutine; ``wait()`` on
+        it returns once the coroutine is actually done (its process killed).
+        """
+
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        wrapped = _guarded(trace.lane_key(), coro)
+
+        def relay(task: asyncio.Task) -> None:
+            try:
+                if task.cancelled():
+                    fut.cancel()
+                elif isinstance(task.exception(), _Escaped):
+                    fut.set_exception(task.exception().exc)
+                elif task.exception() is not None:
+                    fut.set_exception(task.exception())
+                else:
+                    fut.set_result(task.result())
+            except concurrent.futures.InvalidStateError:
+                pass  # cancelled by the caller meanwhile
+            if fut.cancelled():
+                fut.set_running_or_notify_cancel()  # only now wake up wait()
+
+        def start() -> None:
+            if fut.cancelled():
+                wrapped.close()
+                fut.set_running_or_notify_cancel()
+                return
+            task = self._loop.create_task(wrapped)
+            task.add_done_callback(relay)
+            fut.add_done_callback(lambda f: f.cancelled() and self._loop.call_soon_threadsafe(task.cancel))
+
+        self._loop.call_soon_threadsafe(start)
+        return fut
+
+    def call(self, coro: Awaitable[T]) -> T:
+        """Run *coro* on the loop and wait for it; cancels it if the wait is interrupted."""
+
+        if self.in_loop():
+            coro.close()
+            raise RuntimeError("blocking call from the executor's own loop; await the coroutine instead")
+        fut = self.submit(coro)
+        try:
+            return fut.result()
+        except BaseException:
+            fut.cancel()  # kills the running process
+            raise
+
+    def close(self) -> None:
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if not self.in_loop():
+                self._thread.join()
+        self._loop.close()
+
+    # ------------------------------------------------------------------
+    # Processes
+    # ------------------------------------------------------------------
+    async def process(
+        self, cmd: List[str], cwd=None, on_line: Callable[[str], None] | None = None,
+    ) -> ProcessOutcome:
+        """Run *cmd* once a job slot is free; stdout and stderr are captured.
+
+        With *on_line*, output is passed to it line by line as it arrives
+        (stdout and stderr interleaved), besides being captured.
+        """
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.jobs)
+        async with self._slots:
+            if self.load_limit is not None and hasattr(os, "getloadavg"):
+                # Never stall when nothing else is running.
+                while self._running > 0 and os.getloadavg()[0] > self.load_limit:
+                    await asyncio.sleep(0.25)
+            self._running += 1
+            try:
+                if not hasattr(os, "wait4"):
+                    return await asyncio.to_thread(_spawn_blocking, cmd, cwd)
+                return await self._spawn(cmd, cwd, on_line)
+            finally:
+                self._running -= 1
+
+    async def _spawn(self, cmd: List[str], cwd, on_line: Callable[[str], None] | None) -> ProcessOutcome:
+        loop = asyncio.get_running_loop()
+        # Own process group, so cancelling also kills what a wrapper (ccache, a script) started.
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, process_group=0)
+        transports = []
+        try:
+            readers = []
+            for pipe in (proc.stdout, proc.stderr):
+                reader = asyncio.StreamReader(limit=_CHUNK)
+                transport, _ = await loop.connect_read_pipe(lambda r=reader: asyncio.StreamReaderProtocol(r), pipe)
+                transports.append(transport)
+                readers.append(_drain(reader, on_line))
+            out, err = await asyncio.gather(*readers)
+            status, rusage = await _reap(loop, proc.pid)
+        except BaseException:
+            # Cancelled (or failed): the command must not outlive its caller.
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                proc.kill()
+            await asyncio.to_thread(proc.wait)
+            raise
+        finally:
+            for transport in transports:
+                transport.close()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return proc.returncode, out, err, rusage
+
+
+class _Escaped(Exception):
+    """Carries SystemExit/KeyboardInterrupt out of a task; raised as is, they would stop the loop."""
+
+    def __init__(self, exc: BaseException):
+        super().__init__(repr(exc))
+        self.exc = exc
+
+
+async def _guarded(key, coro: Awaitable[T]) -> T:
+    with trace.lane(key):
+        try:
+            return await coro
+        except (SystemExit, KeyboardInterrupt) as e:
+            raise _Escaped(e) from None
+
+
+async def _drain(reader: asyncio.StreamReader, on_line: Callable[[str], None] | None) -> bytes:
+    chunks = []
+    while True:
+        if on_line is None:
+            chunk = await reader.read(_CHUNK)
+        else:
+            try:
+                chunk = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                chunk = e.partial
+            except asyncio.LimitOverrunError as e:
+                chunk = await reader.readexactly(e.consumed)
+            try:
+                if chunk:
+                    on_line(chunk.decode(errors="replace").rstrip("\n"))
+            except (SystemExit, KeyboardInterrupt) as e:  # rich exits on a closed stdout
+                raise _Escaped(e) from None
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+async def _reap(loop: asyncio.AbstractEventLoop, pid: int):
+    """``(wait status, rusage)`` of child *pid*, without blocking the loop."""
+
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None  # kernel before 5.3
+    if pidfd is None:
+        _, status, rusage = await asyncio.to_thread(os.wait4, pid, 0)
+        return status, rusage
+    try:
+        exited = loop.create_future()
+        loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(pidfd)
+    finally:
+        os.close(pidfd)
+    _, status, rusage = os.wait4(pid, 0)  # readable pidfd: the child has exited
+    return status, rusage
+
+
+def _spawn_blocking(cmd: List[str], cwd) -> ProcessOutcome:
+    # Temp files instead of pipes: nothing to drain from a helper thread.
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.run(cmd, cwd=cwd, stdout=out, stderr=err)
+        out.seek(0)
+        err.seek(0)
+        return proc.returncode, out.read(), err.read(), None
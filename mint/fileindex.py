@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Pattern, Sequence, Tuple
+
+# ---------------------------------------------------------------------------
+# Project file index: one pruned directory walk per invocation
+# ---------------------------------------------------------------------------
+
+# Never descended into: build output, VCS metadata and dependency caches.
+PRUNE_DIRS = {"build", ".git", ".hg", ".svn", ".jj", "node_modules", "__pycache__", ".mypy_cache", ".pytest_cache"}
+
+IGNORE_FILES = (".gitignore", ".mintignore")
+
+_INDEXES: Dict[Tuple[Path, Path | None], "FileIndex"] = {}
+
+
+def glob_to_regex(pattern: str, anchored: bool = True) -> Pattern[str]:
+    """Translate a glob (``*``, ``?``, ``[..]``, ``**``) over ``/``-separated paths.
+
+    Unanchored patterns match at any depth, like ``Path.rglob``.
+    """
+
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1:end]
+            out.append("[^" + body[1:] + "]" if body.startswith("!") else "[" + body + "]")
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(prefix + "".join(out) + r"\Z")
+
+
+class IgnoreRules:
+    """The patterns of one ``.gitignore``/``.mintignore`` file, relative to its directory."""
+
+    def __init__(self, base: str, lines: Iterable[str]):
+        self.base = base  # posix path of the directory, relative to the root ("" for the root)
+        self.rules: List[Tuple[Pattern[str], bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip(" ")
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but at the end anchors the pattern to the file's directory.
+            anchored = "/" in line
+            self.rules.append((glob_to_regex(line.lstrip("/"), anchored), negate, dir_only))
+
+    def match(self, rel: str, is_dir: bool) -> bool | None:
+        """True/False if a rule (the last matching one) decides *rel*, None if none applies."""
+
+        if self.base:
+            if not rel.startswith(self.base + "/"):
+                return None
+            rel = rel[len(self.base) + 1:]
+        verdict = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                verdict = not negate
+        return verdict
+
+
+class FileIndex:
+    """All project files, found by a single pruned ``os.scandir`` walk.
+
+    Directories in :data:`PRUNE_DIRS`, the build directory and anything
+    matched by ``.gitignore``/``.mintignore`` files (nested ones included)
+    are skipped without being entered.  Files are indexed by extension;
+    ``dirs`` lists the directories that were walked.
+    """
+
+    def __init__(self, root: Path, build_dir: Path | None = None):
+        self.root = root
+        self.files: List[Path] = []
+        self.dirs: List[Path] = []
+        self.by_ext: Dict[str, List[Path]] = {}
+        self._rel: Dict[Path, str] = {}
+        self._walk(build_dir)
+
+    def _walk(self, build_dir: Path | None) -> None:
+        skip = {os.path.abspath(build_dir)} if build_dir else set()
+        stack: List[Tuple[str, str, List[IgnoreRules]]] = [(str(self.root), "", [])]
+        while stack:
+            path, rel, rules = stack.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            self.dirs.append(Path(path))
+            names = {e.name for e in entries}
+            local = list(rules)
+            for name in IGNORE_FILES:
+                if name in names:
+                    try:
+                        with open(os.path.join(path, name), encoding="utf-8", errors="replace") as fh:
+                            local.append(IgnoreRules(rel, fh))
+                    except OSError:
+                        pass
+            subdirs = []
+            for entry in entries:
+                entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir and (entry.name in PRUNE_DIRS or entry.path in skip):
+                    continue
+                if _ignored(local, entry_rel, is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append((entry.path, entry_rel, local))
+                else:
+                    p = Path(entry.path)
+                    self.files.append(p)
+                    self._rel[p] = entry_rel
+                    self.by_ext.setdefault(p.suffix, []).append(p)
+            # Reversed so the stack pops directories in name order.
+            stack.extend(sorted(subdirs, reverse=True))
+        self.files.sort()
+        for paths in self.by_ext.values():
+            paths.sort()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def with_suffix(self, *exts: str) -> List[Path]:
+        if len(exts) == 1:
+            return list(self.by_ext.get(exts[0], []))
+        return sorted(p for ext in exts for p in self.by_ext.get(ext, []))
+
+    def __contains__(self, path: Path) -> bool:
+        return Path(path) in self._rel
+
+    def has(self, *exts: str) -> bool:
+        return any(self.by_ext.get(ext) for ext in exts)
+
+    def under(self, directory: Path, *exts: str) -> List[Path]:
+        """Files with one of *exts* (any file if none) below *directory*."""
+
+        files = self.with_suffix(*exts) if exts else self.files
+        return [p for p in files if directory in p.parents]
+
+    def glob(self, pattern: str) -> List[Path]:
+        """Files matching *pattern* relative to the root (``Path.glob`` semantics)."""
+
+        return self._match(glob_to_regex(pattern.lstrip("/")), pattern)
+
+    def rglob(self, pattern: str) -> List[Path]:
+        """Files matching *pattern* at any depth (``Path.rglob`` semantics)."""
+
+        return self._match(glob_to_regex(pattern, anchored=False), pattern)
+
+    def _match(self, regex: Pattern[str], pattern: str) -> List[Path]:
+        # Narrow by a literal extension first, which is what nearly every pattern ends with.
+        ext = os.path.splitext(pattern)[1]
+        candidates: Sequence[Path] = self.files
+        if ext and not any(c in ext for c in "*?["):
+            candidates = self.by_ext.get(ext, [])
+        return [p for p in candidates if regex.match(self._rel[p])]
+
+
+def _ignored(rules: List[IgnoreRules], rel: str, is_dir: bool) -> bool:
+    verdict = False
+    for r in rules:
+        v = r.match(rel, is_dir)
+        if v is not None:
+            verdict = v
+    return verdict
+
+
+def file_index(root: Path, build_dir: Path | None = None) -> FileIndex:
+    """The (memoized) index of *root*; every caller in one invocation shares one walk."""
+
+    root = Path(root)
+    if build_dir is not None:
+        build_dir = Path(build_dir).resolve()
+        # The default ./build is pruned by name anyway; share that walk.
+        if build_dir.name in PRUNE_DIRS or root.resolve() not in build_dir.parents:
+            build_dir = None
+    key = (root.resolve(), build_dir)
+    if key not in _INDEXES:
+        _INDEXES[key] = FileIndex(root, build_dir)
+    return _INDEXES[key]
+
+
+def invalidate(root: Path | None = None) -> None:
+    """Forget cached indexes (of *root* only, if given) after the tree changed."""
+
+    for key in list(_INDEXES):
+        if root is None or key[0] == Path(root).resolve():
+            del _INDEXES[key]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Tuple
+
+from rich.console import Console
+
+from .utils import fingerprint
+
+console = Console()
+
+# ---------------------------------------------------------------------------
+# Content fingerprints of the toolchains (`<build_dir>/fingerprints.db`)
+# ---------------------------------------------------------------------------
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    namespace TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (namespace, path)
+) WITHOUT ROWID;
+"""
+
+# (mtime_ns, size, sha256)
+Record = Tuple[int, int, str]
+
+
+class FingerprintStore:
+    """Remembers the content of files a toolchain built from, in a SQLite database shared by all toolchains.
+
+    Each toolchain reads and writes only its *namespace*, which is loaded
+    with one query the first time a file is checked; creating a store
+    costs nothing.  :meth:`flush` writes just the entries that changed,
+    in one transaction: concurrent ``mint`` runs queue on SQLite's write
+    lock (WAL mode, so readers never wait) instead of overwriting each
+    other's files.  As in :class:`~mint.depgraph.DepGraph`, the stamp
+    ``(mtime_ns, size)`` is only a prefilter: a touched file is re-hashed
+    and counts as changed only if its content did.
+    """
+
+    def __init__(self, build_dir: Path, namespace: str):
+        self.path = build_dir / "fingerprints.db"
+        self.namespace = namespace
+        self._records: Dict[str, Record] | None = None
+        # Seen by changed() and not yet confirmed by update(): the state the build started from.
+        self._seen: Dict[str, Record] = {}
+        self._pending: Dict[str, Record] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def changed(self, path: Path) -> bool:
+        """True if *path* is new or its content differs from when :meth:`update` last recorded it."""
+
+        key = str(path)
+        current = self._current(path)
+        if current is None:
+            return True
+        with self._lock:
+            self._seen[key] = current
+            old = self._load().get(key)
+        if old is None or old[2] != current[2]:
+            return True
+        if old[:2] != current[:2]:
+            self._put(key, current)  # touched but unchanged: no re-hash next time
+        return False
+
+    def _current(self, path: Path) -> Record | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = str(path)
+        with self._lock:
+            old = self._pending.get(key) or self._load().get(key)
+        if old is not None and old[:2] == (st.st_mtime_ns, st.st_size):
+            return old
+        try:
+            return st.st_mtime_ns, st.st_size, fingerprint(path)
+        except OSError:
+            return None
+
+    def _load(self) -> Dict[str, Record]:
+        # Called with the lock held.
+        if self._records is None:
+            self._records = {}
+            if self.path.exists():
+                try:
+                    with closing(self._connect()) as db:
+                        rows = db.execute(
+                            "SELECT path, mtime_ns, size, digest FROM fingerprints WHERE namespace = ?", (self.namespace,)
+                        ).fetchall()
+                    self._records = {path: (mtime, size, digest) for path, mtime, size, digest in rows}
+                except sqlite3.Error as e:
+                    console.print(f"[yellow]Ignoring unreadable fingerprints in {self.path}: {e}[/]")
+        return self._records
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def update(self, path: Path) -> None:
+        """Record the content of *path* as built.
+
+        Uses what :meth:`changed` saw before the build, so an edit made
+        while the tool ran still counts as a change next time.
+        """
+
+        key = str(path)
+        with self._lock:
+            record = self._seen.pop(key, None)
+        record = record or self._current(path)
+        if record is not None:
+            self._put(key, record)
+
+    def _put(self, key: str, record: Record) -> None:
+        with self._lock:
+            self._load()[key] = record
+            self._pending[key] = record
+
+    def flush(self) -> None:
+        """Write the entries changed since the last flush in one transaction."""
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with closing(self._connect()) as db:
+                db.execute("BEGIN IMMEDIATE")
+                db.executemany(
+                    "INSERT OR REPLACE INTO fingerprints (namespace, path, mtime_ns, size, digest) VALUES (?, ?, ?, ?, ?)",
+                    [(self.namespace, key, *record) for key, record in pending.items()],
+                )
+                db.execute("COMMIT")
+        except sqlite3.Error as e:
+            console.print(f"[yellow]Could not save fingerprints to {self.path}: {e}[/]")
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: transactions are explicit (BEGIN IMMEDIATE takes the write lock up front).
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")
+        if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DROP TABLE IF EXISTS fingerprints")
+            db.execute(_SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.execute("COMMIT")
+        return db
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from rich.console import Console
+
+from .utils import is_dry_run
+
+console = Console()
+
+# ---------------------------------------------------------------------------
+# Build history (`<build_dir>/history.db`, read by `mint stats`)
+# ---------------------------------------------------------------------------
+
+SCHEMA_VERSION = 1
+
+# Older builds are dropped when a new one is recorded.
+KEEP_BUILDS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    toolchain TEXT NOT NULL,
+    ok INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    build_id INTEGER NOT NULL REFERENCES builds(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sec REAL NOT NULL,
+    cpu REAL NOT NULL,
+    rss INTEGER NOT NULL,
+    cache TEXT,
+    reason TEXT,
+    cause TEXT,
+    ok INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_build ON jobs(build_id);
+"""
+
+_JOB_COLUMNS = ("kind", "key", "sec", "cpu", "rss", "cache", "reason", "cause", "ok")
+
+
+class BuildHistory:
+    """One row per build and per job run in it, in a SQLite database.
+
+    Jobs are collected in memory while the build runs (from any thread)
+    and written in one transaction by :meth:`commit`, so recording costs
+    the build nothing measurable.  ``cache`` is ``hit``/``miss`` (None
+    without a cache), ``reason`` why the job ran (see
+    :mod:`mint.depgraph`) and ``cause`` the changed input, if known.
+    """
+
+    def __init__(self, build_dir: Path):
+        self.path = build_dir / "history.db"
+        self._jobs: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self, kind: str, key: str, *, sec: float, cpu: float = 0.0, rss: int = 0, cache: str | None = None,
+        reason: str | None = None, cause: str | None = None, ok: bool = True,
+    ) -> None:
+        with self._lock:
+            self._jobs.append((kind, key, round(sec, 4), round(cpu, 4), rss, cache, reason, cause, int(ok)))
+
+    def commit(self, started: float, toolchain: str, ok: bool) -> None:
+        """Store the build that began at *started* (epoch seconds) with the jobs recorded since the last commit.
+
+        A history that cannot be written (read-only or locked build
+        directory) only costs a warning.
+        """
+
+        with self._lock:
+            jobs, self._jobs = self._jobs, []
+        try:
+            with closing(self._connect()) as db, db:
+                cur = db.execute(
+                    "INSERT INTO builds (started, duration, toolchain, ok) VALUES (?, ?, ?, ?)",
+                    (started, round(time.time() - started, 4), toolchain, int(ok)),
+                )
+                build_id = cur.lastrowid
+                db.executemany(
+                    f"INSERT INTO jobs (build_id, {', '.join(_JOB_COLUMNS)}) VALUES (?{', ?' * len(_JOB_COLUMNS)})",
+                    [(build_id, *job) for job in jobs],
+                )
+                db.execute("DELETE FROM builds WHERE id <= ?", (build_id - KEEP_BUILDS,))
+        except sqlite3.Error as e:
+            console.print(f"[yellow]Could not record build history in {self.path}: {e}[/]")
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA foreign_keys = ON")
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Only a cache of past timings: start over rather than migrate.
+            db.executescript("DROP TABLE IF EXISTS jobs; DROP TABLE IF EXISTS builds;")
+            db.executescript(_SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return db
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+    def report(self, last: int = 20, top: int = 10) -> Dict[str, list]:
+        """Summary of the *last* builds with *top* rows per section (see ``mint stats``)."""
+
+        if not self.path.exists():
+            return {"builds": [], "slowest_units": [], "most_rebuilt": [], "causes": []}
+        with closing(self._connect()) as db:
+            db.row_factory = sqlite3.Row
+            (first,) = db.execute(
+                "SELECT COALESCE(MIN(id), 0) FROM (SELECT id FROM builds ORDER BY id DESC LIMIT ?)", (last,)
+            ).fetchone()
+            builds = db.execute(
+                """
+                SELECT b.id, b.started, b.duration, b.toolchain, b.ok,
+                       COUNT(j.key) AS jobs,
+                       COALESCE(SUM(j.cache = 'hit'), 0) AS hits,
+                       COALESCE(SUM(j.cache = 'miss'), 0) AS misses,
+                       COALESCE(SUM(CASE WHEN j.cache = 'hit' THEN 0 ELSE j.cpu END), 0) AS cpu
+                FROM builds b LEFT JOIN jobs j ON j.build_id = b.id
+                WHERE b.id >= ? GROUP BY b.id ORDER BY b.id
+                """,
+                (first,),
+            ).fetchall()
+            # Cache hits say nothing about how long the unit takes to compile.
+            slowest = db.execute(
+                """
+                SELECT key, COUNT(*) AS runs, AVG(sec) AS avg_sec, MAX(sec) AS max_sec,
+                       AVG(cpu) AS avg_cpu, MAX(rss) AS max_rss
+                FROM jobs WHERE build_id >= ? AND kind = 'compile' AND ok AND COALESCE(cache, '') != 'hit'
+                GROUP BY key ORDER BY avg_sec DESC, key LIMIT ?
+                """,
+                (first, top),
+            ).fetchall()
+            rebuilt = db.execute(
+                """
+                SELECT key, COUNT(*) AS runs, SUM(sec) AS total_sec,
+                       SUM(reason = 'input') AS input, SUM(reason = 'command') AS command,
+                       SUM(reason IN ('new', 'missing')) AS new
+                FROM jobs WHERE build_id >= ? AND kind = 'compile'
+                GROUP BY key ORDER BY runs DESC, total_sec DESC, key LIMIT ?
+                """,
+                (first, top),
+            ).fetchall()
+            causes = db.execute(
+                """
+                SELECT cause, COUNT(*) AS rebuilds, COUNT(DISTINCT build_id) AS builds, SUM(sec) AS total_sec
+                FROM jobs WHERE build_id >= ? AND kind = 'compile' AND cause IS NOT NULL
+                GROUP BY cause ORDER BY rebuilds DESC, cause LIMIT ?
+                """,
+                (first, top),
+            ).fetchall()
+        return {
+            "builds": [_row(r) for r in builds],
+            "slowest_units": [_row(r) for r in slowest],
+            "most_rebuilt": [_row(r) for r in rebuilt],
+            "causes": [_row(r) for r in causes],
+        }
+
+
+@contextmanager
+def recorded_build(build_dir: Path, toolchain: str, history: BuildHistory | None = None) -> Iterator[None]:
+    """Add the build run in the block to ``<build_dir>/history.db``, failed or not (dry runs are not recorded).
+
+    Every ``mint build`` passes through here, whatever the toolchain.  Pass
+    the :class:`BuildHistory` the build recorded its jobs in (the C/C++
+    builder's); other toolchains only get the build row.
+    """
+
+    history = history or BuildHistory(build_dir)
+    started, ok = time.time(), False
+    try:
+        yield
+        ok = True
+    finally:
+        if not is_dry_run():
+            history.commit(started, toolchain, ok)
+
+
+def _row(row: sqlite3.Row) -> Dict[str, object]:
+    return {k: round(row[k], 3) if isinstance(row[k], float) else row[k] for k in row.keys()}
+
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Set
+
+# ---------------------------------------------------------------------------
+# Include graph and the `mint analyze includes` report
+# ---------------------------------------------------------------------------
+
+INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.M)
+
+
+def include_dirs(flags: Sequence[str], root: Path) -> List[Path]:
+    """Directories from ``-I``/``-iquote`` in *flags* (relative ones against *root*)."""
+
+    dirs: List[Path] = []
+    it = iter(flags)
+    for flag in it:
+        for opt in ("-iquote", "-I"):
+            if flag == opt:
+                value = next(it, None)
+            elif flag.startswith(opt):
+                value = flag[len(opt):]
+            else:
+                continue
+            if value:
+                path = root / value if not os.path.isabs(value) else Path(value)
+                if path not in dirs:
+                    dirs.append(path)
+            break
+    return dirs
+
+
+class IncludeScanner:
+    """Finds the direct ``#include``s of a file without running the preprocessor.
+
+    Quoted includes are looked up next to the including file first, then
+    in the include directories; ``<...>`` only in the include directories.
+    Headers that do not resolve (the standard library, system headers) are
+    left out.  Conditional compilation is ignored, so an include guarded by
+    ``#if`` counts as if it were always taken.
+    """
+
+    def __init__(self, dirs: Sequence[Path]):
+        self.dirs = list(dirs)
+        self._memo: Dict[Path, List[Path]] = {}
+        self._closures: Dict[Path, Set[Path]] = {}
+
+    def includes(self, path: Path) -> List[Path]:
+        if path not in self._memo:
+            try:
+                text = path.read_bytes()
+            except OSError:
+                text = b""
+            found: List[Path] = []
+            for kind, name in INCLUDE_RE.findall(text):
+                target = self._resolve(name.decode(errors="replace").strip(), path.parent, kind == b'"')
+                if target is not None and target not in found:
+                    found.append(target)
+            self._memo[path] = found
+        return self._memo[path]
+
+    def _resolve(self, name: str, here: Path, quoted: bool) -> Path | None:
+        for base in ([here] if quoted else []) + self.dirs:
+            candidate = base / name
+            if candidate.is_file():
+                return Path(os.path.normpath(candidate))
+        return None
+
+    def closure(self, source: Path) -> Set[Path]:
+        """Every header *source* includes, directly or not (include cycles are fine)."""
+
+        if source not in self._closures:
+            self._closures[source] = self.closure_without(source, None)
+        return self._closures[source]
+
+    def closure_without(self, source: Path, cut: Path | None) -> Set[Path]:
+        """The closure of *source* as if it did not include *cut* itself."""
+
+        seen: Set[Path] = set()
+        stack = [h for h in self.includes(source) if h != cut]
+        while stack:
+            header = stack.pop()
+            if header in seen:
+                continue
+            seen.add(header)
+            stack.extend(h for h in self.includes(header) if not (header == source and h == cut))
+        seen.discard(source)
+        return seen
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def include_report(
+    sources: Iterable[Path], scanner: IncludeScanner, cost: Callable[[Path], float], *,
+    root: Path | None = None, top: int = 20,
+) -> dict:
+    """Impact of every project header on the build.
+
+    Per header: ``tus`` – translation units that include it (what touching
+    it recompiles), ``cost_s`` – their summed historical compile time,
+    ``bytes`` – its own size, ``closure_bytes`` – its size plus everything
+    it pulls in, and ``parsed_bytes`` – ``closure_bytes`` times ``tus``,
+    what it adds to the preprocessed input of the build.
+
+    ``candidates`` ranks the header-to-header includes by the bytes the
+    includer's translation units parse only because of that one line:
+    the places where a forward declaration or splitting the header pays
+    off most.  It is an upper bound: a TU that also reaches those headers
+    some other way keeps parsing them.
+    """
+
+    sources = sorted(set(sources))
+    includers: Dict[Path, List[Path]] = {}
+    for src in sources:
+        for header in scanner.closure(src):
+            includers.setdefault(header, []).append(src)
+
+    def closure_bytes(header: Path) -> int:
+        return _size(header) + sum(_size(h) for h in scanner.closure(header))
+
+    def name(path: Path) -> str:
+        if root is not None:
+            try:
+                return str(path.relative_to(root))
+            except ValueError:
+                pass
+        return str(path)
+
+    rows = []
+    for header, tus in includers.items():
+        cb = closure_bytes(header)
+        rows.append({
+            "header": name(header),
+            "tus": len(tus),
+            "cost_s": round(sum(cost(t) for t in tus), 2),
+            "bytes": _size(header),
+            "closure_bytes": cb,
+            "parsed_bytes": cb * len(tus),
+        })
+    rows.sort(key=lambda r: (-r["cost_s"], -r["tus"], r["header"]))
+
+    candidates = []
+    for parent in includers:
+        for child in scanner.includes(parent):
+            # Headers the parent pulls in only through this one include.
+            tus = includers[parent]
+            extra = scanner.closure(parent) - scanner.closure_without(parent, child)
+            saved = sum(_size(h) for h in extra) * len(tus)
+            if saved:
+                candidates.append({
+                    "includer": name(parent), "header": name(child), "tus": len(tus),
+                    "saved_bytes": saved, "cost_s": round(sum(cost(t) for t in tus), 2),
+                })
+    candidates.sort(key=lambda c: (-c["saved_bytes"], c["includer"], c["header"]))
+
+    return {
+        "units": len(sources),
+        "headers": rows[:top] if top else rows,
+        "candidates": candidates[:top] if top else candidates,
+    }
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+from pathlib import Path
+from typing import Dict
+
+# Assumed peak RSS of a compile we have never measured (and no history at all).
+DEFAULT_RSS = 256 * 1024 ** 2
+
+# Weight of the newest sample in the moving average of job durations.
+DURATION_ALPHA = 0.5
+
+
+class JobStats:
+    """Observed resource usage per job, persisted in ``<build_dir>/jobstats.json``.
+
+    Keys are stable job identifiers (source paths relative to the project
+    root).  The scheduler uses the numbers as estimates for the next run.
+    """
+
+    def __init__(self, build_dir: Path):
+        self.path = build_dir / "jobstats.json"
+        self._data: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._slowest: float | None = None
+        try:
+            self._data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._data = {}
+
+    def rss(self, key: str) -> int:
+        """Expected peak RSS in bytes; unknown jobs get the median of known ones."""
+
+        entry = self._data.get(key)
+        if entry and entry.get("rss"):
+            return entry["rss"]
+        known = [e["rss"] for e in self._data.values() if e.get("rss")]
+        return int(statistics.median(known)) if known else DEFAULT_RSS
+
+    def duration(self, key: str) -> float:
+        """Expected wall time in seconds; unknown jobs count as the slowest known one."""
+
+        entry = self._data.get(key)
+        if entry and "sec" in entry:
+            return entry["sec"]
+        if self._slowest is None:
+            self._slowest = max((e["sec"] for e in self._data.values() if "sec" in e), default=0.0)
+        return self._slowest
+
+    def record(self, key: str, *, rss: int = 0, sec: float | None = None) -> None:
+        with self._lock:
+            entry = self._data.setdefault(key, {})
+            if rss:
+                entry["rss"] = rss
+            if sec is not None:
+                old = entry.get("sec")
+                entry["sec"] = round(sec if old is None else DURATION_ALPHA * sec + (1 - DURATION_ALPHA) * old, 4)
+                self._slowest = None
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._data, indent=1, sort_keys=True))
+            self._dirty = False
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from typing import Dict, List, Tuple
+
+from .utils import MintError, check_keys
+
+# ---------------------------------------------------------------------------
+# Linker selection & debug-info layout per build profile
+# ---------------------------------------------------------------------------
+
+# ``-fuse-ld=`` value -> executable the compiler driver will look for.
+LINKERS = {"mold": "mold", "lld": "ld.lld", "gold": "ld.gold", "bfd": "ld.bfd"}
+
+# Tried in this order for ``linker: auto``.
+AUTO_LINKERS = ("mold", "lld")
+
+# Linkers that can build a .gdb_index section.
+GDB_INDEX_LINKERS = {"mold", "lld", "gold"}
+
+PROFILE_DEFAULTS: Dict = {"linker": "auto", "split_dwarf": False, "gdb_index": False, "compress_debug": False}
+PROFILE_KEYS = {"linker", "split_dwarf", "gdb_index", "compress_debug", "cxxflags", "ldflags"}
+
+_PROBES: Dict[Tuple[str, str], bool] = {}
+
+
+def load_profile(profiles: Dict | None, release: bool) -> Dict:
+    """Settings of the active profile from the ``profiles:`` section, with defaults filled in."""
+
+    name = "release" if release else "debug"
+    data = (profiles or {}).get(name) or {}
+    if not isinstance(data, dict):
+        raise MintError(f"Profile '{name}' must be a mapping")
+    check_keys(data, PROFILE_KEYS, f" in profile '{name}'")
+    linker = data.get("linker", "auto")
+    if linker not in {"auto", "default", *LINKERS}:
+        raise MintError(f"Profile '{name}': linker must be auto, default or one of {', '.join(LINKERS)}")
+    return {**PROFILE_DEFAULTS, **data}
+
+
+def probe_linker(compiler: str, name: str) -> bool:
+    """True if *compiler* can drive linker *name* through ``-fuse-ld=``."""
+
+    memo = (compiler, name)
+    if memo not in _PROBES:
+        ok = False
+        if shutil.which(LINKERS[name]):
+            # The driver resolves -fuse-ld itself (gcc < 12.1 rejects mold),
+            # so ask it to run the linker rather than trusting PATH alone.
+            try:
+                proc = subprocess.run(
+                    [compiler, f"-fuse-ld={name}", "-Wl,--version"], capture_output=True, text=True, timeout=30
+                )
+                ok = proc.returncode == 0
+            except (OSError, subprocess.TimeoutExpired):
+                ok = False
+        _PROBES[memo] = ok
+    return _PROBES[memo]
+
+
+def select_linker(compiler: str, choice: str) -> str | None:
+    """Resolve the ``linker:`` setting to a ``-fuse-ld=`` value, None for the toolchain default."""
+
+    if choice == "default":
+        return None
+    if choice == "auto":
+        return next((name for name in AUTO_LINKERS if probe_linker(compiler, name)), None)
+    if not probe_linker(compiler, choice):
+        raise MintError(f"Linker '{choice}' requested but {compiler} cannot use it (is {LINKERS[choice]} installed?)")
+    return choice
+
+
+def compile_flags(profile: Dict) -> List[str]:
+    """Debug-info flags the profile adds to every compile."""
+
+    flags: List[str] = []
+    if profile.get("split_dwarf"):
+        flags.append("-gsplit-dwarf")
+    if profile.get("gdb_index"):
+        # The linker builds the index from the pubnames sections.
+        flags.append("-ggnu-pubnames")
+    return flags
+
+
+def link_flags(compiler: str, profile: Dict) -> Tuple[List[str], str]:
+    """Flags the profile adds to the link, plus a short description for the timing summary."""
+
+    linker = select_linker(compiler, profile.get("linker", "auto"))
+    flags: List[str] = []
+    notes = [linker or "default linker"]
+    if linker:
+        flags.append(f"-fuse-ld={linker}")
+    if profile.get("gdb_index") and linker in GDB_INDEX_LINKERS:
+        flags.append("-Wl,--gdb-index")
+        notes.append("gdb-index")
+    if profile.get("compress_debug"):
+        flags.append("-gz")
+        notes.append("compressed debug")
+    return flags, ", ".join(notes)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from .depgraph import DepGraph
+from .utils import MintError, run
+from .worker import compiler_banner
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*([<"])([^>"]+)[>"]', re.MULTILINE)
+
+C_EXTS = {".c"}
+
+# Auto mode: a header must be included by at least this share of the C++
+# translation units, and there must be enough TUs for a PCH to pay off.
+AUTO_MIN_SHARE = 0.5
+AUTO_MIN_TUS = 3
+
+
+def scan_includes(path: Path) -> List[Tuple[str, str]]:
+    """Return the ``(delimiter, name)`` pairs of the direct includes in *path*."""
+
+    try:
+        text = path.read_text(errors="replace")
+    except OSError:
+        return []
+    return INCLUDE_RE.findall(text)
+
+
+def is_clang(compiler: str) -> bool:
+    """True for clang and Apple clang (from the banner :func:`~mint.worker.compiler_banner` probed once per run)."""
+
+    return "clang" in compiler_banner(compiler).lower()
+
+
+def common_headers(sources: Sequence[Path]) -> List[str]:
+    """Pick the system/third-party headers included by most C++ TUs."""
+
+    tus = [s for s in sources if s.suffix not in C_EXTS]
+    if len(tus) < AUTO_MIN_TUS:
+        return []
+    counts: Counter = Counter()
+    order: Dict[str, int] = {}
+    for src in tus:
+        # dict keeps file order, so the generated PCH is stable across runs
+        seen = dict.fromkeys(name for delim, name in scan_includes(src) if delim == "<")
+        for name in seen:
+            order.setdefault(name, len(order))
+        counts.update(list(seen))
+    threshold = max(2, int(len(tus) * AUTO_MIN_SHARE + 0.5))
+    picked = [name for name, n in counts.items() if n >= threshold]
+    return [f"<{name}>" for name in sorted(picked, key=order.__getitem__)]
+
+
+def shares_prefix(src: Path, headers: Sequence[str], project_root: Path) -> bool:
+    """True if *src* includes every PCH header itself, so ``-include``-ing the PCH changes nothing it sees.
+
+    *headers* are operands as returned by :meth:`PchManager.resolve_headers`;
+    quoted includes match by resolved path (next to *src*, then the project root).
+    """
+
+    found = set()
+    for delim, name in scan_includes(src):
+        if delim == "<":
+            found.add(f"<{name}>")
+            continue
+        found.add(f'"{name}"')
+        for base in (src.parent, project_root):
+            if (base / name).is_file():
+                found.add(f'"{(base / name).resolve()}"')
+                break
+    return all(h in found for h in headers)
+
+
+class PchManager:
+    """Builds one precompiled header per flag set under ``<build_dir>/pch``.
+
+    The PCH is tracked in the shared :class:`DepGraph` like any other
+    object (with ``-MD`` so system headers count too), so it is rebuilt when
+    one of its headers or the flag set changes.
+    """
+
+    def __init__(self, compiler: str, project_root: Path, build_dir: Path, depgraph: DepGraph):
+        self.compiler = compiler
+        self.project_root = project_root
+        self.pch_root = build_dir / "pch"
+        self.depgraph = depgraph
+
+    def resolve_headers(self, setting: str | List[str] | None, sources: Sequence[Path]) -> List[str]:
+        """Turn the ``pch:`` config value into ``#include`` operands."""
+
+        if not setting:
+            return []
+        if setting == "auto":
+            return common_headers(sources)
+        if isinstance(setting, str) or not all(isinstance(h, str) for h in setting):
+            raise MintError("'pch' must be 'auto' or a list of header names")
+        headers = []
+        for h in setting:
+            if h.startswith(("<", '"')):
+                headers.append(h)
+            elif (self.project_root / h).is_file():
+                headers.append(f'"{(self.project_root / h).resolve()}"')
+            else:
+                headers.append(f"<{h}>")
+        return headers
+
+    def ensure(self, headers: List[str], flags: List[str]) -> Tuple[List[str], Path | None]:
+        """Build (if stale) the PCH for *headers* compiled with *flags*.
+
+        Returns the flags to add to each C++ compile and the PCH file that
+        objects should depend on.
+        """
+
+        if not headers:
+            return [], None
+        clang = is_clang(self.compiler)
+        sig = hashlib.sha256("\0".join([self.compiler, *flags, *headers]).encode()).hexdigest()[:12]
+        out_dir = self.pch_root / sig
+        out_dir.mkdir(parents=True, exist_ok=True)
+        header = out_dir / "mint_pch.hpp"
+        text = "// Generated by mint – do not edit.\n#pragma once\n" + "".join(f"#include {h}\n" for h in headers)
+        if not header.exists() or header.read_text() != text:
+            header.write_text(text)
+        pch = header.with_name(header.name + (".pch" if clang else ".gch"))
+        depfile = out_dir / "mint_pch.d"
+        cmd = [
+            self.compiler, "-x", "c++-header", *flags, "-I", str(self.project_root),
+            "-MD", "-MF", str(depfile), "-o", str(pch), str(header),
+        ]
+        if self.depgraph.needs_rebuild(pch, header, cmd):
+            if run(cmd) is not None:  # None: dry run
+                self.depgraph.record(pch, header, depfile, cmd, Path.cwd())
+        if clang:
+            return ["-include-pch", str(pch)], pch
+        return ["-include", str(header), "-Winvalid-pch"], pch
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from rich.console import Console
+
+from .utils import MintError, check_keys
+
+console = Console()
+
+# ---------------------------------------------------------------------------
+# Remote build cache over HTTP (bazel-remote style: /cas/<sha256>, /ac/<key>)
+# ---------------------------------------------------------------------------
+
+REMOTE_KEYS = {"url", "mode", "timeout", "concurrency"}
+MODES = {"read-only", "read-write"}
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONCURRENCY = 4
+
+
+class RemoteCache:
+    """Client of an HTTP cache shared between machines.
+
+    Blobs are stored content-addressed under ``/cas/<sha256>``; an action
+    (a compile or a toolchain step, identified by a key over its command
+    and inputs) maps to its outputs under ``/ac/<key>`` as JSON
+    ``{"outputs": {name: sha256}, "executable": [name, ...]}``.  Uploads
+    run in the background, at most *concurrency* requests at a time.  The
+    first network error
+    disables the cache for the rest of the run: a slow or unreachable
+    server must never fail a build.
+    """
+
+    def __init__(
+        self, url: str, *, mode: str = "read-write", timeout: float = DEFAULT_TIMEOUT,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        if mode not in MODES:
+            raise MintError(f"remote_cache mode must be one of {', '.join(sorted(MODES))}")
+        self.url = url.rstrip("/")
+        self.writable = mode == "read-write"
+        self.timeout = float(timeout)
+        self.concurrency = max(1, int(concurrency))
+        self.hits = 0
+        self.misses = 0
+        self.uploaded = 0
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._requests = threading.BoundedSemaphore(self.concurrency)
+        self._uploads: ThreadPoolExecutor | None = None
+        self._pending: List[Future] = []
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _request(self, method: str, path: str, data: bytes | None = None) -> bytes | None:
+        """Body of the response, None for 404 (or once the cache is disabled)."""
+
+        if self.disabled:
+            return None
+        # Imported on first use: http.client is not needed by builds without a remote cache.
+        import urllib.error
+        import urllib.request
+
+        req = urllib.request.Request(f"{self.url}/{path}", data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/octet-stream")
+        try:
+            with self._requests, urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            self._disable(f"HTTP {e.code}")
+        except (OSError, ValueError) as e:
+            self._disable(str(getattr(e, "reason", e)))
+        return None
+
+    def _disable(self, why: str) -> None:
+        with self._lock:
+            if self.disabled:
+                return
+            self.disabled = True
+        console.print(f"[yellow]Remote cache {self.url} unavailable ({why}); continuing without it[/]")
+
+    def get_blob(self, digest: str) -> bytes | None:
+        data = self._request("GET", f"cas/{digest}")
+        if data is not None and hashlib.sha256(data).hexdigest() != digest:
+            return None  # corrupt: treat as a miss
+        return data
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        self._request("PUT", f"cas/{digest}", data)
+        return digest
+
+    def get_action(self, key: str) -> dict | None:
+        data = self._request("GET", f"ac/{key}")
+        try:
+            result = json.loads(data) if data is not None else None
+        except ValueError:
+            return None
+        return result if isinstance(result, dict) and isinstance(result.get("outputs"), dict) else None
+
+    def put_action(self, key: str, result: dict) -> None:
+        self._request("PUT", f"ac/{key}", json.dumps(result, sort_keys=True).encode())
+
+    # ------------------------------------------------------------------
+    # Actions with file outputs
+    # ------------------------------------------------------------------
+    def fetch(self, key: str, outputs: Dict[str, Path]) -> bool:
+        """Restore all *outputs* (name -> path) of action *key*; False unless every one was found."""
+
+        result = self.get_action(key)
+        digests = result["outputs"] if result else {}
+        blobs: List[Tuple[Path, bytes]] = []
+        if result is not None and set(outputs) <= set(digests):
+            for name, path in outputs.items():
+                data = self.get_blob(digests[name])
+                if data is None:
+                    break
+                blobs.append((path, data))
+        if len(blobs) != len(outputs) or not outputs:
+            with self._lock:
+                self.misses += 1
+            return False
+        executable = set(result.get("executable") or ())
+        for name, (path, data) in zip(outputs, blobs):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            if name in executable:
+                tmp.chmod(0o755)
+            os.replace(tmp, path)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, outputs: Dict[str, Path]) -> None:
+        """Upload *outputs* of action *key* in the background (read-write mode only)."""
+
+        if not self.writable or self.disabled or not outputs:
+            return
+        try:
+            blobs = {name: path.read_bytes() for name, path in outputs.items()}
+        except OSError:
+            return
+        executable = sorted(name for name, path in outputs.items() if os.access(path, os.X_OK))
+        with self._lock:
+            if self._uploads is None:
+                self._uploads = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="mint-upload")
+            self._pending.append(self._uploads.submit(self._upload, key, blobs, executable))
+
+    def _upload(self, key: str, blobs: Dict[str, bytes], executable: List[str]) -> None:
+        digests = {name: self.put_blob(data) for name, data in blobs.items()}
+        if not self.disabled:
+            # The action entry goes last: readers never see outputs that are not there yet.
+            result = {"outputs": digests, **({"executable": executable} if executable else {})}
+            self.put_action(key, result)
+            with self._lock:
+                self.uploaded += 1
+
+    def flush(self) -> None:
+        """Wait for pending uploads."""
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for fut in pending:
+            fut.exception()
+
+
+def remote_cache_from_config(value) -> RemoteCache | None:
+    """The remote cache configured by ``remote_cache:`` in mint.yaml or ``MINT_REMOTE_CACHE``.
+
+    ``remote_cache`` is a URL or a mapping with ``url``, ``mode``
+    (``read-write``/``read-only``), ``timeout`` and ``concurrency``.
+    """
+
+    if value is None and os.getenv("MINT_REMOTE_CACHE"):
+        value = {"url": os.environ["MINT_REMOTE_CACHE"], "mode": os.getenv("MINT_REMOTE_CACHE_MODE", "read-write")}
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = {"url": value}
+    if not isinstance(value, dict) or not value.get("url"):
+        raise MintError("'remote_cache' must be a URL or a mapping with a 'url'")
+    check_keys(value, REMOTE_KEYS, " in 'remote_cache'")
+    return RemoteCache(
+        str(value["url"]), mode=value.get("mode", "read-write"),
+        timeout=value.get("timeout", DEFAULT_TIMEOUT), concurrency=value.get("concurrency", DEFAULT_CONCURRENCY),
+    )
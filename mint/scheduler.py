@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from . import trace
+from .utils import executor
+
+
+class Job:
+    """A unit of work for the :class:`Scheduler`.
+
+    *rss* is the expected peak memory of the job in bytes and *cost* its
+    expected duration in seconds.  The job starts only after all jobs in
+    *deps* finished successfully.  Ready jobs with a higher *urgency* (e.g.
+    the time their source was last edited) start before all others.  *fn*
+    may be a coroutine function; it then runs on the process executor's
+    event loop rather than on a thread.
+    """
+
+    def __init__(
+        self, key: str, fn: Callable, *args, rss: int = 0, cost: float = 0.0, deps: Sequence["Job"] = (),
+        urgency: float = 0.0,
+    ):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.rss = rss
+        self.cost = cost
+        self.deps = list(deps)
+        self.urgency = urgency
+
+
+def critical_path(jobs: Sequence[Job]) -> Dict[Job, float]:
+    """Cost of the longest chain from each job to the end of the graph, itself included."""
+
+    dependents: Dict[Job, List[Job]] = {job: [] for job in jobs}
+    for job in jobs:
+        for dep in job.deps:
+            if dep in dependents:
+                dependents[dep].append(job)
+    prio: Dict[Job, float] = {}
+    visiting: Set[Job] = set()
+
+    def visit(job: Job) -> float:
+        if job not in prio:
+            if job in visiting:
+                raise ValueError(f"Dependency cycle through job {job.key!r}")
+            visiting.add(job)
+            prio[job] = job.cost + max((visit(d) for d in dependents[job]), default=0.0)
+            visiting.discard(job)
+        return prio[job]
+
+    for job in jobs:
+        visit(job)
+    return prio
+
+
+class Scheduler:
+    """Runs jobs concurrently without exceeding a memory budget.
+
+    Ready jobs are started in critical-path order: by their own ``cost``
+    plus that of the longest chain of jobs waiting on them (ties keep the
+    given order), so neither slow translation units nor the links behind
+    them end up as a serial tail.  A job starts as long as a worker is free
+    and the sum of the expected RSS of running jobs stays within
+    *memory_budget*.  A job that does not fit is skipped for now, so cheaper jobs further down
+    the queue can still fill idle cores.  Once the head of the queue has
+    been passed over too often, backfilling stops until it fits.  A job
+    larger than the whole budget runs alone.
+
+    Coroutine jobs run on :func:`mint.utils.executor`'s loop, so a compile
+    waiting for its process costs no thread; plain functions run on a
+    thread pool that is only created if there are any.  Either way each
+    running job holds one of *jobs* slots, which are also its lane in a
+    build trace.
+    """
+
+    def __init__(self, jobs: int, memory_budget: int | None = None):
+        self.jobs = max(1, jobs)
+        self.memory_budget = memory_budget
+
+    def _fits(self, job: Job, in_use: int, running: int) -> bool:
+        return self.memory_budget is None or running == 0 or in_use + job.rss <= self.memory_budget
+
+    def run(self, jobs: Iterable[Job]) -> Iterator[Tuple[Job, Future]]:
+        """Yield ``(job, future)`` pairs as jobs finish.
+
+        If the consumer stops iterating (e.g. raises on a failed job), no
+        new jobs are started and the running ones are cancelled: coroutine
+        jobs at once, killing their processes; thread jobs that already
+        started are waited for.  Jobs that depend on a failed job are
+        dropped without being yielded.
+        Dependencies outside *jobs* count as done.
+        """
+
+        jobs = list(jobs)
+        prio = critical_path(jobs)
+        members = set(jobs)
+        waiting: Dict[Job, int] = {}
+        dependents: Dict[Job, List[Job]] = {job: [] for job in jobs}
+        for job in jobs:
+            deps = [d for d in job.deps if d in members]
+            for dep in deps:
+                dependents[dep].append(job)
+            if deps:
+                waiting[job] = len(deps)
+        order = {job: i for i, job in enumerate(jobs)}
+
+        def rank(job: Job) -> Tuple[float, float, int]:
+            return -job.urgency, -prio[job], order[job]
+
+        pending: List[Job] = sorted((j for j in jobs if j not in waiting), key=rank)
+        running: Dict[Future, Job] = {}
+        lanes: Dict[Future, int] = {}
+        free = list(range(self.jobs, 0, -1))
+        in_use = 0
+        head_skips = 0
+        pool: ThreadPoolExecutor | None = None
+
+        def start(job: Job, slot: int) -> Future:
+            nonlocal pool
+            if asyncio.iscoroutinefunction(job.fn):
+                with trace.lane(("slot", slot)):
+                    return executor().submit(job.fn(*job.args))
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=self.jobs)
+            return pool.submit(_on_lane, slot, job.fn, *job.args)
+
+        try:
+            while pending or running:
+                i = 0
+                while i < len(pending) and len(running) < self.jobs:
+                    job = pending[i]
+                    if self._fits(job, in_use, len(running)):
+                        pending.pop(i)
+                        slot = free.pop()
+                        fut = start(job, slot)
+                        running[fut] = job
+                        lanes[fut] = slot
+                        in_use += job.rss
+                        if i == 0:
+                            head_skips = 0
+                        continue
+                    if i == 0:
+                        head_skips += 1
+                        if head_skips > self.jobs:
+                            break  # let the big job at the head start first
+                    i += 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job = running.pop(fut)
+                    free.append(lanes.pop(fut))
+                    free.sort(reverse=True)
+                    in_use -= job.rss
+                    if fut.exception() is None:
+                        for child in dependents[job]:
+                            waiting[child] -= 1
+                            if not waiting[child]:
+                                del waiting[child]
+                                pending.append(child)
+                        pending.sort(key=rank)
+                    yield job, fut
+        finally:
+            for fut in running:
+                fut.cancel()
+            if running:
+                wait(running)
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _on_lane(slot: int, fn: Callable, *args):
+    with trace.lane(("slot", slot)):
+        return fn(*args)
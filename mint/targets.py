@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from .fileindex import file_index
+from .utils import MintError, check_keys
+
+SOURCE_EXTS = {".cpp", ".c", ".cc", ".cxx"}
+
+TARGET_TYPES = {"executable", "static", "shared"}
+TARGET_KEYS = {"name", "type", "sources", "cxxflags", "ldflags", "deps"}
+
+
+def shared_suffix() -> str:
+    if sys.platform == "darwin":
+        return ".dylib"
+    if sys.platform == "win32":
+        return ".dll"
+    return ".so"
+
+
+class Target:
+    """One artifact of the build: an executable, a static or a shared library."""
+
+    def __init__(
+        self, name: str, type: str, sources: List[Path], *,
+        cxxflags: Sequence[str] = (), ldflags: Sequence[str] = (), deps: Sequence[str] = (),
+    ):
+        self.name = name
+        self.type = type
+        self.sources = sources
+        self.cxxflags = list(cxxflags)
+        self.ldflags = list(ldflags)
+        self.deps = list(deps)
+        # Set by load_targets() for static libraries that end up in a shared one.
+        self.pic = type == "shared"
+
+    def output(self, build_dir: Path) -> Path:
+        if self.type == "executable":
+            return build_dir / "bin" / self.name
+        if self.type == "static":
+            return build_dir / "lib" / f"lib{self.name}.a"
+        return build_dir / "lib" / f"lib{self.name}{shared_suffix()}"
+
+
+def _expand_sources(root: Path, build_dir: Path, name: str, patterns) -> List[Path]:
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    if not patterns or not all(isinstance(p, str) for p in patterns):
+        raise MintError(f"Target '{name}': 'sources' must be a list of files or glob patterns")
+    index = file_index(root, build_dir)
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        if not any(c in pattern for c in "*?["):
+            # Named explicitly: taken even if ignored (e.g. a generated source).
+            matches = [root / pattern] if (root / pattern).is_file() else []
+        else:
+            matches = [p for p in index.glob(pattern) if p.suffix in SOURCE_EXTS]
+        if not matches:
+            raise MintError(f"Target '{name}': no sources match '{pattern}'")
+        found.update(dict.fromkeys(matches))
+    return list(found)
+
+
+def load_targets(entries: List[Dict], root: Path, build_dir: Path) -> List[Target]:
+    """Validate the ``targets:`` section and return the targets, dependencies first."""
+
+    if not isinstance(entries, list):
+        raise MintError("'targets' must be a list")
+    targets: Dict[str, Target] = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("name"):
+            raise MintError("Every target needs a 'name'")
+        name = str(entry["name"])
+        check_keys(entry, TARGET_KEYS, f" in target '{name}'")
+        if name in targets:
+            raise MintError(f"Duplicate target '{name}'")
+        kind = entry.get("type", "executable")
+        if kind not in TARGET_TYPES:
+            raise MintError(f"Target '{name}': type must be one of {', '.join(sorted(TARGET_TYPES))}")
+        targets[name] = Target(
+            name, kind, _expand_sources(root, build_dir, name, entry.get("sources")),
+            cxxflags=entry.get("cxxflags") or [], ldflags=entry.get("ldflags") or [], deps=entry.get("deps") or [],
+        )
+
+    for t in targets.values():
+        for dep in t.deps:
+            if dep not in targets:
+                raise MintError(f"Target '{t.name}' depends on unknown target '{dep}'")
+            if targets[dep].type == "executable":
+                raise MintError(f"Target '{t.name}' cannot depend on executable '{dep}'")
+
+    ordered: List[Target] = []
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(t: Target, chain: List[str]) -> None:
+        if state.get(t.name) == 2:
+            return
+        if state.get(t.name) == 1:
+            raise MintError(f"Dependency cycle: {' -> '.join(chain + [t.name])}")
+        state[t.name] = 1
+        for dep in t.deps:
+            visit(targets[dep], chain + [t.name])
+        state[t.name] = 2
+        ordered.append(t)
+
+    for t in targets.values():
+        visit(t, [])
+
+    # Static libraries linked into a shared library must be position independent.
+    for t in ordered:
+        if t.type == "shared":
+            for dep in link_closure(t, targets):
+                dep.pic = True
+    return ordered
+
+
+def link_closure(target: Target, targets: Dict[str, Target]) -> List[Target]:
+    """All libraries *target* links against, each before the libraries it depends on."""
+
+    seen: List[Target] = []
+
+    def visit(t: Target) -> None:
+        for dep in t.deps:
+            lib = targets[dep]
+            if lib in seen:
+                seen.remove(lib)
+            seen.append(lib)
+            visit(lib)
+
+    visit(target)
+    return seen
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .compdb import CompileDatabase
+
+# ---------------------------------------------------------------------------
+# -ftime-trace support and the `mint analyze compile-time` report
+# ---------------------------------------------------------------------------
+
+# Clang event name -> report section.  "Source" events are header parses,
+# their detail is the header path.
+SECTIONS = {
+    "Source": "headers",
+    "InstantiateClass": "templates",
+    "InstantiateFunction": "templates",
+    "ParseClass": "parse",
+    "ParseTemplate": "parse",
+    "CodeGen Function": "functions",
+    "OptFunction": "functions",
+}
+
+PHASES = {"Frontend": "frontend", "Backend": "backend", "ExecuteCompiler": "total"}
+
+def trace_path(obj: Path) -> Path:
+    """Where clang puts the trace of *obj* (``-o foo.o`` -> ``foo.json``)."""
+
+    return obj.with_suffix(".json")
+
+
+def load_traces(build_dir: Path) -> List[Tuple[str, List[dict]]]:
+    """``(source, events)`` of every object in *build_dir* that has a time trace."""
+
+    sources = {e["output"]: e["file"] for e in CompileDatabase(build_dir).entries()}
+    traces = []
+    for path in sorted((build_dir / "obj").rglob("*.json")):
+        obj = path.with_suffix(".o")
+        if not obj.exists():
+            continue  # stale: the source is gone
+        try:
+            data = json.loads(path.read_text())
+            events = data["traceEvents"]
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        traces.append((sources.get(str(obj), str(obj)), events))
+    return traces
+
+
+def _template_set(name: str) -> str:
+    # std::vector<int>::push_back -> std::vector<$>::push_back
+    depth, out = 0, []
+    for c in name:
+        if c == "<":
+            if depth == 0:
+                out.append("<$>")
+            depth += 1
+        elif c == ">" and depth:
+            depth -= 1
+        elif depth == 0:
+            out.append(c)
+    return re.sub(r"\s+", " ", "".join(out))
+
+
+def _ranked(totals: Dict[str, List[float]], top: int, key: str) -> List[dict]:
+    rows = sorted(totals.items(), key=lambda kv: (-kv[1][0], kv[0]))[:top]
+    return [
+        {key: name, "ms": round(us / 1000, 1), "count": int(n), "avg_ms": round(us / n / 1000, 1)}
+        for name, (us, n) in rows
+    ]
+
+
+def compile_time_report(traces: Iterable[Tuple[str, List[dict]]], top: int = 20) -> dict:
+    """Aggregate per-TU clang time traces, like ClangBuildAnalyzer.
+
+    Times are summed over all translation units: a header parsed by 200
+    TUs counts 200 times.  Header and template times are inclusive (a
+    header's time contains that of the headers it includes).  Entries are
+    sorted by time, then name, so reports of two builds diff cleanly.
+    """
+
+    sections: Dict[str, Dict[str, List[float]]] = {s: {} for s in [*SECTIONS.values(), "template_sets"]}
+    phases = {p: 0.0 for p in PHASES.values()}
+    units = []
+    for source, events in traces:
+        unit = {"file": source, "ms": 0.0}
+        for ev in events:
+            if ev.get("ph") != "X":
+                continue
+            name, dur = ev.get("name"), float(ev.get("dur", 0))
+            if name in PHASES:
+                phases[PHASES[name]] += dur
+                if name == "ExecuteCompiler":
+                    unit["ms"] = round(dur / 1000, 1)
+            elif name in SECTIONS:
+                detail = (ev.get("args") or {}).get("detail", "")
+                _add(sections[SECTIONS[name]], detail, dur)
+                if SECTIONS[name] == "templates":
+                    _add(sections["template_sets"], _template_set(detail), dur)
+        units.append(unit)
+
+    return {
+        "units": len(units),
+        "total_ms": {p: round(us / 1000, 1) for p, us in sorted(phases.items())},
+        "slowest_units": sorted(units, key=lambda u: (-u["ms"], u["file"]))[:top],
+        "headers": _ranked(sections["headers"], top, "path"),
+        "templates": _ranked(sections["templates"], top, "name"),
+        "template_sets": _ranked(sections["template_sets"], top, "name"),
+        "parse": _ranked(sections["parse"], top, "name"),
+        "functions": _ranked(sections["functions"], top, "name"),
+    }
+
+
+def _add(totals: Dict[str, List[float]], name: str, dur: float) -> None:
+    entry = totals.setdefault(name, [0.0, 0])
+    entry[0] += dur
+    entry[1] += 1
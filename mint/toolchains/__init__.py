@@ -1,17 +1,71 @@
 from __future__ import annotations
 
-from typing import Dict, Type
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, List, Type
 
-from .base import BaseToolchain
+if TYPE_CHECKING:
+    from .base import BaseToolchain
 
 _TOOLCHAINS: Dict[str, Type[BaseToolchain]] = {}
 
+# ---------------------------------------------------------------------------
+# Built-in toolchains: language key -> module under mint.toolchains.
+#
+# Modules are imported only when their toolchain is selected, so the CLI
+# starts without loading 29 of them.  Third-party toolchains plug in through
+# the ``mint.toolchains`` entry-point group:
+#
+#     [project.entry-points."mint.toolchains"]
+#     elixir = "mint_elixir:ElixirToolchain"
+#
+# Importing a language's module never needs its runtime (e.g. `cargo`); the
+# toolchains only shell out at build() time.
+# ---------------------------------------------------------------------------
+
+BUILTIN: Dict[str, str] = {
+    "cpp": "cpp",
+    "rust": "rust",
+    "go": "go",
+    "node": "node",
+    "python": "python",
+    "cmd": "command",
+    "java": "java",
+    "kotlin": "kotlin",
+    "csharp": "csharp",
+    "swift": "swift",
+    "ruby": "ruby",
+    "php": "php",
+    "dart": "dart",
+    "scala": "scala",
+    "haskell": "haskell",
+    "zig": "zig",
+    "java_native": "java_native",
+    "rust_native": "rust_native",
+    "swift_native": "swift_native",
+    "csharp_native": "csharp_native",
+    "kotlin_native": "kotlin_native",
+    "scala_native": "scala_native",
+    "haskell_native": "haskell_native",
+    "zig_native": "zig_native",
+    "dart_native": "dart_native",
+    "php_native": "php_native",
+    "ruby_native": "ruby_native",
+    "lua_native": "lua_native",
+    "yaml": "yaml",
+}
+
+ENTRY_POINT_GROUP = "mint.toolchains"
+
+_plugins: Dict[str, object] | None = None
+
 
 def register(name: str):
     """Class decorator to register a toolchain by language key."""
 
     def decorator(cls):
-        if not issubclass(cls, BaseToolchain):
+        from .base import BaseToolchain
+
+        if not isinstance(cls, type) or not issubclass(cls, BaseToolchain):
             raise TypeError("Toolchain must inherit from BaseToolchain")
         _TOOLCHAINS[name] = cls
         return cls
@@ -20,62 +74,34 @@ def register(name: str):
 
 
 def get(name: str) -> Type[BaseToolchain]:
+    """The toolchain for language *name*, importing its module on first use."""
+
+    if name not in _TOOLCHAINS:
+        if name in BUILTIN:
+            try:
+                import_module(f"{__name__}.{BUILTIN[name]}")
+            except ModuleNotFoundError as e:
+                # The optional toolchain may rely on deps that are not installed.
+                raise KeyError(f"Toolchain '{name}' is unavailable: {e}") from e
+        elif name in _entry_points():
+            register(name)(_entry_points()[name].load())
     try:
         return _TOOLCHAINS[name]
     except KeyError as e:
         raise KeyError(f"No toolchain registered for language '{name}'") from e
 
 
-def available() -> Dict[str, Type[BaseToolchain]]:
-    return dict(_TOOLCHAINS)
+def available() -> List[str]:
+    """Keys of every known toolchain (built-in, plug-in or registered at runtime), without importing them."""
 
+    return sorted({*BUILTIN, *_entry_points(), *_TOOLCHAINS})
 
-# ---------------------------------------------------------------------------
-# Auto-import built-in toolchains so they self-register via the decorator.
-# Keeping the imports optional avoids forcing the user to install every
-# build-time dependency.  If a language's runtime is missing (e.g. `cargo`),
-# the corresponding module can still be imported because we only shell out
-# at build() time.
-# ---------------------------------------------------------------------------
 
-from importlib import import_module
+def _entry_points() -> Dict[str, object]:
+    global _plugins
+    if _plugins is None:
+        from importlib.metadata import entry_points
 
-_builtin = (
-    "cpp",
-    "rust",
-    "go",
-    "node",
-    "python",
-    "command",
-    "java",
-    "kotlin",
-    "csharp",
-    "swift",
-    "ruby",
-    "php",
-    "dart",
-    "scala",
-    "haskell",
-    "zig",
-    "java_native",
-    "rust_native",
-    "swift_native",
-    "csharp_native",
-    "kotlin_native",
-    "scala_native",
-    "haskell_native",
-    "zig_native",
-    "dart_native",
-    "php_native",
-    "ruby_native",
-    "lua_native",
-    "yaml",
-)
-
-for _name in _builtin:
-    try:
-        import_module(f"mint.toolchains.{_name}")
-    except ModuleNotFoundError:
-        # The optional toolchain may rely on deps that are not installed.
-        # It can still be registered later if the user installs them.
-        pass 
\ No newline at end of file
+        # Built-ins win over plug-ins of the same name.
+        _plugins = {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP) if ep.name not in BUILTIN}
+    return _plugins
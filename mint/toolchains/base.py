@@ -1,25 +1,41 @@
 from __future__ import annotations
 
 import abc
+import hashlib
+import platform
+import subprocess
 from pathlib import Path
-from typing import List, Dict, Type
+from typing import List, Dict, Sequence, Tuple, Type
 import atexit
 
-from ..utils import load_cache, save_cache, fingerprint
+from rich.console import Console
+
+from ..fingerprints import FingerprintStore
+from ..remote_cache import remote_cache_from_config
+from ..utils import CommandResult, is_dry_run, fingerprint, run
+
+console = Console()
 
 class ToolchainError(RuntimeError):
     ...
 
 _TOOLCHAINS: Dict[str, Type[BaseToolchain]] = {}
 
+_VERSIONS: Dict[Tuple[str, ...], str] = {}
+
 class BaseToolchain(abc.ABC):
     """Abstract base for any language/toolchain."""
 
+    # Arguments that make the tool print its version (remote cache keys).
+    version_args: Sequence[str] = ("--version",)
+
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         self.project_root = project_root
         self.build_dir = build_dir
         self.config = config or {}
-        self._fp_cache: dict = load_cache(build_dir)
+        # Opened on first use: toolchains that never fingerprint (or `configure`) cost nothing.
+        self.fingerprints = FingerprintStore(build_dir, namespace=type(self).__name__)
+        self.remote_cache = remote_cache_from_config(self.config.get("remote_cache"))
         # register for atexit flush
         _ALL_TOOLCHAINS.append(self)
 
@@ -39,16 +55,82 @@ class BaseToolchain(abc.ABC):
     # ------------------------------------------------------------------
 
     def _is_dirty(self, src: Path) -> bool:
-        key = str(src)
-        new_hash = fingerprint(src)
-        cached = self._fp_cache.get(key)
-        return cached != new_hash
+        return self.fingerprints.changed(src)
 
     def _update_cache(self, src: Path):
-        self._fp_cache[str(src)] = fingerprint(src)
+        self.fingerprints.update(src)
 
     def _flush_cache(self):
-        save_cache(self.build_dir, self._fp_cache)
+        self.fingerprints.flush()
+        if self.remote_cache is not None:
+            self.remote_cache.flush()
+
+    # ------------------------------------------------------------------
+    # Remote cache
+    # ------------------------------------------------------------------
+    def _tool_version(self, tool: str) -> str:
+        """Output of ``tool *version_args`` and the machine, or "" if the probe fails."""
+
+        probe = (tool, *self.version_args)
+        if probe not in _VERSIONS:
+            try:
+                proc = subprocess.run(probe, capture_output=True, text=True, timeout=30)
+                out = (proc.stdout + proc.stderr).strip() if proc.returncode == 0 else ""
+            except (OSError, subprocess.TimeoutExpired):
+                out = ""
+            _VERSIONS[probe] = f"{out} ({platform.system()} {platform.machine()})" if out else ""
+        return _VERSIONS[probe]
+
+    def _action_key(self, cmd: List[str], inputs: Sequence[Path]) -> str | None:
+        """Key over the tool's version, *cmd* and the content of *inputs*; None if the version is unknown.
+
+        Project and build directory are normalised so checkouts in other
+        places (other machines) share entries.
+        """
+
+        version = self._tool_version(cmd[0])
+        if not version:
+            return None  # a tool upgrade would go unnoticed
+        h = hashlib.sha256(f"{type(self).__name__}\0{version}".encode())
+        for arg in cmd[1:]:
+            arg = arg.replace(str(self.build_dir), "<build>").replace(str(self.project_root), "<root>")
+            h.update(b"\0" + arg.encode())
+        for src in sorted(inputs):
+            h.update(f"\0{self._rel(src)}\0{fingerprint(src)}".encode())
+        return h.hexdigest()
+
+    def _rel(self, path: Path) -> str:
+        for base, tag in ((self.build_dir, "<build>"), (self.project_root, "<root>")):
+            try:
+                return f"{tag}/{Path(path).resolve().relative_to(base.resolve())}"
+            except ValueError:
+                continue
+        return str(path)
+
+    def _run_cached(
+        self, cmd: List[str], inputs: Sequence[Path], outputs: Sequence[Path], cwd: Path | None = None,
+    ) -> CommandResult | None:
+        """Run *cmd*, or restore its *outputs* from the remote cache when it ran elsewhere before.
+
+        *inputs* must be every file the command reads.  After a local run the
+        outputs are uploaded (read-write mode).  Without a tool version (see
+        :attr:`version_args`) the command always runs locally.
+        """
+
+        remote = self.remote_cache
+        if remote is None or is_dry_run():
+            return run(cmd, cwd=cwd)
+        key = self._action_key(cmd, inputs)
+        if key is None:
+            return run(cmd, cwd=cwd)
+        named = {self._rel(out): out for out in outputs}
+        if remote.fetch(key, named):
+            console.print(f"[blue]Remote cache hit:[/] {', '.join(out.name for out in outputs)}")
+            return None
+        result = run(cmd, cwd=cwd)
+        if all(out.is_file() for out in outputs):
+            remote.store(key, named)
+        return result
 
     # ------------------------------------------------------------------
     # Ninja build generation
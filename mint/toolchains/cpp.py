@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import shutil
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 from rich.console import Console
 
-from ..utils import MintError, detect_compiler, run
+from ..cache import ObjectCache
+from ..depgraph import DepGraph
+from ..fileindex import file_index
+from ..linker import compile_flags, link_flags, load_profile
+from ..targets import SOURCE_EXTS
+from ..utils import MintError, detect_compiler, executor, run, run_async
 from .base import BaseToolchain
 from . import register
 
@@ -22,20 +28,35 @@ class CppToolchain(BaseToolchain):
         self.obj_dir = self.build_dir / "obj"
         self.bin_dir = self.build_dir / "bin"
         self.compiler = detect_compiler()
-        self.cxxflags = config.get("cxxflags", ["-std=c++20", "-O2"])
-        self.ldflags = config.get("ldflags", [])
+        # Optimised by default, so the release profile applies.
+        self.profile = load_profile(config.get("profiles"), release=True)
+        self.cxxflags = config.get("cxxflags", ["-std=c++20", "-O2"]) + compile_flags(self.profile)
+        self.cxxflags += self.profile.get("cxxflags") or []
+        self.ldflags = config.get("ldflags", []) + (self.profile.get("ldflags") or [])
         self.name = config.get("name") or project_root.name
+        self.depgraph = DepGraph(self.build_dir)
+        self.cache: ObjectCache | None = None
+        # Opt-in (`cache: mint` in mint.yaml or --cache mint): it costs an extra -E run per TU.
+        if (config.get("cache") or "none").lower() in ("mint", "auto"):
+            self.cache = ObjectCache(config.get("cache_dir"), config.get("cache_max_size"), remote=self.remote_cache)
 
     def _discover_sources(self) -> List[Path]:
-        exts = {".cpp", ".c", ".cc", ".cxx"}
-        return [p for p in self.project_root.rglob("*") if p.suffix in exts and "build" not in p.parts]
+        return file_index(self.project_root, self.build_dir).with_suffix(*SOURCE_EXTS)
 
     def _object_path(self, src: Path) -> Path:
         rel = src.relative_to(self.project_root)
         return self.obj_dir / rel.with_suffix(".o")
 
-    def _needs_rebuild(self, src: Path, obj: Path) -> bool:
-        return not obj.exists() or src.stat().st_mtime > obj.stat().st_mtime
+    def _compile_command(self, src: Path, obj: Path) -> List[str]:
+        # Location-independent objects, so other worktrees can share them.
+        prefix_map = [f"-ffile-prefix-map={self.project_root}=."] if self.cache else []
+        return [
+            self.compiler, "-c", *prefix_map, *self.cxxflags,
+            "-I", str(self.project_root), "-MMD", "-MF", str(obj.with_suffix(".d")), "-o", str(obj), str(src),
+        ]
+
+    def _needs_rebuild(self, src: Path, obj: Path, cmd: List[str]) -> bool:
+        return self.depgraph.needs_rebuild(obj, src, cmd)
 
     def build(self) -> Path:
         self.obj_dir.mkdir(parents=True, exist_ok=True)
@@ -44,19 +65,54 @@ class CppToolchain(BaseToolchain):
         if not sources:
             raise MintError("No C/C++ sources found")
         objects: List[Path] = []
-        for src in sources:
-            obj = self._object_path(src)
-            obj.parent.mkdir(parents=True, exist_ok=True)
-            if self._needs_rebuild(src, obj):
-                cmd = [self.compiler, "-c", *self.cxxflags, "-I", str(self.project_root), "-o", str(obj), str(src)]
-                run(cmd)
-            objects.append(obj)
-        out = self.bin_dir / self.name
-        cmd = [self.compiler, "-o", str(out), *map(str, objects), *self.ldflags]
-        run(cmd)
+        dirty: List[Tuple[Path, Path, List[str]]] = []
+        try:
+            for src in sources:
+                obj = self._object_path(src)
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                cmd = self._compile_command(src, obj)
+                if self._needs_rebuild(src, obj, cmd):
+                    dirty.append((src, obj, cmd))
+                objects.append(obj)
+            executor().call(self._compile_all(dirty))
+            out = self.bin_dir / self.name
+            extra, linker = link_flags(self.compiler, self.profile)
+            cmd = [self.compiler, *extra, "-o", str(out), *map(str, objects), *self.ldflags]
+            # Relink only if an object's content or the link command changed.
+            if self.depgraph.outdated(out, objects, cmd):
+                if run(cmd, label=f"link {out.name} ({linker})") is not None:
+                    self.depgraph.record_output(out, objects, cmd)
+        finally:
+            self.depgraph.save()
+            if self.cache:
+                self.cache.flush()
         console.print(f"[green]C++ build complete:[/] {out.relative_to(self.project_root)}")
         return out
 
+    async def _compile_all(self, units: List[Tuple[Path, Path, List[str]]]) -> None:
+        # All at once: the executor runs as many as there are job slots.
+        if not units:
+            return
+        tasks = [asyncio.ensure_future(self._compile(*unit)) for unit in units]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        # Fail fast: cancelling kills the compilers still running.
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+
+    async def _compile(self, src: Path, obj: Path, cmd: List[str]) -> None:
+        if self.cache:
+            hit, result = await self.cache.compile_async(cmd, obj, self.project_root)
+        else:
+            hit, result = False, await run_async(cmd)
+        if result is None and not hit:
+            return  # dry run: nothing was built
+        # Parses the depfile and re-hashes changed headers: not on the loop.
+        await asyncio.to_thread(self.depgraph.record, obj, src, obj.with_suffix(".d"), cmd, Path.cwd())
+
     def clean(self):
         if self.build_dir.exists():
             shutil.rmtree(self.build_dir) 
\ No newline at end of file
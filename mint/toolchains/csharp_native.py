@@ -7,6 +7,7 @@ from typing import List
 from rich.console import Console
 
 from ..utils import run, MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -16,9 +17,12 @@ console = Console()
 class CSharpNativeToolchain(BaseToolchain):
     """Compile C# sources using Roslyn csc (no MSBuild)."""
 
+    # csc takes -version; dotnet builds never use the remote cache.
+    version_args = ("-version",)
+
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
-        self.sources = list(project_root.rglob("*.cs"))
+        self.sources = file_index(project_root, build_dir).with_suffix(".cs")
         self.output = self.build_dir / "bin" / (self.config.get("name") or project_root.name + ".exe")
         self.framework = self.config.get("framework")  # net8.0 etc.
 
@@ -42,10 +46,11 @@ class CSharpNativeToolchain(BaseToolchain):
         compiler = self._csc()
         if compiler == "csc":
             cmd = ["csc", "/nologo", "/optimize", f"/out:{self.output}"] + [str(p) for p in self.sources]
+            self._run_cached(cmd, self.sources, [self.output], cwd=self.project_root)
         else:
             # dotnet exec path/to/Roslyn - use dotnet build as fallback minimal
             cmd = ["dotnet", "build", "-c", "Release", "-o", str(self.output.parent), "--nologo"]
-        run(cmd, cwd=self.project_root)
+            run(cmd, cwd=self.project_root)
         for s in self.sources:
             self._update_cache(s)
         console.print(f"[green]C# executable built:[/] {self.output.relative_to(self.project_root)}")
@@ -6,6 +6,7 @@ from pathlib import Path
 from rich.console import Console
 
 from ..utils import run, MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -33,7 +34,12 @@ class DartNativeToolchain(BaseToolchain):
 
         self.output.parent.mkdir(parents=True, exist_ok=True)
         run(["dart", "pub", "get"], cwd=self.project_root)
-        run(["dart", "compile", "exe", str(self.entry), "-o", str(self.output)], cwd=self.project_root)
+        inputs = file_index(self.project_root, self.build_dir).with_suffix(".dart")
+        lock = self.project_root / "pubspec.lock"
+        if lock.exists():
+            inputs.append(lock)
+        cmd = ["dart", "compile", "exe", str(self.entry), "-o", str(self.output)]
+        self._run_cached(cmd, inputs, [self.output], cwd=self.project_root)
         self._update_cache(self.entry)
         console.print(f"[green]Dart executable built:[/] {self.output.relative_to(self.project_root)}")
         return self.output 
\ No newline at end of file
@@ -6,7 +6,7 @@ from typing import List
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import run, MintError, get_jobs
 from .base import BaseToolchain
 from . import register
 
@@ -29,7 +29,7 @@ class GoToolchain(BaseToolchain):
 
     def build(self):
         go = self._go()
-        args: List[str] = [go, "build"]
+        args: List[str] = [go, "build", "-p", str(get_jobs())]
         if self.output:
             args += ["-o", str(self.output)]
         run(args, cwd=self.project_root)
@@ -5,7 +5,8 @@ from pathlib import Path
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -37,7 +38,8 @@ class HaskellNativeToolchain(BaseToolchain):
 
         self.output.parent.mkdir(parents=True, exist_ok=True)
         cmd = [self._ghc(), "-O2", "-outputdir", str(self.build_dir / "obj"), "-o", str(self.output), str(self.main)]
-        run(cmd, cwd=self.project_root)
+        sources = file_index(self.project_root, self.build_dir).with_suffix(".hs")
+        self._run_cached(cmd, sources, [self.output], cwd=self.project_root)
         self._update_cache(self.main)
         console.print(f"[green]Haskell binary built:[/] {self.output.relative_to(self.project_root)}")
         return self.output 
\ No newline at end of file
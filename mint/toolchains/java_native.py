@@ -10,9 +10,9 @@ from ..utils import MintError
 from ..utils.java import (
     compile_java_sources,
     create_jar,
-    find_java_sources,
     parse_imports,
 )
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -32,7 +32,8 @@ class JavaNativeToolchain(BaseToolchain):
     def build(self) -> Path:
         self.classes_dir.mkdir(parents=True, exist_ok=True)
         self.jar_dir.mkdir(parents=True, exist_ok=True)
-        sources = find_java_sources(self.project_root / "src") or find_java_sources(self.project_root)
+        index = file_index(self.project_root, self.build_dir)
+        sources = index.under(self.project_root / "src", ".java") or index.with_suffix(".java")
         if not sources:
             raise MintError("No Java sources found")
         dirty = [s for s in sources if self._is_dirty(s)]
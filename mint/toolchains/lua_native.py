@@ -5,7 +5,8 @@ from pathlib import Path
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -15,9 +16,12 @@ console = Console()
 class LuaNativeToolchain(BaseToolchain):
     """Compile Lua sources to bytecode via luac."""
 
+    # luac has no --version.
+    version_args = ("-v",)
+
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
-        self.sources = list(project_root.rglob("*.lua"))
+        self.sources = file_index(project_root, build_dir).with_suffix(".lua")
         self.output = self.build_dir / "bin" / ((self.config.get("name") or project_root.name) + ".luac")
 
     def build(self):
@@ -30,7 +34,7 @@ class LuaNativeToolchain(BaseToolchain):
             console.print("[grey]Lua up-to-date, skipping compile[/]")
             return self.output
         self.output.parent.mkdir(parents=True, exist_ok=True)
-        run(["luac", "-o", str(self.output), str(main)])
+        self._run_cached(["luac", "-o", str(self.output), str(main)], [Path(main)], [self.output])
         self._update_cache(Path(main))
         console.print(f"[green]Lua bytecode built:[/] {self.output.relative_to(self.project_root)}")
         return self.output 
\ No newline at end of file
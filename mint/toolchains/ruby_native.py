@@ -6,6 +6,7 @@ from pathlib import Path
 from rich.console import Console
 
 from ..utils import run, MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -17,7 +18,7 @@ class RubyNativeToolchain(BaseToolchain):
 
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
-        self.sources = list(project_root.rglob("*.rb"))
+        self.sources = file_index(project_root, build_dir).with_suffix(".rb")
         self.output = self.build_dir / "bin" / ((self.config.get("name") or project_root.name) + ".tar.gz")
 
     def build(self):
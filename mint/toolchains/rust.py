@@ -6,7 +6,7 @@ from typing import List
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import run, MintError, get_jobs
 from .base import BaseToolchain
 from . import register
 
@@ -29,7 +29,7 @@ class RustToolchain(BaseToolchain):
 
     def build(self) -> Path:
         cargo = self._cargo()
-        args: List[str] = [cargo, "build"]
+        args: List[str] = [cargo, "build", "--jobs", str(get_jobs())]
         if self.release or self.config.get("profile") == "release":
             args.append("--release")
         run(args, cwd=self.project_root)
@@ -6,7 +6,8 @@ from typing import List
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -39,7 +40,8 @@ class RustNativeToolchain(BaseToolchain):
 
         self.output.parent.mkdir(parents=True, exist_ok=True)
         cmd = [self._rustc(), str(self.entry), "--edition=2021", "-O", "-o", str(self.output)]
-        run(cmd, cwd=self.project_root)
+        sources = file_index(self.project_root, self.build_dir).with_suffix(".rs")
+        self._run_cached(cmd, sources, [self.output], cwd=self.project_root)
         self._update_cache(self.entry)
         console.print(f"[green]Rust binary built:[/] {self.output.relative_to(self.project_root)}")
         return self.output 
\ No newline at end of file
@@ -6,6 +6,7 @@ from pathlib import Path
 from rich.console import Console
 
 from ..utils import run, MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -18,7 +19,7 @@ class ScalaNativeToolchain(BaseToolchain):
 
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
-        self.sources = list(project_root.rglob("*.scala"))
+        self.sources = file_index(project_root, build_dir).with_suffix(".scala")
         self.classes_dir = self.build_dir / "obj"
         self.jar_dir = self.build_dir / "bin"
         self.jar_name = (self.config.get("name") or project_root.name) + ".jar"
@@ -6,7 +6,8 @@ from typing import List
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -19,7 +20,8 @@ class SwiftNativeToolchain(BaseToolchain):
 
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
-        self.sources = list((project_root / "Sources").rglob("*.swift")) or list(project_root.rglob("*.swift"))
+        index = file_index(project_root, build_dir)
+        self.sources = index.under(project_root / "Sources", ".swift") or index.with_suffix(".swift")
         self.output = self.build_dir / "bin" / (self.config.get("name") or project_root.name)
 
     def _swiftc(self):
@@ -39,7 +41,7 @@ class SwiftNativeToolchain(BaseToolchain):
 
         self.output.parent.mkdir(parents=True, exist_ok=True)
         cmd = [self._swiftc(), "-o", str(self.output), "-O"] + [str(p) for p in self.sources]
-        run(cmd, cwd=self.project_root)
+        self._run_cached(cmd, self.sources, [self.output], cwd=self.project_root)
         console.print(f"[green]Swift binary built:[/] {self.output.relative_to(self.project_root)}")
         for s in self.sources:
             self._update_cache(s)
@@ -8,6 +8,7 @@ import yaml
 from rich.console import Console
 
 from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -40,11 +41,12 @@ class YAMLToolchain(BaseToolchain):
     # Helpers
     # ------------------------------------------------------------------
     def _discover_sources(self) -> List[Path]:
+        index = file_index(self.project_root, self.build_dir)
         sources: List[Path] = []
         for p in self.patterns:
-            sources.extend(list(self.project_root.rglob(p)))
-        # De-duplicate & skip build directory artefacts
-        unique = [p for p in set(sources) if "build" not in p.parts]
+            sources.extend(index.rglob(p))
+        # De-duplicate (the index already skips the build directory)
+        unique = list(set(sources))
         if not unique:
             raise MintError("No YAML files found")
         return sorted(unique)
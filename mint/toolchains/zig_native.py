@@ -5,7 +5,8 @@ from pathlib import Path
 
 from rich.console import Console
 
-from ..utils import run, MintError
+from ..utils import MintError
+from ..fileindex import file_index
 from .base import BaseToolchain
 from . import register
 
@@ -16,6 +17,9 @@ console = Console()
 class ZigNativeToolchain(BaseToolchain):
     """Compile Zig source directly with `zig build-exe`."""
 
+    # zig prints its version with a subcommand.
+    version_args = ("version",)
+
     def __init__(self, project_root: Path, build_dir: Path, config: dict | None = None):
         super().__init__(project_root, build_dir, config)
         self.entry = Path(self.config.get("entry", "src/main.zig"))
@@ -33,7 +37,8 @@ class ZigNativeToolchain(BaseToolchain):
 
         self.output.parent.mkdir(parents=True, exist_ok=True)
         cmd = ["zig", "build-exe", str(self.entry), "-O", "ReleaseFast", "-femit-bin=" + str(self.output)]
-        run(cmd, cwd=self.project_root)
+        sources = file_index(self.project_root, self.build_dir).with_suffix(".zig")
+        self._run_cached(cmd, sources, [self.output], cwd=self.project_root)
         self._update_cache(self.entry)
         console.print(f"[green]Zig binary built:[/] {self.output.relative_to(self.project_root)}")
         return self.output 
\ No newline at end of file
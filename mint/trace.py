@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+# ---------------------------------------------------------------------------
+# Build trace in Chrome trace-event format (chrome://tracing, ui.perfetto.dev)
+# ---------------------------------------------------------------------------
+
+
+# Lane of the current job when it is not simply the current thread (see lane()).
+_LANE: ContextVar[object] = ContextVar("mint_trace_lane", default=None)
+
+
+def lane_key() -> object:
+    key = _LANE.get()
+    return threading.get_ident() if key is None else key
+
+
+@contextmanager
+def lane(key: object) -> Iterator[None]:
+    """Record events of the enclosed block on the lane of *key* instead of the thread's.
+
+    Coroutines all run on the executor's thread; the scheduler gives each
+    of its job slots a lane this way.
+    """
+
+    token = _LANE.set(key)
+    try:
+        yield
+    finally:
+        _LANE.reset(token)
+
+
+class Tracer:
+    """Collects complete ("X") events, one lane per thread or scheduler slot.
+
+    The main thread is lane 0; every other thread or job slot that records
+    an event gets the next free lane, so a trace shows how busy each worker
+    was and where the build ran serially.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._events: List[dict] = []
+        self._lanes: Dict[object, int] = {threading.get_ident(): 0}
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Microseconds since the trace started."""
+
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _lane(self) -> int:
+        key = lane_key()
+        lane = self._lanes.get(key)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.setdefault(key, len(self._lanes))
+        return lane
+
+    def complete(self, name: str, cat: str, start: float, end: float, **args) -> None:
+        event = {
+            "name": name, "cat": cat, "ph": "X", "ts": round(start, 1), "dur": round(end - start, 1),
+            "pid": os.getpid(), "tid": self._lane(),
+        }
+        if args:
+            event["args"] = {k: v for k, v in args.items() if v is not None}
+        with self._lock:
+            self._events.append(event)
+
+    def events(self) -> List[dict]:
+        with self._lock:
+            events = sorted(self._events, key=lambda e: (e["ts"], -e["dur"]))
+            lanes = sorted(self._lanes.values())
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": lane,
+             "args": {"name": "mint" if lane == 0 else f"worker {lane}"}}
+            for lane in lanes
+        ]
+        return names + events
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"traceEvents": self.events(), "displayTimeUnit": "ms"}))
+        os.replace(tmp, path)
+
+
+_TRACER: Tracer | None = None
+
+
+def start_trace() -> Tracer:
+    global _TRACER
+    _TRACER = Tracer()
+    return _TRACER
+
+
+def stop_trace(path: Path | None = None) -> None:
+    """Stop recording, writing the trace to *path* if given."""
+
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None and path is not None:
+        tracer.write(path)
+
+
+def tracer() -> Tracer | None:
+    return _TRACER
+
+
+@contextmanager
+def span(name: str, cat: str = "mint", **args) -> Iterator[dict]:
+    """Record the enclosed block as one event; a no-op unless tracing.
+
+    Yields a dict that the block may fill with further ``args``
+    (e.g. whether a compile was a cache hit).
+    """
+
+    t = _TRACER
+    if t is None:
+        yield args
+        return
+    start = t.now()
+    try:
+        yield args
+    finally:
+        t.complete(name, cat, start, t.now(), **args)
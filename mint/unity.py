@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from .depgraph import DepGraph
+from .pch import C_EXTS
+
+DEFAULT_BATCH_SIZE = 16
+
+# Bumped when batch names change meaning; older state is replanned.
+STATE_VERSION = 2
+
+
+def git_modified(root: Path) -> Set[str] | None:
+    """Absolute paths of files git reports as modified or untracked, or None without git."""
+
+    try:
+        top = subprocess.run(
+            ["git", "-C", str(root), "rev-parse", "--show-toplevel"], capture_output=True, text=True
+        )
+        if top.returncode != 0:
+            return None
+        status = subprocess.run(
+            ["git", "-C", str(root), "status", "--porcelain=v1", "-z", "--untracked-files=all"],
+            capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    if status.returncode != 0:
+        return None
+    base = Path(top.stdout.strip())
+    modified: Set[str] = set()
+    records = status.stdout.split("\0")
+    i = 0
+    while i < len(records):
+        rec = records[i]
+        i += 1
+        if len(rec) < 4:
+            continue
+        modified.add(str(base / rec[3:]))
+        if rec[0] in "RC":  # rename/copy: next record is the old path
+            i += 1
+    return modified
+
+
+class UnityPlanner:
+    """Groups sources into stable unity (jumbo) batches.
+
+    Membership is persisted in ``<build_dir>/unity[/<subdir>]/batches.json``
+    (one planner per target): existing files keep their batch, deleted
+    files drop out and batches are only re-planned from scratch when the
+    batch settings change.  Sources that are being edited are *detached*
+    and compiled on their own so an edit does not recompile the whole
+    batch every time:
+
+    * a member whose content differs from what its batch was last built
+      with is detached,
+    * new files start detached,
+    * with git available, detached files rejoin their batch once git
+      reports them clean again.
+    """
+
+    def __init__(
+        self, project_root: Path, build_dir: Path, depgraph: DepGraph,
+        *, batch_size: int = DEFAULT_BATCH_SIZE, max_bytes: int | None = None, subdir: str | None = None,
+    ):
+        self.project_root = project_root
+        self.unity_dir = build_dir / "unity" / subdir if subdir else build_dir / "unity"
+        self.state_path = self.unity_dir / "batches.json"
+        self.depgraph = depgraph
+        self.batch_size = max(1, batch_size)
+        self.max_bytes = max_bytes
+        self._state = self._load()
+
+    def _load(self) -> dict:
+        settings = {"batch_size": self.batch_size, "max_bytes": self.max_bytes, "version": STATE_VERSION}
+        try:
+            state = json.loads(self.state_path.read_text())
+            if state.get("settings") == settings:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"settings": settings, "batches": {}, "built": {}, "detached": []}
+
+    def save(self) -> None:
+        self.unity_dir.mkdir(parents=True, exist_ok=True)
+        text = json.dumps(self._state, indent=1, sort_keys=True)
+        if not self.state_path.exists() or self.state_path.read_text() != text:
+            self.state_path.write_text(text)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+    def _group(self, src: Path) -> str:
+        # The slug is for humans; the hash keeps e.g. dir "x_c" apart from the C group of "x".
+        rel = src.parent.relative_to(self.project_root)
+        lang = "c" if src.suffix in C_EXTS else "cpp"
+        slug = "_".join(rel.parts) or "root"
+        digest = hashlib.sha1(f"{rel.as_posix()}\0{lang}".encode()).hexdigest()[:8]
+        return f"{slug}_{lang}-{digest}"
+
+    def plan(self, sources: List[Path]) -> Tuple[Dict[str, List[Path]], List[Path]]:
+        """Return ``(batches, singles)`` for *sources*.
+
+        *batches* maps batch name to members; *singles* are compiled as
+        ordinary translation units.
+        """
+
+        present = {str(s) for s in sources}
+        batches: Dict[str, List[str]] = {
+            name: [m for m in members if m in present] for name, members in self._state["batches"].items()
+        }
+        placed = {m for members in batches.values() for m in members}
+        detached = {d for d in self._state["detached"] if d in present}
+        fresh_plan = not self._state["batches"]
+
+        if not fresh_plan:
+            # Newly added files are by definition being worked on.
+            detached |= present - placed
+            # Members edited since their batch was built leave the batch.
+            built = self._state["built"]
+            for members in batches.values():
+                for m in members:
+                    if m in built and self.depgraph.digest(m) != built[m]:
+                        detached.add(m)
+            modified = git_modified(self.project_root)
+            if modified is not None:
+                detached = {d for d in detached if d in modified}
+        for src in sorted(sources):
+            # Fresh plan, or a new file git already considers committed.
+            if str(src) not in placed and str(src) not in detached:
+                self._place(batches, src)
+
+        self._state["batches"] = {n: m for n, m in batches.items() if m}
+        self._state["detached"] = sorted(detached)
+        self._state["built"] = {m: d for m, d in self._state["built"].items() if m in present}
+        active = {
+            name: [Path(m) for m in members if m not in detached]
+            for name, members in self._state["batches"].items()
+        }
+        singles = sorted(Path(d) for d in detached)
+        # A batch with a single remaining member is just that TU.
+        for name, members in list(active.items()):
+            if len(members) <= 1:
+                singles.extend(members)
+                del active[name]
+        return active, sorted(singles)
+
+    def _place(self, batches: Dict[str, List[str]], src: Path) -> None:
+        group = self._group(src)
+        indices = [int(n.rsplit("_", 1)[1]) for n in batches if n.rsplit("_", 1)[0] == group]
+        if indices:
+            last = batches[f"{group}_{max(indices)}"]
+            if len(last) < self.batch_size and not self._over_budget(last, src):
+                last.append(str(src))
+                return
+        batches[f"{group}_{max(indices, default=-1) + 1}"] = [str(src)]
+
+    def _over_budget(self, members: List[str], src: Path) -> bool:
+        if self.max_bytes is None:
+            return False
+        size = sum(Path(m).stat().st_size for m in members) + src.stat().st_size
+        return size > self.max_bytes
+
+    # ------------------------------------------------------------------
+    # Unity sources
+    # ------------------------------------------------------------------
+    def write_source(self, name: str, members: List[Path]) -> Path:
+        """Write the unity TU for batch *name*, touching it only if it changed."""
+
+        ext = ".c" if members[0].suffix in C_EXTS else ".cpp"
+        path = self.unity_dir / f"{name}{ext}"
+        text = "// Generated by mint – unity batch, do not edit.\n" + "".join(
+            f'#include "{m}"\n' for m in members
+        )
+        self.unity_dir.mkdir(parents=True, exist_ok=True)
+        if not path.exists() or path.read_text() != text:
+            path.write_text(text)
+        return path
+
+    def mark_built(self, members: List[Path]) -> None:
+        """Remember the content the members of a freshly compiled batch had."""
+
+        for m in members:
+            self._state["built"][str(m)] = self.depgraph.digest(m)
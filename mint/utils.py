@@ -3,18 +3,21 @@ from __future__ import annotations
 import os
 import platform
 import shutil
-import subprocess
 import sys
 import hashlib
-import json
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List
 import time
 import shlex
-import concurrent.futures
+import threading
 
 from rich.console import Console
 
+from . import trace
+
+if TYPE_CHECKING:
+    from .executor import ProcessExecutor
+
 console = Console()
 
 # Verbosity and dry-run flags toggled by CLI.
@@ -24,8 +27,15 @@ _DRY_RUN = False
 # Keep raw logs on failure
 _KEEP_LOGS = False
 
-# timing
+# timing (appended to from worker threads)
 _TIMINGS: list[tuple[str, float]] = []
+_timings_lock = threading.Lock()
+
+# Parallelism limits shared by every subprocess Mint launches (-j / -l).
+_JOBS: int | None = None
+_LOAD_LIMIT: float | None = None
+_EXECUTOR: ProcessExecutor | None = None
+_executor_lock = threading.Lock()
 
 
 def set_verbose(v: bool):
@@ -45,41 +55,262 @@ def set_keep_logs(v: bool):
     _KEEP_LOGS = v
 
 
+def set_jobs(n: int | None):
+    """Cap the number of concurrently running subprocesses (default: usable CPUs)."""
+    global _JOBS
+    _JOBS = max(1, n) if n else None
+    _reset_executor()
+
+
+def get_jobs() -> int:
+    return _JOBS or default_jobs()
+
+
+def set_load_average(limit: float | None):
+    """Hold back new subprocesses while the 1-minute load average exceeds *limit*."""
+    global _LOAD_LIMIT
+    _LOAD_LIMIT = limit if limit and limit > 0 else None
+    _reset_executor()
+
+
+def _cgroup_cpu_limit() -> float | None:
+    """CPU quota of the current cgroup (v2 ``cpu.max`` or v1 CFS quota), in CPUs."""
+
+    try:
+        lines = Path("/proc/self/cgroup").read_text().splitlines()
+    except OSError:
+        return None
+    limits: list[float] = []
+    base = Path("/sys/fs/cgroup")
+    for line in lines:
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        _, controllers, rel = parts
+        rel = rel.lstrip("/")
+        if controllers == "":
+            # cgroup v2: the quota of any ancestor applies as well.
+            d = base / rel
+            while True:
+                try:
+                    quota, period = (d / "cpu.max").read_text().split()[:2]
+                    if quota != "max":
+                        limits.append(int(quota) / int(period))
+                except (OSError, ValueError):
+                    pass
+                if d == base:
+                    break
+                d = d.parent
+        elif "cpu" in controllers.split(","):
+            mount = base / controllers
+            if not mount.exists():
+                mount = base / "cpu"
+            # Inside a container the cgroup path is usually not visible.
+            for d in (mount / rel, mount):
+                try:
+                    quota = int((d / "cpu.cfs_quota_us").read_text())
+                    period = int((d / "cpu.cfs_period_us").read_text())
+                except (OSError, ValueError):
+                    continue
+                if quota > 0 and period > 0:
+                    limits.append(quota / period)
+                break
+    return min(limits) if limits else None
+
+
+def default_jobs() -> int:
+    """Usable CPUs: CPU affinity mask, further capped by the cgroup CPU quota."""
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    if quota:
+        cpus = min(cpus, max(1, int(quota + 0.5)))
+    return max(1, cpus)
+
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: str | int) -> int:
+    """Parse sizes such as ``"500M"`` or ``"5G"`` into bytes."""
+
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().upper().rstrip("B").rstrip("I")
+    try:
+        if text and text[-1] in _SIZE_SUFFIXES:
+            return int(float(text[:-1]) * _SIZE_SUFFIXES[text[-1]])
+        return int(text)
+    except ValueError:
+        raise MintError(f"Invalid size '{value}' (expected e.g. 500M or 5G)") from None
+
+
+def _read_int(path: Path) -> int | None:
+    try:
+        text = path.read_text().strip()
+    except OSError:
+        return None
+    return int(text) if text.isdigit() else None
+
+
+def _cgroup_memory_headroom() -> int | None:
+    """Bytes left before the current cgroup hits its memory limit."""
+
+    try:
+        lines = Path("/proc/self/cgroup").read_text().splitlines()
+    except OSError:
+        return None
+    room: list[int] = []
+    base = Path("/sys/fs/cgroup")
+    for line in lines:
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        _, controllers, rel = parts
+        rel = rel.lstrip("/")
+        if controllers == "":
+            d = base / rel
+            while True:
+                limit = _read_int(d / "memory.max")  # "max" → None
+                if limit is not None:
+                    room.append(limit - (_read_int(d / "memory.current") or 0))
+                if d == base:
+                    break
+                d = d.parent
+        elif "memory" in controllers.split(","):
+            for d in (base / controllers / rel, base / controllers):
+                limit = _read_int(d / "memory.limit_in_bytes")
+                if limit is None:
+                    continue
+                if limit < 1 << 60:  # unlimited is reported as a huge number
+                    room.append(limit - (_read_int(d / "memory.usage_in_bytes") or 0))
+                break
+    return max(0, min(room)) if room else None
+
+
+def available_memory() -> int | None:
+    """Memory new processes can use: ``MemAvailable``, capped by the cgroup limit."""
+
+    candidates: list[int] = []
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                candidates.append(int(line.split()[1]) * 1024)
+                break
+    except (OSError, ValueError, IndexError):
+        pass
+    headroom = _cgroup_memory_headroom()
+    if headroom is not None:
+        candidates.append(headroom)
+    return min(candidates) if candidates else None
+
+
 class MintError(RuntimeError):
     """Custom error wrapper so the CLI can present clean messages."""
 
 
-def run(cmd: List[str], *, cwd: Path | None = None) -> None:
-    """Run a shell command with rich feedback.
+def check_keys(data: dict, allowed: set, where: str = "") -> None:
+    """Reject unknown config keys, suggesting corrections for typos."""
+
+    unknown = [k for k in data.keys() if k not in allowed]
+    if unknown:
+        from difflib import get_close_matches
+
+        lines = []
+        for key in unknown:
+            suggestion = get_close_matches(key, allowed, n=1)
+            if suggestion:
+                lines.append(f"Unknown key '{key}'{where}. Did you mean '{suggestion[0]}'?")
+            else:
+                lines.append(f"Unknown key '{key}'{where}.")
+        raise MintError("\n".join(lines))
+
+
+class CommandResult:
+    """Outcome of a successful :func:`run` call.
 
-    Streams live output when verbose mode is on. On error, shows captured
-    stdout/stderr so the caller gets actionable diagnostics.
+    ``max_rss`` (bytes) and ``cpu_time`` (seconds) cover the command and
+    every process it waited for; they are 0 where ``wait4`` is unavailable.
     """
 
-    start = time.perf_counter()
+    def __init__(self, stdout: bytes, duration: float, max_rss: int = 0, cpu_time: float = 0.0):
+        self.stdout = stdout
+        self.duration = duration
+        self.max_rss = max_rss
+        self.cpu_time = cpu_time
+
+
+def executor() -> ProcessExecutor:
+    """The executor every command runs on, sized by :func:`set_jobs` and :func:`set_load_average`."""
+    global _EXECUTOR
+    with _executor_lock:
+        if _EXECUTOR is None:
+            # Imported here: asyncio is not needed until the first command runs.
+            from .executor import ProcessExecutor
+
+            _EXECUTOR = ProcessExecutor(get_jobs(), _LOAD_LIMIT)
+        return _EXECUTOR
+
+
+def _reset_executor() -> None:
+    global _EXECUTOR
+    with _executor_lock:
+        old, _EXECUTOR = _EXECUTOR, None
+    if old is not None:
+        old.close()
+
+
+async def run_async(
+    cmd: List[str], *, cwd: Path | None = None, capture: bool = False, label: str | None = None
+) -> CommandResult | None:
+    """Run a shell command with rich feedback; to be awaited on the :func:`executor` loop.
+
+    Streams output line by line when verbose mode is on. On error, shows
+    captured stdout/stderr so the caller gets actionable diagnostics.  With
+    ``capture=True`` the raw stdout is kept in the result instead of being
+    displayed.  Returns None in dry-run mode.  *label* names the command
+    in the timing summary.
+    """
+
+    import asyncio
 
     # Dry-run support
     if _DRY_RUN:
         console.print(f"[magenta][dry-run]$ {' '.join(cmd)}[/]")
-        return
+        return None
 
+    name = label or (shlex.join(cmd[:2]) if len(cmd)>2 else ' '.join(cmd))
+    echo = None
     if _VERBOSE:
         console.print(f"[cyan]$ {' '.join(cmd)}[/]")
-        result = subprocess.run(cmd, cwd=cwd)
-        rc = result.returncode
-    else:
-        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
-        rc = result.returncode
+        if not capture:
+            echo = lambda line: console.out(line, highlight=False)  # noqa: E731
+    with trace.span(name, "process", cmd=shlex.join(cmd)) as info:
+        start = time.perf_counter()
+        try:
+            rc, out, err, rusage = await executor().process(cmd, cwd, echo)
+        except asyncio.CancelledError:
+            info["cancelled"] = True  # killed: another job failed
+            raise
+        duration = time.perf_counter() - start
+        info["exit"] = rc
+    if _VERBOSE and capture and err:
+        console.out(err.decode(errors="replace").rstrip(), highlight=False)
+    stdout = out.decode(errors="replace")
+    stderr = err.decode(errors="replace")
 
     if rc != 0:
         if not _VERBOSE:
             console.rule(f":boom: Command Failed ({rc})")
-            if result.stdout:
+            if stdout and not capture:
                 console.print("[yellow]stdout:[/]")
-                console.print(result.stdout.rstrip())
-            if result.stderr:
+                console.print(stdout.rstrip())
+            if stderr:
                 console.print("[red]stderr:[/]")
-                console.print(result.stderr.rstrip())
+                console.print(stderr.rstrip())
             if os.getenv("MINT_EXPLAIN") == "1":
                 console.print(f"[blue]Command:[/] {' '.join(cmd)}")
                 # Attempt naive include/lib extraction (for typical -I and -L flags)
@@ -93,20 +324,52 @@ def run(cmd: List[str], *, cwd: Path | None = None) -> None:
         if _KEEP_LOGS and cwd is not None:
             logs_dir = Path(cwd) / 'build' / 'logs'
             logs_dir.mkdir(parents=True, exist_ok=True)
-            import time
             ts = int(time.time())
             log_file = logs_dir / f"mint-fail-{ts}.log"
-            log_file.write_text(result.stdout + '\n' + result.stderr)
+            log_file.write_text(stdout + '\n' + stderr)
             console.print(f"[blue]Raw logs written to {log_file}[/]")
         raise MintError(f"Command failed (exit {rc}): {' '.join(cmd)}")
 
     # record timing
-    duration = time.perf_counter() - start
-    _TIMINGS.append((shlex.join(cmd[:2]) if len(cmd)>2 else ' '.join(cmd), duration))
+    record_timing(name, duration)
+    result = CommandResult(out if capture else b"", duration)
+    if rusage is not None:
+        # ru_maxrss is KiB on Linux/BSD but bytes on macOS.
+        result.max_rss = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        result.cpu_time = rusage.ru_utime + rusage.ru_stime
+    return result
+
+
+def run(
+    cmd: List[str], *, cwd: Path | None = None, capture: bool = False, label: str | None = None
+) -> CommandResult | None:
+    """Blocking form of :func:`run_async`, for callers outside the executor loop."""
+
+    return executor().call(run_async(cmd, cwd=cwd, capture=capture, label=label))
+
+
+def is_dry_run() -> bool:
+    return _DRY_RUN
+
+
+def is_verbose() -> bool:
+    return _VERBOSE
+
+
+def record_timing(label: str, sec: float) -> None:
+    """Add an entry to the timing summary (for work not started through :func:`run`)."""
+    with _timings_lock:
+        _TIMINGS.append((label, sec))
 
 
 def get_timings() -> list[tuple[str, float]]:
-    return _TIMINGS
+    with _timings_lock:
+        return list(_TIMINGS)
+
+
+def reset_timings() -> None:
+    with _timings_lock:
+        _TIMINGS.clear()
 
 
 _DEFAULT_COMPILERS = [
@@ -134,30 +397,10 @@ def default_build_dir(root: Path) -> Path:
 
 
 # ---------------------------------------------------------------------------
-# Simple fingerprint cache utilities (per build directory)
+# Content fingerprints (stored per toolchain by mint.fingerprints)
 # ---------------------------------------------------------------------------
 
 
-def _cache_path(build_dir: Path) -> Path:
-    return build_dir / "cache.json"
-
-
-def load_cache(build_dir: Path) -> dict:
-    p = _cache_path(build_dir)
-    if p.exists():
-        try:
-            return json.loads(p.read_text())
-        except Exception:
-            return {}
-    return {}
-
-
-def save_cache(build_dir: Path, data: dict):
-    p = _cache_path(build_dir)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(data))
-
-
 def fingerprint(path: Path) -> str:
     h = hashlib.sha256()
     h.update(path.read_bytes())
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import queue
+import re
+import socket
+import socketserver
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+from rich.console import Console
+
+from .trace import span
+from .utils import CommandResult, MintError, default_jobs, is_verbose, record_timing
+
+console = Console()
+
+# ---------------------------------------------------------------------------
+# Remote compilation: `mint worker` and the client side used by the Builder
+# ---------------------------------------------------------------------------
+
+DEFAULT_PORT = 3643
+CONNECT_TIMEOUT = 5.0
+COMPILE_TIMEOUT = 600.0
+
+# The only flags a worker accepts: code generation, debug info and warnings.
+# Anything else may make the compiler run programs or read and write files
+# on the worker host (response files, depfiles, dumps, profiles, plug-ins,
+# -Wa,/-Wp, pass-through), and workers have no authentication.  Values
+# must not name paths, except for the prefix maps, which only rewrite strings.
+_SAFE_FLAG = re.compile(
+    r"-O([0-3sgz]|fast)?|-g[a-z0-9-]*(=[a-z0-9-]+)?|-std=[\w+]+|-m[\w.+-]*(=[\w.,+-]+)?"
+    r"|-f[\w+-]+(=[\w.,+:-]+)?|-f(file|debug|macro)-prefix-map=[^=\s]*=[^=\s]*"
+    r"|-W[\w+-]*(=[\w+-]+)?|-w|-pthread|-pedantic(-errors)?|-ansi"
+)
+_UNSAFE_F = (
+    "-fplugin", "-fpass-plugin", "-fload-pass", "-fdump", "-fprofile", "-fcs-profile", "-fauto-profile",
+    "-fcreate-profile", "-fstack-usage", "-fcallgraph-info", "-fopt-info", "-fsave-optimization-record",
+    "-ftest-coverage", "-fcoverage", "-fmodule", "-fimplicit-module", "-fprebuilt-module",
+    "-fcrash-diagnostics", "-fdiagnostics-format", "-fdiagnostics-add-output", "-fdiagnostics-set-output",
+    "-ftime-trace", "-fxray-",
+)
+_UNSAFE_VALUE = re.compile(r"-f[\w+-]*(list|file|dir|path)=")
+
+
+def worker_flag_allowed(arg: str) -> bool:
+    """True if a worker may pass *arg* to its compiler (see ``_SAFE_FLAG``)."""
+
+    if not _SAFE_FLAG.fullmatch(arg) or arg == "-mllvm":
+        return False
+    return not (arg.startswith(_UNSAFE_F) or _UNSAFE_VALUE.match(arg))
+
+# Preprocessor-only flags, dropped from commands sent with preprocessed input.
+_PP_WITH_ARG = {"-I", "-D", "-U", "-include", "-imacros", "-iquote", "-isystem", "-idirafter", "-MF", "-MT", "-MQ"}
+_PP_PREFIXES = ("-I", "-D", "-U", "-iquote", "-isystem", "-idirafter")
+_PP_FLAGS = {"-MMD", "-MD", "-MP", "-M", "-MM"}
+
+_BANNERS: Dict[str, str] = {}
+
+
+def compiler_banner(compiler: str) -> str:
+    """What must match between client and worker: the compiler's ``--version`` and the machine."""
+
+    if compiler not in _BANNERS:
+        try:
+            out = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=30).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            out = ""
+        first = out.splitlines()[0] if out else ""
+        _BANNERS[compiler] = f"{first} ({platform.system()} {platform.machine()})" if first else ""
+    return _BANNERS[compiler]
+
+
+def remote_args(cmd: List[str]) -> List[str] | None:
+    """The flags of compile *cmd* that still matter once it is preprocessed.
+
+    None if the command cannot run elsewhere: wrapped compilers, binary
+    PCHs, flags producing outputs besides the object (split DWARF, time
+    traces) and flags a worker refuses.
+    """
+
+    if len(cmd) < 2 or "-c" not in cmd or Path(cmd[0]).name in {"sccache", "ccache"}:
+        return None
+    args: List[str] = []
+    skip = False
+    for arg in cmd[1:-1]:  # compiler and source stay behind
+        if skip:
+            skip = False
+            continue
+        if arg in ("-include-pch", "-gsplit-dwarf", "-ftime-trace"):
+            return None
+        if arg in _PP_WITH_ARG or arg == "-o":
+            skip = True
+        elif arg in _PP_FLAGS or arg == "-c" or arg.startswith(_PP_PREFIXES):
+            continue
+        elif not worker_flag_allowed(arg):
+            return None
+        else:
+            args.append(arg)
+    return args
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_msg(sock: socket.socket, header: dict, payload: bytes = b"") -> None:
+    data = json.dumps(header).encode()
+    sock.sendall(struct.pack("!IQ", len(data), len(payload)) + data + payload)
+
+
+def recv_msg(sock: socket.socket) -> Tuple[dict, bytes]:
+    hlen, plen = struct.unpack("!IQ", _recv_exact(sock, 12))
+    header = json.loads(_recv_exact(sock, hlen))
+    return header, _recv_exact(sock, plen)
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+class WorkerServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Compiles preprocessed translation units sent by ``mint build --workers``.
+
+    Every connection is one client slot; compiles run at most *jobs* at a
+    time.  There is no authentication: only listen on trusted networks.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], compiler: str, jobs: int | None = None):
+        self.compiler = compiler
+        self.jobs = max(1, jobs or default_jobs())
+        self.banner = compiler_banner(compiler)
+        self.slots = threading.BoundedSemaphore(self.jobs)
+        self.compiles = 0
+        self.connections: Set[socket.socket] = set()
+        super().__init__(address, _WorkerHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Clients see the worker go away instead of waiting on idle connections.
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def compile(self, header: dict, source: bytes) -> Tuple[dict, bytes]:
+        args = [str(a) for a in header.get("args", [])]
+        bad = next((a for a in args if not worker_flag_allowed(a)), None)
+        if bad is not None:
+            return {"rc": 1, "stderr": f"mint worker: flag not allowed: {bad}\n"}, b""
+        lang = "cpp-output" if header.get("lang") == "c" else "c++-cpp-output"
+        with self.slots, tempfile.TemporaryDirectory(prefix="mint-worker-") as tmp:
+            src = Path(tmp) / ("tu.i" if lang == "cpp-output" else "tu.ii")
+            obj = Path(tmp) / "tu.o"
+            src.write_bytes(source)
+            start = time.perf_counter()
+            try:
+                proc = subprocess.run(
+                    [self.compiler, *args, "-x", lang, "-c", str(src), "-o", str(obj)],
+                    capture_output=True, timeout=COMPILE_TIMEOUT, cwd=tmp,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                return {"rc": 1, "stderr": f"mint worker: {e}\n"}, b""
+            sec = time.perf_counter() - start
+            self.compiles += 1
+            reply = {"rc": proc.returncode, "stderr": proc.stderr.decode(errors="replace"), "sec": sec}
+            return reply, obj.read_bytes() if proc.returncode == 0 and obj.exists() else b""
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server: WorkerServer = self.server  # type: ignore[assignment]
+        server.connections.add(self.request)
+        try:
+            while True:
+                try:
+                    header, payload = recv_msg(self.request)
+                except (OSError, ConnectionError, ValueError):
+                    return
+                op = header.get("op")
+                if op == "hello":
+                    reply = {"banner": server.banner, "slots": server.jobs}, b""
+                elif op == "compile":
+                    reply = server.compile(header, payload)
+                else:
+                    reply = {"error": f"unknown op {op!r}"}, b""
+                send_msg(self.request, *reply)
+        except OSError:
+            pass  # client went away
+        finally:
+            server.connections.discard(self.request)
+
+
+def serve_worker(host: str, port: int, compiler: str, jobs: int | None = None) -> None:
+    with WorkerServer((host, port), compiler, jobs) as server:
+        bound = server.server_address
+        console.print(
+            f"[green]mint worker[/] listening on {bound[0]}:{bound[1]} – {server.jobs} slot(s), {server.banner}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def parse_address(spec: str) -> Tuple[str, int]:
+    host, sep, port = spec.strip().rpartition(":")
+    if not sep:
+        return spec.strip(), DEFAULT_PORT
+    if not host or not port.isdigit():
+        raise MintError(f"Invalid worker address '{spec}' (expected host:port)")
+    return host.strip("[]"), int(port)
+
+
+class RemoteWorker:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.slots = 0
+        self.down = False
+
+    def __str__(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        sock.settimeout(COMPILE_TIMEOUT)
+        return sock
+
+
+class _Slot:
+    def __init__(self, worker: RemoteWorker):
+        self.worker = worker
+        self.sock: socket.socket | None = None
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class WorkerPool:
+    """Connections to ``mint worker`` processes, one per remote slot.
+
+    :meth:`compile` takes a free slot or returns None at once, in which
+    case the caller compiles locally; so do calls after a worker failed,
+    which takes it out of the pool for the rest of the build.
+    """
+
+    def __init__(self, addresses: Sequence[str], compiler: str):
+        self.workers = [RemoteWorker(*parse_address(a)) for a in addresses if a.strip()]
+        self.compiler = compiler
+        self._free: "queue.Queue[_Slot]" = queue.Queue()
+        self._slots: List[_Slot] = []
+
+    @property
+    def slots(self) -> int:
+        return sum(w.slots for w in self.workers if not w.down)
+
+    def start(self) -> None:
+        """Greet every worker; those unreachable or with another compiler are left out."""
+
+        banner = compiler_banner(self.compiler)
+        for w in self.workers:
+            try:
+                with w.connect() as sock:
+                    send_msg(sock, {"op": "hello"})
+                    info, _ = recv_msg(sock)
+            except (OSError, ConnectionError, ValueError) as e:
+                w.down = True
+                console.print(f"[yellow]Worker {w} unreachable ({e}); not using it[/]")
+                continue
+            if info.get("banner") != banner:
+                w.down = True
+                console.print(f"[yellow]Worker {w} has a different compiler ({info.get('banner') or '?'}); not using it[/]")
+                continue
+            w.slots = int(info.get("slots", 1))
+            for _ in range(w.slots):
+                slot = _Slot(w)
+                self._slots.append(slot)
+                self._free.put(slot)
+        if self.workers:
+            console.print(f"[blue]Workers:[/] {self.slots} remote slot(s) on {sum(not w.down for w in self.workers)} host(s)")
+
+    def idle(self) -> bool:
+        return not self._free.empty()
+
+    def _acquire(self) -> _Slot | None:
+        while True:
+            try:
+                slot = self._free.get_nowait()
+            except queue.Empty:
+                return None
+            if not slot.worker.down:
+                return slot
+            slot.close()
+
+    def compile(self, cmd: List[str], obj: Path, preprocessed: bytes, lang: str, label: str) -> CommandResult | None:
+        """Compile *preprocessed* remotely into *obj*; None if that is not possible right now."""
+
+        args = remote_args(cmd)
+        slot = self._acquire() if args is not None else None
+        if slot is None:
+            return None
+        w = slot.worker
+        start = time.perf_counter()
+        try:
+            with span(f"{label} @ {w}", "remote", worker=str(w)):
+                if slot.sock is None:
+                    slot.sock = w.connect()
+                send_msg(slot.sock, {"op": "compile", "args": args, "lang": lang}, preprocessed)
+                reply, data = recv_msg(slot.sock)
+        except (OSError, ConnectionError, ValueError) as e:
+            w.down = True
+            slot.close()
+            console.print(f"[yellow]Worker {w} failed ({e}); compiling locally from now on[/]")
+            return None
+        self._free.put(slot)
+        duration = time.perf_counter() - start
+        stderr = reply.get("stderr", "")
+        if reply.get("rc") != 0:
+            console.rule(f":boom: Command Failed on {w} ({reply.get('rc')})")
+            if stderr:
+                console.print("[red]stderr:[/]")
+                console.print(stderr.rstrip())
+            raise MintError(f"Command failed on worker {w} (exit {reply.get('rc')}): {' '.join(cmd)}")
+        if stderr and is_verbose():
+            console.print(stderr.rstrip())
+        tmp = obj.with_name(f"{obj.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, obj)
+        record_timing(f"{label} @ {w}", duration)
+        return CommandResult(b"", duration)
+
+    def close(self) -> None:
+        for slot in self._slots:
+            slot.close()
+        self._slots.clear()
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from benchmarks.run import run_benchmarks
+
+
+def test_stub_builds_rebuild_only_what_the_edit_touches(tmp_path: Path):
+    report = run_benchmarks(tmp_path, tools=("builder", "yaml"), repeat=1, sources=12, headers=12, startup=False)
+    commands = {(r["tool"], r["scenario"]): r["commands"] for r in report["results"]}
+    # Preprocess + compile per TU, one link.
+    assert commands[("builder", "full")] == 2 * 12 + 1
+    assert commands[("builder", "noop")] == 0
+    assert 0 < commands[("builder", "touch")] <= 2 * report["project"]["touch_header_users"] + 1
+    assert all(r["median_wall"] >= r["median_mint"] > 0 for r in report["results"])
@@ -0,0 +1,44 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from mint.builder import Builder
+from mint.toolchains.cpp import CppToolchain
+from mint.utils import set_dry_run
+
+CXX = shutil.which("g++") or shutil.which("clang++")
+
+
+def _project(root: Path) -> Path:
+    (root / "a.h").write_text("#define A 2\n")
+    (root / "main.cpp").write_text('#include "a.h"\nint main() { return A; }\n')
+    return root
+
+
+def _edit_then_dry_run(build) -> None:
+    build()
+    (Path.cwd() / "a.h").write_text("#define A 3\n")
+    set_dry_run(True)
+    try:
+        build()
+    finally:
+        set_dry_run(False)
+    build()
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_dry_run_does_not_mark_units_built(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CXX", CXX)
+    monkeypatch.chdir(_project(tmp_path))
+    _edit_then_dry_run(lambda: Builder(tmp_path).build())
+    assert subprocess.run([str(tmp_path / "build" / "bin" / tmp_path.name)]).returncode == 3
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_dry_run_does_not_mark_units_built_cpp_toolchain(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CXX", CXX)
+    monkeypatch.chdir(_project(tmp_path))
+    _edit_then_dry_run(lambda: CppToolchain(tmp_path, tmp_path / "build", config={"cxxflags": []}).build())
+    assert subprocess.run([str(tmp_path / "build" / "bin" / tmp_path.name)]).returncode == 3
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from mint.cache import ObjectCache, parse_size, preprocess_command
+from mint.utils import executor, set_jobs
+
+
+def test_preprocess_command_keeps_depfile():
+    cmd = ["c++", "-c", "-O2", "-MMD", "-MF", "a.d", "-o", "a.o", "a.cpp"]
+    assert preprocess_command(cmd, Path("a.o")) == ["c++", "-E", "-O2", "-MMD", "-MF", "a.d", "-MT", "a.o", "a.cpp"]
+
+
+def test_key_ignores_outputs_and_project_root(tmp_path: Path):
+    cache = ObjectCache(tmp_path / "cache")
+    a = [sys.executable, "-c", "-I", "/work/a", "-o", "/work/a/x.o", "/work/a/x.cpp"]
+    b = [sys.executable, "-c", "-I", "/work/b", "-o", "/elsewhere/x.o", "/work/b/x.cpp"]
+    assert cache.key(a, b'# 1 "/work/a/x.cpp"', Path("/work/a")) == cache.key(b, b'# 1 "/work/b/x.cpp"', Path("/work/b"))
+    assert cache.key(a, b"int x;", Path("/work/a")) != cache.key(a + ["-O3"], b"int x;", Path("/work/a"))
+
+
+def test_store_fetch_and_lru_prune(tmp_path: Path):
+    cache = ObjectCache(tmp_path / "cache", max_size="1K")
+    for i, key in enumerate(["aa" * 32, "bb" * 32]):
+        obj = tmp_path / f"{i}.o"
+        obj.write_bytes(b"x" * 600)
+        cache.store(key, obj)
+        os.utime(cache._entry(key), (1000 + i, 1000 + i))
+
+    out = tmp_path / "out.o"
+    assert cache.fetch("aa" * 32, out)  # bumps "aa" to most recently used
+    assert out.read_bytes() == b"x" * 600
+    assert cache.prune() == (1, 600)
+    assert not cache.fetch("bb" * 32, out)
+    assert parse_size("5G") == 5 * 1024 ** 3
+
+
+STUB_CXX = Path(__file__).resolve().parent.parent / "benchmarks" / "stubs" / "c++"
+
+
+class _SlowRemote:
+    """Remote cache whose lookups only return once *parties* of them are in flight together."""
+
+    def __init__(self, parties: int):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.overlapped = 0
+
+    def fetch(self, key, outputs):
+        try:
+            self.barrier.wait()
+            self.overlapped += 1
+        except threading.BrokenBarrierError:
+            pass
+        return False
+
+    def store(self, key, outputs):
+        pass
+
+    def flush(self):
+        pass
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub compiler is a shell script")
+def test_lookups_run_concurrently_off_the_loop(tmp_path: Path):
+    remote = _SlowRemote(4)
+    cache = ObjectCache(tmp_path / "cache", remote=remote)
+    cmds = []
+    for i in range(4):
+        src = tmp_path / f"s{i}.cpp"
+        src.write_text(f"int f{i}();\n")
+        cmds.append(([str(STUB_CXX), "-c", "-o", str(tmp_path / f"s{i}.o"), str(src)], tmp_path / f"s{i}.o"))
+
+    async def build():
+        return await asyncio.gather(*(cache.compile_async(cmd, obj, tmp_path) for cmd, obj in cmds))
+
+    set_jobs(4)
+    try:
+        results = executor().call(build())
+    finally:
+        set_jobs(None)
+    # Serialised on the loop, the first lookup would wait for the others until the barrier times out.
+    assert remote.overlapped == 4
+    assert [hit for hit, _ in results] == [False] * 4
+    assert all(obj.exists() for _, obj in cmds)
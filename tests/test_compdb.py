@@ -0,0 +1,22 @@
+import json
+from pathlib import Path
+
+from mint.compdb import CompileDatabase
+
+
+def test_entries_merge_across_builds(tmp_path: Path):
+    db = CompileDatabase(tmp_path)
+    db.update(tmp_path, tmp_path / "a.cpp", tmp_path / "a.o", ["sccache", "c++", "-c", "a.cpp"])
+    db.update(tmp_path, tmp_path / "b.cpp", tmp_path / "b.o", ["c++", "-c", "b.cpp"])
+    assert db.save()
+    assert not db.save()  # unchanged: not rewritten
+
+    # Next build only recompiles b; a keeps its entry, the wrapper is dropped.
+    db = CompileDatabase(tmp_path)
+    db.update(tmp_path, tmp_path / "b.cpp", tmp_path / "b.o", ["c++", "-c", "-O2", "b.cpp"])
+    assert db.save()
+    entries = json.loads(db.path.read_text())
+    assert [e["arguments"] for e in entries] == [["c++", "-c", "a.cpp"], ["c++", "-c", "-O2", "b.cpp"]]
+
+    db.retain([tmp_path / "b.o"])
+    assert db.save() and len(CompileDatabase(tmp_path)) == 1
@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from mint.daemon import InotifyWatcher, MintDaemon, PollWatcher, daemon_status, stop_daemon
+from mint.fileindex import FileIndex
+
+
+def _tree(root: Path) -> None:
+    (root / "src").mkdir()
+    (root / "src" / "a.cpp").write_text("int a;\n")
+    (root / "build").mkdir()
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+def test_watchers_report_edits_and_new_directories(tmp_path: Path, kind: str):
+    _tree(tmp_path)
+    events = []
+
+    def on_change(paths, structural, full):
+        events.append((set(paths), structural))
+
+    if kind == "inotify":
+        try:
+            watcher = InotifyWatcher(FileIndex(tmp_path), tmp_path / "build", on_change)
+        except (OSError, AttributeError):
+            pytest.skip("inotify not available")
+    else:
+        watcher = PollWatcher(tmp_path, tmp_path / "build", on_change)
+
+    src = tmp_path / "src" / "a.cpp"
+    src.write_text("int a = 1;\n")
+    os.utime(src, ns=(time.time_ns(), time.time_ns() + 10**9))
+    (tmp_path / "build" / "out.o").write_text("")  # outputs are not watched
+    watcher.sync()
+    assert events and str(src) in events[-1][0]
+    assert not any(str(tmp_path / "build") in p for paths, _ in events for p in paths)
+
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "b.cpp").write_text("int b;\n")
+    watcher.sync()
+    # inotify starts watching the new directory; the edit inside it is seen next
+    (tmp_path / "lib" / "b.cpp").write_text("int b = 2;\n")
+    watcher.sync()
+    assert any(structural for _, structural in events)
+    assert any(str(tmp_path / "lib" / "b.cpp") in paths for paths, _ in events)
+
+
+def test_daemon_status_and_stop(tmp_path: Path):
+    _tree(tmp_path)
+    d = MintDaemon(tmp_path, tmp_path / "build", idle_timeout=60)
+    t = threading.Thread(target=d.serve, daemon=True)
+    t.start()
+    for _ in range(100):
+        if daemon_status(tmp_path / "build"):
+            break
+        time.sleep(0.02)
+    info = daemon_status(tmp_path / "build")
+    assert info["pid"] == os.getpid() and info["root"] == str(tmp_path)
+    assert stop_daemon(tmp_path / "build")
+    t.join(5)
+    assert not t.is_alive()
+    assert daemon_status(tmp_path / "build") is None
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+from mint.depgraph import COMMAND, INPUT, NEW, DepGraph, parse_depfile
+
+
+def test_parse_depfile_continuations_and_escapes(tmp_path: Path):
+    d = tmp_path / "main.d"
+    d.write_text("obj/main.o: src/main.cpp src/util.h \\\n  src/my\\ dir/x.h\nsrc/util.h:\n")
+    assert parse_depfile(d) == [Path("src/main.cpp"), Path("src/util.h"), Path("src/my dir/x.h")]
+
+
+def _tu(tmp_path: Path):
+    src = tmp_path / "main.cpp"
+    hdr = tmp_path / "util.h"
+    obj = tmp_path / "build" / "main.o"
+    obj.parent.mkdir()
+    src.write_text('#include "util.h"\n')
+    hdr.write_text("int x;\n")
+    obj.write_text("")
+    depfile = obj.with_suffix(".d")
+    depfile.write_text(f"{obj}: {src} util.h\n")
+    return src, hdr, obj, depfile
+
+
+def test_header_edit_marks_object_stale(tmp_path: Path):
+    src, hdr, obj, depfile = _tu(tmp_path)
+    cmd = ["c++", "-c", str(src)]
+
+    graph = DepGraph(tmp_path / "build")
+    assert graph.needs_rebuild(obj, src, cmd)  # no record yet
+    graph.record(obj, src, depfile, cmd, tmp_path)
+    assert not graph.needs_rebuild(obj, src, cmd)
+    graph.save()
+
+    hdr.write_text("int y;\n")
+    assert DepGraph(tmp_path / "build").needs_rebuild(obj, src, cmd)
+
+
+def test_rebuild_reason_names_the_changed_header(tmp_path: Path):
+    src, hdr, obj, depfile = _tu(tmp_path)
+    cmd = ["c++", "-c", str(src)]
+    graph = DepGraph(tmp_path / "build")
+    assert graph.rebuild_reason(obj, src, cmd) == (NEW, None)
+    graph.record(obj, src, depfile, cmd, tmp_path)
+    graph.save()
+
+    hdr.write_text("int y;\n")
+    graph = DepGraph(tmp_path / "build")
+    assert graph.rebuild_reason(obj, src, cmd) == (INPUT, str(hdr))
+    assert graph.rebuild_reason(obj, src, [*cmd, "-O2"]) == (COMMAND, None)
+
+
+def test_touch_without_change_and_flag_change(tmp_path: Path):
+    src, hdr, obj, depfile = _tu(tmp_path)
+    cmd = ["c++", "-c", "-O0", str(src)]
+    graph = DepGraph(tmp_path / "build")
+    graph.record(obj, src, depfile, cmd, tmp_path)
+    graph.save()
+
+    os.utime(hdr, (4_000_000_000, 4_000_000_000))
+    graph = DepGraph(tmp_path / "build")
+    assert not graph.needs_rebuild(obj, src, cmd)
+    assert graph.needs_rebuild(obj, src, ["c++", "-c", "-O3", str(src)])
+
+
+def test_link_skipped_for_identical_objects(tmp_path: Path):
+    a, b = tmp_path / "a.o", tmp_path / "b.o"
+    out = tmp_path / "app"
+    a.write_bytes(b"A")
+    b.write_bytes(b"B")
+    out.write_bytes(b"")
+    cmd = ["c++", "-o", str(out), str(a), str(b)]
+    graph = DepGraph(tmp_path / "build")
+    assert graph.outdated(out, [a, b], cmd)
+    graph.record_output(out, [a, b], cmd)
+    graph.save()
+
+    # Recompiled to the same bytes: no relink.
+    a.write_bytes(b"A")
+    os.utime(a, (4_000_000_000, 4_000_000_000))
+    graph = DepGraph(tmp_path / "build")
+    assert not graph.outdated(out, [a, b], cmd)
+    assert graph.outdated(out, [a], cmd)
+    assert graph.outdated(out, [a, b], [*cmd, "-s"])
+    a.write_bytes(b"A2")
+    assert DepGraph(tmp_path / "build").outdated(out, [a, b], cmd)
+
+
+def test_source_edited_during_first_compile_is_seen_next_time(tmp_path: Path):
+    src, hdr, obj, depfile = _tu(tmp_path)
+    cmd = ["c++", "-c", str(src)]
+
+    graph = DepGraph(tmp_path / "build")
+    assert graph.rebuild_reason(obj, src, cmd) == (NEW, None)
+    src.write_text('#include "util.h"\nint edited;\n')  # saved while the compiler runs
+    graph.record(obj, src, depfile, cmd, tmp_path)
+    graph.save()
+    assert DepGraph(tmp_path / "build").needs_rebuild(obj, src, cmd)
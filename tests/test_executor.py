@@ -0,0 +1,54 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from mint.executor import ProcessExecutor
+from mint.scheduler import Job, Scheduler
+from mint.utils import MintError, run, run_async
+
+
+def test_process_limit_output_and_rusage():
+    ex = ProcessExecutor(2)
+    sleep = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+    lines = []
+
+    async def batch():
+        echo = [sys.executable, "-c", "print('one'); print('two', flush=True)"]
+        return await asyncio.gather(*(ex.process(sleep) for _ in range(4)), ex.process(echo, on_line=lines.append))
+
+    start = time.perf_counter()
+    *sleeps, echoed = ex.call(batch())
+    assert time.perf_counter() - start >= 0.6  # two at a time
+    assert all(rc == 0 for rc, *_ in sleeps)
+    rc, out, _, rusage = echoed
+    assert out == b"one\ntwo\n" and lines == ["one", "two"]
+    assert rusage is None or rusage.ru_maxrss > 0
+    ex.close()
+
+
+def test_cancelling_kills_the_process():
+    ex = ProcessExecutor(1)
+    fut = ex.submit(ex.process([sys.executable, "-c", "import time; time.sleep(30)"]))
+    time.sleep(0.3)
+    fut.cancel()
+    start = time.perf_counter()
+    # The slot is free again right away.
+    assert ex.call(ex.process([sys.executable, "-c", "pass"]))[0] == 0
+    assert time.perf_counter() - start < 5
+    ex.close()
+
+
+def test_sync_wrapper_and_coroutine_jobs():
+    result = run([sys.executable, "-c", "print('hi')"], capture=True)
+    assert result.stdout == b"hi\n" and result.duration > 0
+    with pytest.raises(MintError, match="exit 3"):
+        run([sys.executable, "-c", "raise SystemExit(3)"])
+
+    async def compile_(n):
+        await run_async([sys.executable, "-c", "pass"])
+        return n
+
+    futures = {job.key: fut for job, fut in Scheduler(3).run(Job(str(n), compile_, n) for n in range(5))}
+    assert sorted(fut.result() for fut in futures.values()) == list(range(5))
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from mint.fileindex import FileIndex
+
+
+def _touch(root: Path, *names: str) -> None:
+    for name in names:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("")
+
+
+def test_walk_prunes_and_honours_ignore_files(tmp_path: Path):
+    _touch(
+        tmp_path,
+        "src/main.cpp", "src/util.c", "src/sub/deep.cpp", "src/sub/scratch.cpp",
+        "src/gen/out.cpp", "src/gen/keep.cpp", "notes.tmp.cpp", "mint.yaml",
+        ".git/objects/x.cpp", "node_modules/pkg/a.cpp", "build/obj/b.cpp", "out/c.cpp",
+    )
+    (tmp_path / ".gitignore").write_text("# generated\n*.tmp.cpp\n/out/\ngen/\n")
+    (tmp_path / "src/sub/.gitignore").write_text("scratch.cpp\n")
+    # .mintignore rules come last, so they can take back a .gitignore match
+    (tmp_path / ".mintignore").write_text("!gen/\nsrc/gen/out.cpp\n")
+
+    index = FileIndex(tmp_path)
+    rel = [str(p.relative_to(tmp_path)) for p in index.with_suffix(".cpp", ".c")]
+
+    assert rel == ["src/gen/keep.cpp", "src/main.cpp", "src/sub/deep.cpp", "src/util.c"]
+    assert index.has(".yaml") and not index.has(".rb")
+    assert [p.name for p in index.glob("src/*.cpp")] == ["main.cpp"]
+    assert [p.name for p in index.glob("src/**/*.cpp")] == ["keep.cpp", "main.cpp", "deep.cpp"]
+    assert [p.name for p in index.rglob("d*.cpp")] == ["deep.cpp"]
+    assert [p.name for p in index.under(tmp_path / "src" / "sub", ".cpp")] == ["deep.cpp"]
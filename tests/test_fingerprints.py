@@ -0,0 +1,62 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from mint import fingerprints
+from mint.fingerprints import FingerprintStore
+
+
+def _rows(build_dir: Path):
+    with sqlite3.connect(build_dir / "fingerprints.db") as db:
+        return sorted(db.execute("SELECT namespace, path, digest FROM fingerprints"))
+
+
+def test_namespaces_and_concurrent_stores_keep_each_others_entries(tmp_path: Path):
+    build = tmp_path / "build"
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    # Two toolchains (or two `mint` processes) with the store open at once.
+    first, second = FingerprintStore(build, "One"), FingerprintStore(build, "Two")
+    assert first.changed(a) and second.changed(b)
+    first.update(a)
+    second.update(b)
+    first.flush()
+    second.flush()
+    assert [(ns, Path(p).name) for ns, p, _ in _rows(build)] == [("One", "a.txt"), ("Two", "b.txt")]
+    assert not FingerprintStore(build, "One").changed(a)
+    assert FingerprintStore(build, "Two").changed(a)
+
+
+def test_only_content_changes_count_and_only_changes_are_written(tmp_path: Path, monkeypatch):
+    build = tmp_path / "build"
+    src = tmp_path / "src.txt"
+    src.write_text("v1")
+    store = FingerprintStore(build, "Tc")
+    assert not build.exists()  # nothing is opened until used
+    store.changed(src)
+    store.update(src)
+    store.flush()
+
+    hashed = []
+    real = fingerprints.fingerprint
+    monkeypatch.setattr(fingerprints, "fingerprint", lambda p: hashed.append(p) or real(p))
+    store = FingerprintStore(build, "Tc")
+    assert not store.changed(src) and hashed == []  # same stamp: not even read
+    assert store._pending == {}
+
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not store.changed(src) and hashed == [src]  # touched, same content
+    src.write_text("v2")
+    assert store.changed(src)
+
+
+def test_edit_during_build_is_not_recorded_as_built(tmp_path: Path):
+    src = tmp_path / "src.txt"
+    src.write_text("v1")
+    store = FingerprintStore(tmp_path, "Tc")
+    assert store.changed(src)
+    src.write_text("v2, saved while the tool ran")
+    store.update(src)
+    assert store.changed(src)
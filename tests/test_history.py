@@ -0,0 +1,48 @@
+import time
+from pathlib import Path
+
+from mint.history import BuildHistory
+from mint.utils import set_dry_run
+
+
+def test_builds_and_jobs_are_reported(tmp_path: Path):
+    history = BuildHistory(tmp_path)
+    history.record("compile", "a.cpp", sec=2.0, cpu=1.5, rss=100, cache="miss", reason="new")
+    history.record("compile", "b.cpp", sec=0.5, cache="miss", reason="new")
+    history.record("link", "app", sec=0.2, reason="new")
+    history.commit(time.time(), "cpp", True)
+
+    history.record("compile", "a.cpp", sec=0.1, cache="hit", reason="input", cause="a.h")
+    history.record("compile", "b.cpp", sec=1.0, cache="miss", reason="input", cause="a.h", ok=False)
+    history.commit(time.time(), "cpp", False)
+
+    report = BuildHistory(tmp_path).report()
+    assert [(b["jobs"], b["hits"], b["misses"], b["ok"]) for b in report["builds"]] == [(3, 0, 2, 1), (2, 1, 1, 0)]
+    # Neither the cache hit nor the failed compile counts as a compile time.
+    assert [(r["key"], r["avg_sec"], r["runs"]) for r in report["slowest_units"]] == [("a.cpp", 2.0, 1), ("b.cpp", 0.5, 1)]
+    assert report["most_rebuilt"][0]["input"] == 1
+    assert [(r["cause"], r["rebuilds"], r["builds"]) for r in report["causes"]] == [("a.h", 2, 1)]
+    assert BuildHistory(tmp_path).report(last=1)["builds"][0]["ok"] == 0
+
+
+def test_missing_history(tmp_path: Path):
+    assert BuildHistory(tmp_path / "build").report()["builds"] == []
+
+
+def test_every_toolchain_build_is_recorded(tmp_path: Path, monkeypatch):
+    from typer.testing import CliRunner
+
+    from mint.cli import app
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.yaml").write_text("key: value\n")
+    assert CliRunner().invoke(app, ["build", "--lang", "yaml"]).exit_code == 0
+    (tmp_path / "a.yaml").write_text("invalid: [1,\n")
+    assert CliRunner().invoke(app, ["build", "--lang", "yaml"]).exit_code == 1
+    try:
+        assert CliRunner().invoke(app, ["build", "--lang", "yaml", "--dry-run"]).exit_code == 1
+    finally:
+        set_dry_run(False)
+
+    builds = BuildHistory(tmp_path / "build").report()["builds"]
+    assert [(b["toolchain"], b["ok"]) for b in builds] == [("yaml", 1), ("yaml", 0)]
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from mint.includes import IncludeScanner, include_dirs, include_report
+
+
+def test_include_impact_and_candidates(tmp_path: Path):
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    (inc / "api.h").write_text('#pragma once\n#include "impl.h"\n#include <vector>\n')
+    (inc / "impl.h").write_text('#pragma once\n#include "huge.h"\n#include "api.h"\n')
+    (inc / "huge.h").write_text("// " + "x" * 997 + "\n")
+    (tmp_path / "a.cpp").write_text('#include <api.h>\n')
+    (tmp_path / "b.cpp").write_text('  #  include "inc/api.h"\n')
+    (tmp_path / "c.cpp").write_text('#if 0\n#include "missing.h"\n#endif\n')
+
+    dirs = [tmp_path, *include_dirs(["-O2", "-I", "inc", "-Iinc"], tmp_path)]
+    assert dirs == [tmp_path, inc]
+    costs = {"a.cpp": 2.0, "b.cpp": 3.0, "c.cpp": 9.0}
+    report = include_report(
+        [tmp_path / n for n in costs], IncludeScanner(dirs), lambda src: costs[src.name], root=tmp_path,
+    )
+
+    assert report["units"] == 3
+    rows = {r["header"]: r for r in report["headers"]}
+    assert set(rows) == {"inc/api.h", "inc/impl.h", "inc/huge.h"}  # <vector> and missing.h do not resolve
+    huge = rows["inc/huge.h"]
+    assert (huge["tus"], huge["cost_s"], huge["bytes"], huge["parsed_bytes"]) == (2, 5.0, 1001, 2002)
+    assert rows["inc/api.h"]["closure_bytes"] == sum(p.stat().st_size for p in inc.iterdir())
+    # api.h -> impl.h drags in impl.h and huge.h for both TUs; impl.h -> huge.h only huge.h.
+    impl = (inc / "impl.h").stat().st_size
+    assert [(c["includer"], c["header"], c["saved_bytes"]) for c in report["candidates"][:2]] == [
+        ("inc/api.h", "inc/impl.h", (impl + 1001) * 2),
+        ("inc/impl.h", "inc/huge.h", 2002),
+    ]
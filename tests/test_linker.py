@@ -0,0 +1,27 @@
+import pytest
+
+from mint import linker
+from mint.utils import MintError
+
+
+def test_profile_flags(monkeypatch):
+    monkeypatch.setattr(linker, "probe_linker", lambda compiler, name: name == "lld")
+    profiles = {"debug": {"split_dwarf": True, "gdb_index": True}, "release": {"compress_debug": True}}
+
+    debug = linker.load_profile(profiles, release=False)
+    assert linker.compile_flags(debug) == ["-gsplit-dwarf", "-ggnu-pubnames"]
+    assert linker.link_flags("c++", debug) == (["-fuse-ld=lld", "-Wl,--gdb-index"], "lld, gdb-index")
+
+    release = linker.load_profile(profiles, release=True)
+    assert linker.compile_flags(release) == []
+    assert linker.link_flags("c++", {**release, "linker": "default"}) == (["-gz"], "default linker, compressed debug")
+
+
+def test_profile_validation(monkeypatch):
+    monkeypatch.setattr(linker, "probe_linker", lambda compiler, name: False)
+    with pytest.raises(MintError, match="Did you mean 'split_dwarf'"):
+        linker.load_profile({"debug": {"split_dwarfs": True}}, release=False)
+    # auto quietly falls back to the toolchain default, an explicit choice does not
+    assert linker.link_flags("c++", linker.load_profile(None, release=False)) == ([], "default linker")
+    with pytest.raises(MintError, match="mold"):
+        linker.select_linker("c++", "mold")
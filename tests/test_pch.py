@@ -0,0 +1,96 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mint import pch
+from mint.builder import BuildConfig, Builder
+from mint.depgraph import DepGraph
+from mint.pch import PchManager, common_headers, is_clang
+from mint.targets import Target
+from mint.utils import run as real_run
+
+
+def test_common_headers_picks_majority_system_includes(tmp_path: Path):
+    bodies = [
+        "#include <vector>\n#include <string>\n#include \"local.h\"\n",
+        "#include <vector>\n#  include <map>\n#include \"local.h\"\n",
+        "#include <string>\n#include <vector>\n",
+        "#include <vector>\n",
+    ]
+    sources = []
+    for i, body in enumerate(bodies):
+        src = tmp_path / f"tu{i}.cpp"
+        src.write_text(body)
+        sources.append(src)
+    (tmp_path / "plain.c").write_text("#include <map>\n")
+
+    assert common_headers(sources + [tmp_path / "plain.c"]) == ["<vector>", "<string>"]
+    assert common_headers(sources[:2]) == []  # too few TUs to pay off
+
+
+CXX = shutil.which("g++") or shutil.which("clang++")
+
+
+def _sources(root: Path, bodies) -> list:
+    paths = []
+    for i, body in enumerate(bodies):
+        path = root / f"tu{i}.cpp"
+        path.write_text(body)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_pch_is_rebuilt_when_one_of_its_headers_changes(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CXX", CXX)
+    (tmp_path / "common.h").write_text("#pragma once\nint common();\n")
+    build = tmp_path / "build"
+    runs = []
+    monkeypatch.setattr(pch, "run", lambda cmd, **kw: runs.append(cmd) or real_run(cmd, **kw))
+
+    def ensure():
+        # A fresh graph per call, like a new `mint build`.
+        depgraph = DepGraph(build)
+        manager = PchManager(CXX, tmp_path, build, depgraph)
+        flags, pch_file = manager.ensure(manager.resolve_headers(["common.h"], []), ["-O0"])
+        depgraph.save()
+        return flags, pch_file
+
+    _, pch_file = ensure()
+    assert pch_file.exists() and len(runs) == 1
+    ensure()
+    assert len(runs) == 1  # up to date
+    (tmp_path / "common.h").write_text("#pragma once\nint common();\nint more();\n")
+    ensure()
+    assert len(runs) == 2
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_pch_goes_only_to_tus_sharing_its_headers(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CXX", CXX)
+    sources = _sources(tmp_path, [
+        "#include <vector>\nint a();\n",
+        "#include <vector>\n#include <string>\nint b();\n",
+        "#include <vector>\nint c();\n",
+        "#include <map>\nint d();\n",
+    ])
+    builder = Builder(tmp_path, config=BuildConfig({"pch": "auto"}))
+    target = Target("app", "executable", sources)
+    builder._prepare_pch([target])
+    cmds = [builder._compile_command(target, src, tmp_path / f"{src.stem}.o") for src in sources]
+    pch_flag = "-include-pch" if is_clang(CXX) else "-include"
+    assert [pch_flag in cmd for cmd in cmds] == [True, True, True, False]
+    assert list((tmp_path / "build" / "pch").rglob("mint_pch.hpp"))
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_pch_is_skipped_without_common_headers(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("CXX", CXX)
+    sources = _sources(tmp_path, ["#include <vector>\n", "#include <map>\n", "#include <string>\n"])
+    builder = Builder(tmp_path, config=BuildConfig({"pch": "auto"}))
+    target = Target("app", "executable", sources)
+    builder._prepare_pch([target])
+    cmd = builder._compile_command(target, sources[0], tmp_path / "tu0.o")
+    assert "-include" not in cmd and "-include-pch" not in cmd
+    assert not (tmp_path / "build" / "pch").exists()
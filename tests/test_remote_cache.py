@@ -0,0 +1,108 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from mint.cache import ObjectCache
+from mint.cache_server import CacheServer, _CacheHandler
+from mint.remote_cache import RemoteCache
+from mint.utils import executor, set_jobs
+
+KEY = "ab" * 32
+
+
+def _serve(root: Path, read_only: bool = False):
+    server = CacheServer(("127.0.0.1", 0), root, read_only)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_objects_are_shared_through_the_remote(tmp_path: Path):
+    server, url = _serve(tmp_path / "server")
+    obj = tmp_path / "a.o"
+    first = ObjectCache(tmp_path / "one", remote=RemoteCache(url))
+    assert not first.fetch(KEY, obj)
+    obj.write_bytes(b"object code")  # the compile
+    first.store(KEY, obj)
+    first.flush()  # waits for the upload
+
+    # Another machine: empty local cache, same remote.
+    second = ObjectCache(tmp_path / "two", remote=RemoteCache(url))
+    out = tmp_path / "b.o"
+    assert second.fetch(KEY, out)
+    assert out.read_bytes() == b"object code"
+    assert second.remote_hits == 1
+    assert second._entry(KEY).exists()  # now also cached locally
+    server.shutdown()
+    server.server_close()
+
+
+def test_read_only_and_unreachable_remotes(tmp_path: Path):
+    server, url = _serve(tmp_path / "server")
+    exe = tmp_path / "app"
+    exe.write_bytes(b"binary")
+    exe.chmod(0o755)
+
+    reader = RemoteCache(url, mode="read-only")
+    reader.store(KEY, {"app": exe})
+    reader.flush()
+    assert not reader.fetch(KEY, {"app": tmp_path / "copy"})
+
+    writer = RemoteCache(url)
+    writer.store(KEY, {"app": exe})
+    writer.flush()
+    assert reader.fetch(KEY, {"app": tmp_path / "copy"})
+    assert (tmp_path / "copy").stat().st_mode & 0o111  # still executable
+    server.shutdown()
+    server.server_close()
+
+    down = RemoteCache("http://127.0.0.1:1", timeout=1)
+    assert not down.fetch(KEY, {"app": tmp_path / "other"})
+    assert down.disabled and not (tmp_path / "other").exists()
+
+
+STUB_CXX = Path(__file__).resolve().parent.parent / "benchmarks" / "stubs" / "c++"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub compiler is a shell script")
+def test_compile_lookups_overlap_up_to_the_concurrency(tmp_path: Path):
+    lookups = 4
+    barrier = threading.Barrier(lookups, timeout=5)
+    together = []
+
+    class SlowHandler(_CacheHandler):
+        def do_GET(self):
+            # Answers only once every lookup is in flight at the same time.
+            try:
+                barrier.wait()
+                together.append(self.path)
+            except threading.BrokenBarrierError:
+                pass
+            super().do_GET()
+
+    server, url = _serve(tmp_path / "server")
+    server.RequestHandlerClass = SlowHandler
+    remote = RemoteCache(url, concurrency=lookups)
+    cache = ObjectCache(tmp_path / "cache", remote=remote)
+    units = []
+    for i in range(lookups):
+        src, obj = tmp_path / f"s{i}.cpp", tmp_path / f"s{i}.o"
+        src.write_text(f"int f{i}();\n")
+        units.append(([str(STUB_CXX), "-c", "-o", str(obj), str(src)], obj))
+
+    async def build():
+        return await asyncio.gather(*(cache.compile_async(cmd, obj, tmp_path) for cmd, obj in units))
+
+    set_jobs(lookups)
+    try:
+        executor().call(build())
+    finally:
+        set_jobs(None)
+    cache.flush()
+    server.shutdown()
+    server.server_close()
+    assert len(together) == lookups
+    assert remote.misses == lookups and not remote.disabled
+    assert remote.uploaded == lookups
@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+from contextlib import closing
+
+import pytest
+
+from mint.scheduler import Job, Scheduler
+from mint.utils import MintError, run_async
+
+
+def test_heavy_jobs_are_not_co_scheduled_past_budget():
+    lock = threading.Lock()
+    running = {"heavy": 0, "light": 0}
+    peak = {"heavy": 0, "total": 0}
+
+    def work(kind):
+        with lock:
+            running[kind] += 1
+            peak["heavy"] = max(peak["heavy"], running["heavy"])
+            peak["total"] = max(peak["total"], sum(running.values()))
+        time.sleep(0.02)
+        with lock:
+            running[kind] -= 1
+
+    jobs = [Job(f"h{i}", work, "heavy", rss=600) for i in range(3)]
+    jobs += [Job(f"l{i}", work, "light", rss=100) for i in range(6)]
+    done = [job.key for job, fut in Scheduler(4, memory_budget=1000).run(jobs) if fut.result() is None]
+
+    assert sorted(done) == sorted(j.key for j in jobs)
+    assert peak["heavy"] == 1  # two heavy jobs would need 1200 > 1000
+    assert peak["total"] > 1  # light jobs still filled the other workers
+
+
+def test_longest_jobs_start_first():
+    order = []
+    jobs = [Job(name, order.append, name, cost=cost) for name, cost in [("a", 0.1), ("b", 3.0), ("c", 1.0), ("d", 0.1)]]
+    list(Scheduler(1).run(jobs))
+    assert order == ["b", "c", "a", "d"]
+
+
+def test_dependencies_and_critical_path():
+    order = []
+    a = Job("a", order.append, "a", cost=1.0)
+    b = Job("b", order.append, "b", cost=0.5)
+    c = Job("c", order.append, "c", cost=0.1)
+    # the link waiting on b and c outweighs a, although a is the slowest job
+    link = Job("link", order.append, "link", cost=2.0, deps=[b, c])
+    list(Scheduler(1).run([a, b, c, link]))
+    assert order == ["b", "c", "link", "a"]
+
+
+def test_failure_cancels_running_coroutine_jobs():
+    async def fail():
+        await run_async([sys.executable, "-c", "raise SystemExit(1)"])
+
+    async def slow():
+        await run_async([sys.executable, "-c", "import time; time.sleep(30)"])
+
+    start = time.perf_counter()
+    with pytest.raises(MintError):
+        with closing(Scheduler(2).run([Job("slow", slow), Job("fail", fail, cost=1.0)])) as results:
+            for job, fut in results:
+                fut.result()
+    assert time.perf_counter() - start < 10  # the sleeping job was killed, not waited for
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+from mint.targets import link_closure, load_targets
+from mint.utils import MintError
+
+
+def _project(tmp_path: Path) -> Path:
+    for name in ["core/a.cpp", "core/b.cpp", "plugin/p.cpp", "app/main.cpp"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("int x;\n")
+    return tmp_path
+
+
+def test_targets_are_ordered_and_linked(tmp_path: Path):
+    root = _project(tmp_path)
+    entries = [
+        {"name": "app", "sources": ["app/*.cpp"], "deps": ["plugin", "core"]},
+        {"name": "plugin", "type": "shared", "sources": ["plugin/p.cpp"], "deps": ["core"]},
+        {"name": "core", "type": "static", "sources": ["core/*.cpp"]},
+    ]
+    targets = load_targets(entries, root, root / "build")
+    by_name = {t.name: t for t in targets}
+
+    assert [t.name for t in targets] == ["core", "plugin", "app"]
+    assert [s.name for s in by_name["core"].sources] == ["a.cpp", "b.cpp"]
+    assert by_name["core"].pic  # linked into the shared plugin
+    assert not by_name["app"].pic
+    assert [t.name for t in link_closure(by_name["app"], by_name)] == ["plugin", "core"]
+    assert by_name["plugin"].output(root / "build").parent == root / "build" / "lib"
+
+
+def test_target_errors(tmp_path: Path):
+    root = _project(tmp_path)
+    with pytest.raises(MintError, match="cycle"):
+        load_targets(
+            [
+                {"name": "a", "type": "static", "sources": ["core/a.cpp"], "deps": ["b"]},
+                {"name": "b", "type": "static", "sources": ["core/b.cpp"], "deps": ["a"]},
+            ],
+            root, root / "build",
+        )
+    with pytest.raises(MintError, match="no sources match"):
+        load_targets([{"name": "x", "sources": ["nothing/*.cpp"]}], root, root / "build")
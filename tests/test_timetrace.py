@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from mint.compdb import CompileDatabase
+from mint.timetrace import compile_time_report, load_traces
+
+
+def _x(name, dur, detail=None):
+    ev = {"ph": "X", "name": name, "ts": 0, "dur": dur, "pid": 1, "tid": 1}
+    if detail is not None:
+        ev["args"] = {"detail": detail}
+    return ev
+
+
+def test_report_aggregates_across_units(tmp_path: Path):
+    obj_dir = tmp_path / "obj"
+    obj_dir.mkdir()
+    db = CompileDatabase(tmp_path)
+    for name, vec_ms in (("a", 30_000), ("b", 10_000)):
+        (obj_dir / f"{name}.o").write_bytes(b"")
+        db.update(tmp_path, tmp_path / f"{name}.cpp", obj_dir / f"{name}.o", ["c++", "-c", f"{name}.cpp"])
+        events = [
+            _x("ExecuteCompiler", 100_000), _x("Frontend", 70_000), _x("Backend", 30_000),
+            _x("Source", 50_000, "/usr/include/c++/vector"),
+            _x("InstantiateClass", vec_ms, "std::vector<int>"),
+            _x("InstantiateClass", 5_000, "std::vector<std::string>"),
+            _x("OptFunction", 2_000, "main"),
+        ]
+        (obj_dir / f"{name}.json").write_text(json.dumps({"traceEvents": events}))
+    db.save()
+    (obj_dir / "gone.json").write_text("{}")  # no object: stale
+
+    report = compile_time_report(load_traces(tmp_path))
+    assert report["units"] == 2
+    assert report["total_ms"] == {"backend": 60.0, "frontend": 140.0, "total": 200.0}
+    assert [u["file"] for u in report["slowest_units"]] == [str(tmp_path / "a.cpp"), str(tmp_path / "b.cpp")]
+    assert report["headers"] == [{"path": "/usr/include/c++/vector", "ms": 100.0, "count": 2, "avg_ms": 50.0}]
+    assert [t["name"] for t in report["templates"]] == ["std::vector<int>", "std::vector<std::string>"]
+    assert report["template_sets"] == [{"name": "std::vector<$>", "ms": 50.0, "count": 4, "avg_ms": 12.5}]
+    assert report["functions"][0] == {"name": "main", "ms": 4.0, "count": 2, "avg_ms": 2.0}
@@ -0,0 +1,75 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import mint.toolchains as toolchains
+from mint.toolchains.base import BaseToolchain
+
+
+def _loaded_after(code: str) -> set:
+    code = f"import json, sys\n{code}\nprint(json.dumps(sorted(sys.modules)))"
+    return set(json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout))
+
+
+def test_toolchain_modules_are_imported_on_demand():
+    loaded = _loaded_after("import mint.cli, mint.toolchains as t\nassert {'cpp', 'cmd', 'lua_native'} <= set(t.available())")
+    assert not {"mint.builder", "asyncio", "http.server"} & loaded
+    assert not [m for m in loaded if m.startswith("mint.toolchains.")]
+
+    loaded = _loaded_after("import mint.toolchains as t\nt.get('yaml')")
+    assert "mint.toolchains.yaml" in loaded and "mint.toolchains.rust" not in loaded
+
+
+class _EntryPoint:
+    name = "demo"
+
+    def load(self):
+        class DemoToolchain(BaseToolchain):
+            def build(self):
+                return self.build_dir / "demo"
+
+        return DemoToolchain
+
+
+def test_plugin_toolchains_come_from_entry_points(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(toolchains, "_TOOLCHAINS", dict(toolchains._TOOLCHAINS))
+    monkeypatch.setattr(toolchains, "_plugins", {"demo": _EntryPoint()})
+    assert "demo" in toolchains.available()
+    tc = toolchains.get("demo")(tmp_path, tmp_path / "build")
+    assert tc.build() == tmp_path / "build" / "demo"
+    with pytest.raises(KeyError, match="cobol"):
+        toolchains.get("cobol")
+
+
+class _Remote:
+    def fetch(self, key, outputs):
+        raise AssertionError("remote cache used without a tool version")
+
+
+def test_remote_cache_keys_use_the_toolchains_version_probe(monkeypatch, tmp_path: Path):
+    tool = tmp_path / "tool"
+    tool.write_text('#!/bin/sh\n[ "$1" = version ] && cat "$(dirname "$0")/VERSION" && exit 0\ntouch "$2"\n')
+    tool.chmod(0o755)
+    (tmp_path / "VERSION").write_text("1.0\n")
+    (tmp_path / "in").write_text("x")
+
+    class Probed(_EntryPoint().load()):
+        version_args = ("version",)
+
+    cmd = [str(tool), "-o", str(tmp_path / "out")]
+    monkeypatch.setattr("mint.toolchains.base._VERSIONS", {})
+    key = Probed(tmp_path, tmp_path / "build")._action_key(cmd, [tmp_path / "in"])
+    assert key
+    (tmp_path / "VERSION").write_text("2.0\n")
+    monkeypatch.setattr("mint.toolchains.base._VERSIONS", {})
+    assert Probed(tmp_path, tmp_path / "build")._action_key(cmd, [tmp_path / "in"]) not in (key, None)
+
+    # The tool has no --version: the action runs locally, uncached.
+    tc = _EntryPoint().load()(tmp_path, tmp_path / "build")
+    assert tc._action_key(cmd, [tmp_path / "in"]) is None
+    tc.remote_cache = _Remote()
+    tc._run_cached(cmd, [tmp_path / "in"], [tmp_path / "out"])
+    assert (tmp_path / "out").exists()
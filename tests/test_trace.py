@@ -0,0 +1,34 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+from mint.trace import span, start_trace, stop_trace
+from mint.utils import run
+
+
+def test_trace_lanes_and_subprocess_events(tmp_path: Path):
+    start_trace()
+    with span("build", toolchain="cpp"):
+        def work():
+            with span("compile a.cpp", "compile", cache="miss"):
+                run([sys.executable, "-c", "pass"], label="cc a.cpp")
+
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+    out = tmp_path / "trace.json"
+    stop_trace(out)
+
+    events = json.loads(out.read_text())["traceEvents"]
+    lanes = {e["args"]["name"]: e["tid"] for e in events if e["ph"] == "M"}
+    assert lanes == {"mint": 0, "worker 1": 1}
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert spans["build"]["tid"] == 0 and spans["build"]["args"] == {"toolchain": "cpp"}
+    compile_, proc = spans["compile a.cpp"], spans["cc a.cpp"]
+    assert compile_["tid"] == proc["tid"] == 1 and compile_["args"]["cache"] == "miss"
+    assert proc["cat"] == "process" and proc["args"]["exit"] == 0
+    assert compile_["ts"] <= proc["ts"] and proc["ts"] + proc["dur"] <= compile_["ts"] + compile_["dur"] + 1
+
+    with span("untraced") as info:  # tracing is off again
+        assert info == {}
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from mint.depgraph import DepGraph
+from mint.unity import UnityPlanner
+
+
+def _planner(root: Path) -> UnityPlanner:
+    build = root / "build"
+    return UnityPlanner(root, build, DepGraph(build), batch_size=2)
+
+
+def test_batches_are_stable_and_edits_are_detached(tmp_path: Path):
+    sources = []
+    for name in ["a", "b", "c"]:
+        src = tmp_path / f"{name}.cpp"
+        src.write_text(f"int {name}() {{ return 0; }}\n")
+        sources.append(src)
+
+    planner = _planner(tmp_path)
+    batches, singles = planner.plan(sources)
+    group = planner._group(sources[0])
+    assert batches == {f"{group}_0": sources[:2]} and singles == [sources[2]]
+    for members in batches.values():
+        planner.mark_built(members)
+    planner.save()
+
+    # A new file sorting first must not reshuffle existing batches.
+    new = tmp_path / "0.cpp"
+    new.write_text("int zero() { return 0; }\n")
+    sources[0].write_text("int a() { return 1; }\n")
+    planner = _planner(tmp_path)
+    batches, singles = planner.plan([new, *sources])
+    assert planner._state["batches"] == {
+        f"{group}_0": [str(sources[0]), str(sources[1])], f"{group}_1": [str(sources[2])],
+    }
+    assert batches == {}  # "a" was edited, leaving "b" and "c" alone in their batches
+    assert singles == [new, *sources]
+
+
+def test_groups_of_different_directories_and_languages_never_share_a_name(tmp_path: Path):
+    names = ["x/a.c", "x/b.c", "x_c/a.cpp", "x_c/b.cpp", "a/b/a.cpp", "a/b/b.cpp", "a_b/a.cpp", "a_b/b.cpp"]
+    for name in names:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("int x;\n")
+
+    build = tmp_path / "build"
+    planner = UnityPlanner(tmp_path, build, DepGraph(build))
+    batches, singles = planner.plan([tmp_path / name for name in names])
+    assert singles == []
+    # One batch per directory and language, each written to its own unity source.
+    assert sorted(sorted(m.relative_to(tmp_path).as_posix() for m in members) for members in batches.values()) == [
+        names[4:6], names[6:8], names[0:2], names[2:4],
+    ]
+    units = {planner.write_source(name, members) for name, members in batches.items()}
+    assert len(units) == 4 and sorted(u.suffix for u in units) == [".c", ".cpp", ".cpp", ".cpp"]
@@ -0,0 +1,76 @@
+import shutil
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from mint.utils import MintError
+from mint.worker import WorkerPool, WorkerServer, recv_msg, remote_args, send_msg
+
+CXX = shutil.which("g++") or shutil.which("clang++")
+
+
+def test_remote_args_keep_codegen_flags_only():
+    cmd = ["c++", "-c", "-O2", "-Iinc", "-I", "/r", "-DX=1", "-include", "pch.h", "-MMD", "-MF", "a.d", "-o", "a.o", "a.cpp"]
+    assert remote_args(cmd) == ["-O2"]
+    assert remote_args(["c++", "-c", "-gsplit-dwarf", "-o", "a.o", "a.cpp"]) is None
+    assert remote_args(["c++", "-c", "-fplugin=evil.so", "-o", "a.o", "a.cpp"]) is None
+    assert remote_args(["sccache", "c++", "-c", "-o", "a.o", "a.cpp"]) is None
+    assert remote_args(["c++", "-c", "-fstack-usage", "-o", "a.o", "a.cpp"]) is None
+    assert remote_args(["c++", "-c", "-g", "-std=c++20", "-ffile-prefix-map=/r=.", "-o", "a.o", "a.cpp"]) == [
+        "-g", "-std=c++20", "-ffile-prefix-map=/r=.",
+    ]
+
+
+def _serve(jobs):
+    server = WorkerServer(("127.0.0.1", 0), CXX, jobs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_pool_spreads_compiles_and_falls_back(tmp_path: Path):
+    first, addr1 = _serve(1)
+    second, addr2 = _serve(2)
+    pool = WorkerPool([addr1, addr2, "127.0.0.1:1"], CXX)
+    pool.start()
+    assert pool.slots == 3  # the unreachable one is left out
+
+    source = b"int answer() { return 42; }\n"
+    cmd = [CXX, "-c", "-O1", "-o", "x.o", "x.cpp"]
+    for i in range(4):
+        obj = tmp_path / f"{i}.o"
+        assert pool.compile(cmd, obj, source, "c++", "compile x.cpp") is not None
+        assert obj.stat().st_size > 0
+    assert first.compiles + second.compiles == 4 and first.compiles and second.compiles
+
+    with pytest.raises(MintError, match="failed on worker"):
+        pool.compile(cmd, tmp_path / "bad.o", b"int broken(\n", "c++", "compile bad.cpp")
+
+    # A worker going away only makes the caller compile locally.
+    for server in (first, second):
+        server.shutdown()
+        server.server_close()
+    assert pool.compile(cmd, tmp_path / "late.o", source, "c++", "compile x.cpp") is None
+    pool.close()
+
+
+@pytest.mark.skipif(CXX is None, reason="needs a C++ compiler")
+def test_worker_refuses_flags_outside_the_allowlist(tmp_path: Path):
+    server, addr = _serve(1)
+    host, port = addr.split(":")
+    leak = tmp_path / "leak.d"
+    try:
+        with socket.create_connection((host, int(port))) as sock:
+            for bad in (["-MD", "-MF", str(leak)], [f"@{tmp_path / 'args'}"], ["-Wa,-adhln=" + str(leak)], ["-save-temps=obj"]):
+                send_msg(sock, {"op": "compile", "args": ["-O2", *bad], "lang": "c++"}, b"int x;\n")
+                reply, obj = recv_msg(sock)
+                assert reply["rc"] == 1 and "not allowed" in reply["stderr"] and obj == b""
+            send_msg(sock, {"op": "compile", "args": ["-O2", "-g", "-Wall"], "lang": "c++"}, b"int x;\n")
+            reply, obj = recv_msg(sock)
+            assert reply["rc"] == 0 and obj
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not leak.exists() and server.compiles == 1